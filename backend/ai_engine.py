@@ -1,13 +1,15 @@
 import os
 import json
 import logging
+import threading
 from typing import List, Dict, Any, Optional, Tuple
 
 import numpy as np
 import pandas as pd
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.neighbors import NearestNeighbors
-from sklearn.feature_extraction.text import TfidfVectorizer
+import scipy.sparse as sp
+from sklearn.metrics import pairwise_distances
+from sklearn.preprocessing import normalize
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
 
 # Optional OpenAI import – only needed for summary generation
 try:
@@ -19,6 +21,99 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _append_numeric(tfidf: sp.spmatrix, df: pd.DataFrame, numeric_columns: List[str],
+                    dtype: type) -> sp.csr_matrix:
+    """Append standardised numeric columns to a sparse TF‑IDF block, staying sparse."""
+    tfidf = tfidf.astype(dtype, copy=False)
+    if not numeric_columns:
+        return tfidf.tocsr()
+    numeric = _numeric_features(df, numeric_columns, dtype)
+    return sp.hstack([tfidf, sp.csr_matrix(numeric)], format="csr")
+
+
+def _numeric_features(df: pd.DataFrame, numeric_columns: List[str], dtype: type) -> np.ndarray:
+    """Numeric columns standardised to zero mean and unit variance within ``df``."""
+    numeric = df[numeric_columns].fillna(0).to_numpy(dtype=np.float64)
+    # Normalize numeric features to unit variance
+    numeric = (numeric - numeric.mean(axis=0)) / (numeric.std(axis=0) + 1e-8)
+    return numeric.astype(dtype)
+
+
+def _top_k_rows(scores: np.ndarray, k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Per row of ``scores``, the column indices and values of the ``k`` best
+    finite scores, best first. Equal scores keep column order, both in the
+    ranking and in which tied columns make the cut at the k-th place.
+    """
+    n_rows, n_cols = scores.shape
+    k = min(k, n_cols)
+    if k <= 0:
+        return [(np.zeros(0, dtype=np.intp), np.zeros(0))] * n_rows
+    if k < n_cols:
+        kth = -np.partition(-scores, k - 1, axis=1)[:, k - 1:k]
+        above = scores > kth
+        at_kth = scores == kth
+    results = []
+    for r, row in enumerate(scores):
+        if k < n_cols:
+            tied = np.flatnonzero(at_kth[r])[:k - np.count_nonzero(above[r])]
+            top = np.sort(np.concatenate([np.flatnonzero(above[r]), tied]))
+        else:
+            top = np.arange(n_cols)
+        top = top[np.argsort(-row[top], kind="stable")]
+        top = top[np.isfinite(row[top])]
+        results.append((top, row[top]))
+    return results
+
+
+# ── Model artifacts ──────────────────────────────────────────────────────
+#
+# A fitted model is saved as a directory of plain files: ``manifest.json``
+# (settings and shapes), ``vocabulary.json``, ``ids.json`` and one ``.npy``
+# per array.  Arrays are loaded with ``np.load(mmap_mode="r")`` so worker
+# processes share the page cache and loading does no fit work.
+
+def _write_json(directory: str, name: str, payload: Any) -> None:
+    with open(os.path.join(directory, name), "w") as fh:
+        json.dump(payload, fh)
+
+
+def _read_json(directory: str, name: str) -> Any:
+    with open(os.path.join(directory, name)) as fh:
+        return json.load(fh)
+
+
+def _load_array(directory: str, name: str, mmap: bool) -> np.ndarray:
+    return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r" if mmap else None)
+
+
+def _save_csr(directory: str, name: str, matrix: sp.spmatrix) -> List[int]:
+    """Save a CSR matrix as ``<name>_data/indices/indptr.npy``; returns its shape."""
+    matrix = sp.csr_matrix(matrix)
+    for part in ("data", "indices", "indptr"):
+        np.save(os.path.join(directory, f"{name}_{part}.npy"), getattr(matrix, part))
+    return list(matrix.shape)
+
+
+def _load_csr(directory: str, name: str, shape: List[int], mmap: bool) -> sp.csr_matrix:
+    """Wrap saved CSR arrays without copying them."""
+    parts = [_load_array(directory, f"{name}_{part}", mmap) for part in ("data", "indices", "indptr")]
+    return sp.csr_matrix(tuple(parts), shape=tuple(shape), copy=False)
+
+
+def _save_vectorizer(directory: str, vectorizer: TfidfVectorizer) -> None:
+    _write_json(directory, "vocabulary.json", {term: int(i) for term, i in vectorizer.vocabulary_.items()})
+    np.save(os.path.join(directory, "idf.npy"), vectorizer.idf_)
+
+
+def _load_vectorizer(directory: str, dtype: type) -> TfidfVectorizer:
+    """Rebuild a fitted TfidfVectorizer from its vocabulary and idf weights."""
+    vectorizer = TfidfVectorizer(stop_words="english", vocabulary=_read_json(directory, "vocabulary.json"),
+                                 dtype=dtype)
+    vectorizer.idf_ = np.load(os.path.join(directory, "idf.npy"))
+    return vectorizer
+
+
 class OpportunityMatcher:
     """
     Matches opportunities to candidates based on textual and numeric features.
@@ -26,7 +121,8 @@ class OpportunityMatcher:
     The matcher builds TF‑IDF vectors for the textual description of each
     opportunity and candidate, then computes cosine similarity.  Additional
     numeric features (e.g., years of experience, location score) can be
-    concatenated to the TF‑IDF vectors.
+    concatenated to the TF‑IDF vectors.  Features stay sparse (CSR) end to
+    end and can be kept in ``float32`` to halve memory.
 
     Example
     -------
@@ -35,29 +131,25 @@ class OpportunityMatcher:
     >>> matches = matcher.match(candidate_id=42, top_k=5)
     """
 
-    def __init__(self, text_column: str = "description", numeric_columns: Optional[List[str]] = None):
+    def __init__(self, text_column: str = "description", numeric_columns: Optional[List[str]] = None,
+                 dtype: type = np.float64):
         self.text_column = text_column
         self.numeric_columns = numeric_columns or []
+        self.dtype = dtype
         self.vectorizer: Optional[TfidfVectorizer] = None
-        self.opportunity_vectors: Optional[np.ndarray] = None
+        self.opportunity_vectors: Optional[sp.csr_matrix] = None
         self.opportunity_ids: List[Any] = []
+        # L2-normalised copy of opportunity_vectors; cosine similarity is a sparse dot product
+        self._normalized_vectors: Optional[sp.csr_matrix] = None
 
     def _prepare_texts(self, df: pd.DataFrame) -> List[str]:
         return df[self.text_column].fillna("").astype(str).tolist()
 
-    def _prepare_features(self, df: pd.DataFrame) -> np.ndarray:
+    def _prepare_features(self, df: pd.DataFrame) -> sp.csr_matrix:
         """Combine TF‑IDF vectors with numeric columns."""
         texts = self._prepare_texts(df)
         tfidf = self.vectorizer.transform(texts)
-
-        if self.numeric_columns:
-            numeric = df[self.numeric_columns].fillna(0).to_numpy()
-            # Normalize numeric features to unit variance
-            numeric = (numeric - numeric.mean(axis=0)) / (numeric.std(axis=0) + 1e-8)
-            features = np.hstack([tfidf.toarray(), numeric])
-        else:
-            features = tfidf.toarray()
-        return features
+        return _append_numeric(tfidf, df, self.numeric_columns, self.dtype)
 
     def fit(self, opportunities: pd.DataFrame, candidates: pd.DataFrame) -> None:
         """
@@ -70,11 +162,12 @@ class OpportunityMatcher:
         """
         # Build TF‑IDF on the combined corpus to ensure same vocabulary
         corpus = pd.concat([opportunities, candidates], ignore_index=True)
-        self.vectorizer = TfidfVectorizer(stop_words="english", max_features=5000)
+        self.vectorizer = TfidfVectorizer(stop_words="english", max_features=5000, dtype=self.dtype)
         self.vectorizer.fit(self._prepare_texts(corpus))
 
         # Store opportunity vectors for later similarity look‑ups
         self.opportunity_vectors = self._prepare_features(opportunities)
+        self._normalized_vectors = normalize(self.opportunity_vectors, copy=True)
         self.opportunity_ids = opportunities["id"].tolist()
         logger.info("OpportunityMatcher fitted with %d opportunities.", len(self.opportunity_ids))
 
@@ -90,7 +183,8 @@ class OpportunityMatcher:
 
         Returns
         -------
-        List of tuples ``(opportunity_id, similarity_score)`` sorted descending.
+        List of tuples ``(opportunity_id, similarity_score)`` sorted descending;
+        equal scores keep the order opportunities were fitted in.
         """
         if self.opportunity_vectors is None or self.vectorizer is None:
             raise RuntimeError("Matcher has not been fitted yet.")
@@ -99,13 +193,555 @@ class OpportunityMatcher:
         if candidate_row.empty:
             raise ValueError(f"Candidate with id {candidate_id} not found.")
 
-        candidate_vec = self._prepare_features(candidate_row)[0].reshape(1, -1)
-        sims = cosine_similarity(candidate_vec, self.opportunity_vectors).flatten()
-        top_idx = np.argsort(sims)[::-1][:top_k]
+        candidate_vec = normalize(self._prepare_features(candidate_row)[0])
+        sims = (self._normalized_vectors @ candidate_vec.T).toarray().ravel()
+        top_idx, _ = _top_k_rows(sims[None, :], top_k)[0]
         matches = [(self.opportunity_ids[i], float(sims[i])) for i in top_idx]
         logger.debug("Matches for candidate %s: %s", candidate_id, matches)
         return matches
 
+    def match_many(self, candidate_ids: List[Any], candidates: pd.DataFrame, top_k: int = 5,
+                   chunk_size: int = 256) -> Dict[Any, List[Tuple[Any, float]]]:
+        """
+        Return the top‑k matching opportunity IDs for many candidates.
+
+        All candidates are transformed in one pass; similarities are computed
+        ``chunk_size`` candidates at a time (one matrix product per chunk, so
+        peak memory is ``chunk_size x n_opportunities`` floats) and the top‑k
+        per row is selected with ``argpartition``.
+
+        Parameters
+        ----------
+        candidate_ids: Identifiers of candidates in the ``candidates`` DataFrame.
+        candidates: DataFrame containing the candidate records (must include ``id``).
+        top_k: Number of matches to return per candidate.
+        chunk_size: Number of candidates scored per matrix product.
+
+        Returns
+        -------
+        Dict mapping each candidate id to the same list :meth:`match` returns.
+        """
+        if self.vectorizer is None:
+            raise RuntimeError("Matcher has not been fitted yet.")
+
+        rows = candidates.drop_duplicates("id").set_index("id", drop=False)
+        missing = [cid for cid in candidate_ids if cid not in rows.index]
+        if missing:
+            raise ValueError(f"Candidates with ids {missing} not found.")
+        features = self._candidate_features(rows.loc[list(candidate_ids)])
+
+        results: Dict[Any, List[Tuple[Any, float]]] = {}
+        for start in range(0, len(candidate_ids), chunk_size):
+            sims = self._similarity_block(features[start:start + chunk_size])
+            for offset, (top_idx, top_sims) in enumerate(_top_k_rows(sims, top_k)):
+                results[candidate_ids[start + offset]] = [
+                    (self.opportunity_ids[i], float(s)) for i, s in zip(top_idx, top_sims)
+                ]
+        return results
+
+    def _candidate_features(self, rows: pd.DataFrame) -> sp.csr_matrix:
+        # match() standardises numeric columns over the single candidate row,
+        # which zeroes them; keep them zero so both paths score identically.
+        tfidf = self.vectorizer.transform(self._prepare_texts(rows)).astype(self.dtype)
+        padding = sp.csr_matrix((tfidf.shape[0], len(self.numeric_columns)), dtype=self.dtype)
+        return normalize(sp.hstack([tfidf, padding], format="csr"))
+
+    def _similarity_block(self, features: sp.csr_matrix) -> np.ndarray:
+        """Cosine similarities, (candidates x opportunities)."""
+        return (features @ self._normalized_vectors.T).toarray()
+
+    def save(self, directory: str) -> None:
+        """
+        Write the fitted state (vocabulary, idf weights, feature matrices and
+        opportunity ids) to ``directory``.
+        """
+        if self.opportunity_vectors is None or self.vectorizer is None:
+            raise RuntimeError("Matcher has not been fitted yet.")
+        os.makedirs(directory, exist_ok=True)
+        _save_vectorizer(directory, self.vectorizer)
+        _write_json(directory, "ids.json", self.opportunity_ids)
+        _write_json(directory, "manifest.json", {
+            "model": type(self).__name__,
+            "dtype": np.dtype(self.dtype).name,
+            "text_column": self.text_column,
+            "numeric_columns": self.numeric_columns,
+            "vectors_shape": _save_csr(directory, "vectors", self.opportunity_vectors),
+            "normalized_shape": _save_csr(directory, "normalized", self._normalized_vectors),
+        })
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "OpportunityMatcher":
+        """
+        Load a matcher written by :meth:`save` without refitting.
+
+        With ``mmap=True`` the feature matrices are memory‑mapped read‑only,
+        so processes loading the same directory share their pages.
+        """
+        manifest = _read_json(directory, "manifest.json")
+        if manifest["model"] != cls.__name__:
+            raise ValueError(f"{directory} contains a {manifest['model']}, not a {cls.__name__}.")
+        dtype = np.dtype(manifest["dtype"]).type
+        matcher = cls(manifest["text_column"], manifest["numeric_columns"], dtype=dtype)
+        matcher.vectorizer = _load_vectorizer(directory, dtype)
+        matcher.opportunity_vectors = _load_csr(directory, "vectors", manifest["vectors_shape"], mmap)
+        matcher._normalized_vectors = _load_csr(directory, "normalized", manifest["normalized_shape"], mmap)
+        matcher.opportunity_ids = _read_json(directory, "ids.json")
+        logger.info("OpportunityMatcher loaded %d opportunities from %s.", len(matcher.opportunity_ids), directory)
+        return matcher
+
+
+
+class IncrementalOpportunityMatcher(OpportunityMatcher):
+    """
+    OpportunityMatcher that ingests opportunities without refitting.
+
+    Text is hashed with a stateless ``HashingVectorizer``; the matcher keeps
+    raw term counts and running document frequencies and applies the
+    (smoothed) idf weights and norms at query time, so scores equal the
+    ``TfidfVectorizer`` scores of :class:`OpportunityMatcher` over the hashed
+    features.  Numeric columns are kept raw with running sums and are
+    standardised at query time over all live rows, as a batch fit would.  ``add_opportunities`` appends a block of rows, which is
+    searchable immediately; blocks are merged into a single matrix by
+    ``compact``, which runs on a background thread once ``compact_every``
+    blocks are pending.
+
+    Re‑adding an id replaces the previous row (tombstoned until
+    ``compact(drop_deleted=True)``), so every upserted notice can be fed in.
+    ``opportunity_ids`` is row‑aligned and includes tombstoned rows.
+
+    Example
+    -------
+    >>> matcher = IncrementalOpportunityMatcher()
+    >>> matcher.fit(opportunities_df, candidates_df)
+    >>> matcher.add_opportunities(new_notices_df)
+    >>> matches = matcher.match(candidate_id=42, candidates=candidates_df, top_k=5)
+    """
+
+    def __init__(self, text_column: str = "description", numeric_columns: Optional[List[str]] = None,
+                 dtype: type = np.float64, n_features: int = 2 ** 18, compact_every: int = 64):
+        super().__init__(text_column, numeric_columns, dtype)
+        self.n_features = n_features
+        self.compact_every = compact_every
+        self.vectorizer = HashingVectorizer(stop_words="english", n_features=n_features,
+                                            alternate_sign=False, norm=None, dtype=dtype)
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self.doc_freq = np.zeros(self.n_features, dtype=np.int64)
+        self.n_docs = 0
+        self.opportunity_ids = []
+        self._id_to_row: Dict[Any, int] = {}
+        # Raw term-count blocks and matching raw numeric blocks;
+        # rows are numbered across blocks in order
+        self._blocks: List[sp.csr_matrix] = []
+        self._numeric: List[np.ndarray] = []
+        # Sum and sum of squares of the live rows' numeric columns
+        self._numeric_sum = np.zeros(len(self.numeric_columns))
+        self._numeric_sq_sum = np.zeros(len(self.numeric_columns))
+        self._deleted = np.zeros(0, dtype=bool)
+        self._version = 0
+        self._idf_cache: Optional[Tuple[int, np.ndarray]] = None
+        self._norm_cache: Optional[Tuple[int, np.ndarray]] = None
+
+    def __len__(self) -> int:
+        return len(self._id_to_row)
+
+    def _count_documents(self, counts: sp.csr_matrix, sign: int = 1) -> None:
+        self.doc_freq += sign * np.bincount(counts.indices, minlength=self.n_features)
+        self.n_docs += sign * counts.shape[0]
+        self._version += 1
+
+    def _count_numeric(self, numeric: np.ndarray, sign: int = 1) -> None:
+        self._numeric_sum += sign * numeric.sum(axis=0)
+        self._numeric_sq_sum += sign * (numeric ** 2).sum(axis=0)
+
+    def _term_counts(self, df: pd.DataFrame) -> sp.csr_matrix:
+        if df.empty:  # HashingVectorizer cannot transform an empty batch
+            return sp.csr_matrix((0, self.n_features), dtype=self.dtype)
+        return self.vectorizer.transform(self._prepare_texts(df)).tocsr()
+
+    def _raw_numeric(self, df: pd.DataFrame) -> np.ndarray:
+        return df[self.numeric_columns].fillna(0).to_numpy(dtype=np.float64)
+
+    def _standardized_numeric(self, numeric_blocks: List[np.ndarray]) -> np.ndarray:
+        """Rows' numeric columns standardised over the live rows, as ``_numeric_features`` does in a batch fit."""
+        raw = np.vstack(numeric_blocks)
+        n_live = max(len(self._id_to_row), 1)
+        mean = self._numeric_sum / n_live
+        std = np.sqrt(np.maximum(self._numeric_sq_sum / n_live - mean ** 2, 0.0))
+        return ((raw - mean) / (std + 1e-8)).astype(self.dtype)
+
+    def fit(self, opportunities: pd.DataFrame, candidates: pd.DataFrame) -> None:
+        """
+        Reset and ingest ``opportunities``; ``candidates`` only contribute
+        document frequencies, as in :meth:`OpportunityMatcher.fit`.
+        """
+        with self._lock:
+            self._reset()
+            self.partial_fit(opportunities, candidates)
+        logger.info("IncrementalOpportunityMatcher fitted with %d opportunities.", len(self))
+
+    def partial_fit(self, opportunities: pd.DataFrame,
+                    candidates: Optional[pd.DataFrame] = None) -> None:
+        """Append ``opportunities`` (and count ``candidates`` towards document frequencies)."""
+        counts = self._term_counts(opportunities)
+        numeric = self._raw_numeric(opportunities)
+        candidate_counts = self._term_counts(candidates) if candidates is not None else None
+        ids = opportunities["id"].tolist()
+
+        with self._lock:
+            if candidate_counts is not None:
+                self._count_documents(candidate_counts)
+            if not ids:
+                return
+            for item_id in ids:
+                if item_id in self._id_to_row:
+                    self.remove_opportunity(item_id)
+            self._count_documents(counts)
+            self._count_numeric(numeric)
+
+            start = len(self.opportunity_ids)
+            for offset, item_id in enumerate(ids):
+                self._id_to_row[item_id] = start + offset
+            self.opportunity_ids = self.opportunity_ids + ids
+            self._deleted = np.concatenate([self._deleted, np.zeros(len(ids), dtype=bool)])
+            self._blocks = self._blocks + [counts]
+            self._numeric = self._numeric + [numeric]
+            if len(self._blocks) > self.compact_every and not (self._compactor and self._compactor.is_alive()):
+                self._compactor = threading.Thread(target=self.compact, name="matcher-compaction", daemon=True)
+                self._compactor.start()
+
+    def add_opportunities(self, opportunities: pd.DataFrame) -> None:
+        """Make new (or updated) opportunities searchable without a refit."""
+        self.partial_fit(opportunities)
+
+    def remove_opportunity(self, opportunity_id: Any) -> bool:
+        """Tombstone an opportunity. Returns False if it is unknown."""
+        with self._lock:
+            row = self._id_to_row.pop(opportunity_id, None)
+            if row is None:
+                return False
+            self._deleted[row] = True
+            for block, numeric in zip(self._blocks, self._numeric):
+                if row < block.shape[0]:
+                    self._count_documents(block[row], sign=-1)
+                    self._count_numeric(numeric[row:row + 1], sign=-1)
+                    break
+                row -= block.shape[0]
+            return True
+
+    @property
+    def counts(self) -> sp.csr_matrix:
+        """All raw term‑count rows (including tombstoned ones) as one CSR matrix."""
+        blocks = self._blocks
+        if not blocks:
+            return sp.csr_matrix((0, self.n_features), dtype=self.dtype)
+        return blocks[0] if len(blocks) == 1 else sp.vstack(blocks, format="csr")
+
+    @property
+    def numeric(self) -> np.ndarray:
+        """All raw (unstandardised) numeric rows, including tombstoned ones."""
+        blocks = self._numeric
+        if not blocks:
+            return np.zeros((0, len(self.numeric_columns)))
+        return blocks[0] if len(blocks) == 1 else np.vstack(blocks)
+
+    def compact(self, drop_deleted: bool = False) -> None:
+        """
+        Merge pending blocks into one matrix.  The merge runs outside the
+        lock, so ingest and queries continue meanwhile; ``drop_deleted``
+        also removes tombstoned rows (renumbering them, under the lock).
+        """
+        with self._compact_lock:
+            with self._lock:
+                blocks, numeric = self._blocks, self._numeric
+            if len(blocks) > 1:
+                merged = sp.vstack(blocks, format="csr")
+                merged_numeric = np.vstack(numeric)
+                with self._lock:
+                    # Blocks appended while merging stay pending
+                    self._blocks = [merged] + self._blocks[len(blocks):]
+                    self._numeric = [merged_numeric] + self._numeric[len(numeric):]
+            if drop_deleted:
+                self._drop_deleted()
+
+    def _drop_deleted(self) -> None:
+        with self._lock:
+            live = np.flatnonzero(~self._deleted)
+            if live.size == len(self._deleted):
+                return
+            self._blocks = [self.counts[live]]
+            self._numeric = [self.numeric[live]]
+            self.opportunity_ids = [self.opportunity_ids[i] for i in live.tolist()]
+            self._id_to_row = {item_id: row for row, item_id in enumerate(self.opportunity_ids)}
+            self._deleted = np.zeros(len(live), dtype=bool)
+            self._norm_cache = None
+
+    def _idf(self) -> np.ndarray:
+        cached = self._idf_cache
+        if cached is None or cached[0] != self._version:
+            idf = (np.log((1 + self.n_docs) / (1 + self.doc_freq)) + 1).astype(self.dtype)
+            self._idf_cache = cached = (self._version, idf)
+        return cached[1]
+
+    def _text_norms(self, blocks: List[sp.csr_matrix], idf: np.ndarray) -> np.ndarray:
+        """L2 norms of the idf‑weighted count rows, cached until the next ingest."""
+        n_rows = sum(block.shape[0] for block in blocks)
+        cached = self._norm_cache
+        if cached is not None and cached[0] == self._version and len(cached[1]) == n_rows:
+            return cached[1]
+        idf_sq = idf ** 2
+        norms = np.sqrt(np.concatenate([block.multiply(block) @ idf_sq for block in blocks]))
+        self._norm_cache = (self._version, norms)
+        return norms
+
+    def similarities(self, counts: sp.spmatrix, numeric: np.ndarray) -> np.ndarray:
+        """
+        Cosine similarity of every opportunity row to each query row.
+
+        Rows are ``[tfidf / ||tfidf||, numeric]`` as in OpportunityMatcher, so
+        ``cos(r, q) = (t_r . t_q + n_r . n_q) / (|r| |q|)``.  Tombstoned rows
+        score ``-inf``.  Returns an (opportunities x queries) array.
+        """
+        with self._lock:
+            blocks, numeric_blocks, deleted = self._blocks, self._numeric, self._deleted
+            idf = self._idf()
+            text_norms = self._text_norms(blocks, idf)
+            row_numeric = self._standardized_numeric(numeric_blocks) if blocks else None
+        if not blocks:
+            return np.zeros((0, counts.shape[0]))
+
+        query_text = normalize(sp.csr_matrix(counts).multiply(idf).tocsr())
+        weights = query_text.multiply(idf).T.tocsr()
+        text = np.vstack([(block @ weights).toarray() for block in blocks])
+        text /= np.where(text_norms > 0, text_norms, 1.0)[:, None]
+        dots = text + row_numeric @ numeric.T
+
+        row_sq = (text_norms > 0) + (row_numeric ** 2).sum(axis=1)
+        query_sq = np.asarray(query_text.getnnz(axis=1) > 0, dtype=np.float64) + (numeric ** 2).sum(axis=1)
+        denom = np.sqrt(np.outer(row_sq, query_sq))
+        sims = np.divide(dots, denom, out=np.zeros_like(dots), where=denom > 0)
+        sims[deleted[:len(sims)]] = -np.inf
+        return sims
+
+    def match(self, candidate_id: Any, candidates: pd.DataFrame, top_k: int = 5) -> List[Tuple[Any, float]]:
+        """Return the top‑k matching opportunity IDs for a given candidate (see OpportunityMatcher.match)."""
+        candidate_row = candidates[candidates["id"] == candidate_id]
+        if candidate_row.empty:
+            raise ValueError(f"Candidate with id {candidate_id} not found.")
+
+        numeric = _numeric_features(candidate_row, self.numeric_columns, self.dtype)
+        sims = self.similarities(self._term_counts(candidate_row), numeric).ravel()
+        top_idx, _ = _top_k_rows(sims[None, :], top_k)[0]
+        matches = [(self.opportunity_ids[i], float(sims[i])) for i in top_idx]
+        logger.debug("Matches for candidate %s: %s", candidate_id, matches)
+        return matches
+
+    def _candidate_features(self, rows: pd.DataFrame) -> sp.csr_matrix:
+        return self._term_counts(rows)
+
+    def _similarity_block(self, features: sp.csr_matrix) -> np.ndarray:
+        numeric = np.zeros((features.shape[0], len(self.numeric_columns)), dtype=self.dtype)
+        return self.similarities(features, numeric).T
+
+    def save(self, directory: str) -> None:
+        """Write compacted counts, numeric features, document frequencies and ids to ``directory``."""
+        self.compact(drop_deleted=True)
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            np.save(os.path.join(directory, "doc_freq.npy"), self.doc_freq)
+            np.save(os.path.join(directory, "numeric.npy"), self.numeric)
+            _write_json(directory, "ids.json", self.opportunity_ids)
+            _write_json(directory, "manifest.json", {
+                "model": type(self).__name__,
+                "dtype": np.dtype(self.dtype).name,
+                "text_column": self.text_column,
+                "numeric_columns": self.numeric_columns,
+                "n_features": self.n_features,
+                "compact_every": self.compact_every,
+                "n_docs": self.n_docs,
+                "counts_shape": _save_csr(directory, "counts", self.counts),
+            })
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "IncrementalOpportunityMatcher":
+        """Load a matcher written by :meth:`save`; the count matrix is memory‑mapped."""
+        manifest = _read_json(directory, "manifest.json")
+        if manifest["model"] != cls.__name__:
+            raise ValueError(f"{directory} contains a {manifest['model']}, not a {cls.__name__}.")
+        matcher = cls(manifest["text_column"], manifest["numeric_columns"],
+                      dtype=np.dtype(manifest["dtype"]).type, n_features=manifest["n_features"],
+                      compact_every=manifest["compact_every"])
+        matcher.doc_freq = np.load(os.path.join(directory, "doc_freq.npy"))
+        matcher.n_docs = manifest["n_docs"]
+        matcher.opportunity_ids = _read_json(directory, "ids.json")
+        matcher._id_to_row = {item_id: row for row, item_id in enumerate(matcher.opportunity_ids)}
+        matcher._deleted = np.zeros(len(matcher.opportunity_ids), dtype=bool)
+        matcher._blocks = [_load_csr(directory, "counts", manifest["counts_shape"], mmap)]
+        matcher._numeric = [_load_array(directory, "numeric", mmap)]
+        matcher._count_numeric(matcher._numeric[0])
+        logger.info("IncrementalOpportunityMatcher loaded %d opportunities from %s.", len(matcher), directory)
+        return matcher
+
+
+class LSHIndex:
+    """
+    Random‑projection (SimHash) LSH index for cosine similarity.
+
+    Each of ``n_tables`` tables hashes an L2‑normalised vector to the sign
+    pattern of ``n_bits`` random projections.  A query collects the rows in
+    its bucket of every table, plus ``n_probes`` neighbouring buckets per
+    table (flipping the bits whose projections were closest to zero), and
+    re‑ranks that candidate set exactly.  ``n_probes`` is the query‑time
+    recall@k knob; more tables or fewer bits raise recall at build time.
+
+    Rows are addressed through an id → row hash map.  Inserts are
+    incremental; deletes are tombstones until ``compact`` is called.
+    """
+
+    def __init__(self, dim: int, n_tables: int = 8, n_bits: int = 8, n_probes: int = 4,
+                 seed: int = 0, dtype: type = np.float32):
+        if not 0 < n_bits < 63:
+            raise ValueError("n_bits must be between 1 and 62.")
+        self.dim = dim
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.n_probes = n_probes
+        self.dtype = dtype
+        rng = np.random.default_rng(seed)
+        self.planes = rng.standard_normal((dim, n_tables * n_bits)).astype(dtype)
+        self._bit_values = np.left_shift(1, np.arange(n_bits, dtype=np.int64))
+
+        self.ids: List[Any] = []
+        self.id_to_row: Dict[Any, int] = {}
+        self.buckets: List[Dict[int, List[int]]] = [{} for _ in range(n_tables)]
+        self._deleted = np.zeros(0, dtype=bool)
+        self._vectors = sp.csr_matrix((0, dim), dtype=dtype)
+        self._pending: List[sp.csr_matrix] = []
+
+    def __len__(self) -> int:
+        return len(self.id_to_row)
+
+    def __contains__(self, item_id: Any) -> bool:
+        return item_id in self.id_to_row
+
+    @property
+    def vectors(self) -> sp.csr_matrix:
+        """L2‑normalised rows, including tombstoned ones."""
+        if self._pending:
+            self._vectors = sp.vstack([self._vectors] + self._pending, format="csr")
+            self._pending = []
+        return self._vectors
+
+    def _project(self, X: sp.csr_matrix) -> np.ndarray:
+        return np.asarray(X @ self.planes).reshape(X.shape[0], self.n_tables, self.n_bits)
+
+    def _codes(self, projections: np.ndarray) -> np.ndarray:
+        return ((projections > 0).astype(np.int64) * self._bit_values).sum(axis=-1)
+
+    def add(self, ids: List[Any], vectors: sp.spmatrix) -> None:
+        """Insert (or replace) items."""
+        X = normalize(sp.csr_matrix(vectors, dtype=self.dtype))
+        if X.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors with {self.dim} features, got {X.shape[1]}.")
+        for item_id in ids:
+            if item_id in self.id_to_row:
+                self.remove(item_id)
+
+        start = len(self.ids)
+        self._fill_buckets(start, self._codes(self._project(X)))
+        for offset, item_id in enumerate(ids):
+            self.id_to_row[item_id] = start + offset
+        self.ids.extend(ids)
+        self._deleted = np.concatenate([self._deleted, np.zeros(len(ids), dtype=bool)])
+        self._pending.append(X)
+
+    def _fill_buckets(self, start: int, codes: np.ndarray) -> None:
+        for t, bucket in enumerate(self.buckets):
+            for offset, code in enumerate(codes[:, t].tolist()):
+                bucket.setdefault(code, []).append(start + offset)
+
+    def remove(self, item_id: Any) -> bool:
+        """Tombstone an item. Returns False if it is not indexed."""
+        row = self.id_to_row.pop(item_id, None)
+        if row is None:
+            return False
+        self._deleted[row] = True
+        return True
+
+    def compact(self) -> None:
+        """Drop tombstoned rows and rebuild the hash tables."""
+        live = np.flatnonzero(~self._deleted)
+        ids = [self.ids[i] for i in live.tolist()]
+        vectors = self.vectors[live]
+        self.ids, self.id_to_row = [], {}
+        self.buckets = [{} for _ in range(self.n_tables)]
+        self._deleted = np.zeros(0, dtype=bool)
+        self._vectors = sp.csr_matrix((0, self.dim), dtype=self.dtype)
+        self._pending = []
+        if ids:
+            self.add(ids, vectors)
+
+    def candidates(self, vector: sp.spmatrix, n_probes: Optional[int] = None) -> np.ndarray:
+        """Live rows sharing a (probed) bucket with ``vector``."""
+        n_probes = self.n_probes if n_probes is None else n_probes
+        projections = self._project(normalize(sp.csr_matrix(vector, dtype=self.dtype)))[0]
+        codes = self._codes(projections)
+        rows: set = set()
+        for t, bucket in enumerate(self.buckets):
+            code = int(codes[t])
+            rows.update(bucket.get(code, ()))
+            # Multi‑probe: flip the least certain bits first
+            for bit in np.argsort(np.abs(projections[t]))[:n_probes].tolist():
+                rows.update(bucket.get(code ^ (1 << bit), ()))
+        found = np.fromiter(rows, dtype=np.int64, count=len(rows))
+        return found[~self._deleted[found]]
+
+    def query(self, vector: sp.spmatrix, k: int,
+              n_probes: Optional[int] = None) -> List[Tuple[Any, float]]:
+        """Approximate top‑k ``(item_id, cosine_similarity)`` pairs, best first."""
+        rows = self.candidates(vector, n_probes)
+        if rows.size == 0:
+            return []
+        q = normalize(sp.csr_matrix(vector, dtype=self.dtype))
+        sims = (self.vectors[rows] @ q.T).toarray().ravel()
+        if rows.size > k:
+            keep = np.argpartition(-sims, k - 1)[:k]
+            rows, sims = rows[keep], sims[keep]
+        order = np.argsort(-sims, kind="stable")
+        return [(self.ids[rows[i]], float(sims[i])) for i in order]
+
+    def save(self, directory: str) -> None:
+        """Write the live rows, their bucket codes and the projection planes."""
+        os.makedirs(directory, exist_ok=True)
+        live = np.flatnonzero(~self._deleted)
+        vectors = self.vectors[live]
+        np.save(os.path.join(directory, "lsh_planes.npy"), self.planes)
+        np.save(os.path.join(directory, "lsh_codes.npy"), self._codes(self._project(vectors)))
+        _write_json(directory, "lsh_ids.json", [self.ids[i] for i in live.tolist()])
+        _write_json(directory, "lsh.json", {
+            "dim": self.dim, "n_tables": self.n_tables, "n_bits": self.n_bits,
+            "n_probes": self.n_probes, "dtype": np.dtype(self.dtype).name,
+            "vectors_shape": _save_csr(directory, "lsh_vectors", vectors),
+        })
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "LSHIndex":
+        """Load an index written by :meth:`save`; rows are not re‑hashed."""
+        meta = _read_json(directory, "lsh.json")
+        index = cls(meta["dim"], meta["n_tables"], meta["n_bits"], meta["n_probes"],
+                    dtype=np.dtype(meta["dtype"]).type)
+        index.planes = _load_array(directory, "lsh_planes", mmap)
+        index.ids = _read_json(directory, "lsh_ids.json")
+        index.id_to_row = {item_id: row for row, item_id in enumerate(index.ids)}
+        index._deleted = np.zeros(len(index.ids), dtype=bool)
+        index._vectors = _load_csr(directory, "lsh_vectors", meta["vectors_shape"], mmap)
+        index._fill_buckets(0, np.load(os.path.join(directory, "lsh_codes.npy")))
+        return index
+
 
 class RecommendationEngine:
     """
@@ -113,14 +749,37 @@ class RecommendationEngine:
 
     The engine learns a vector representation for items (e.g., products,
     opportunities) and can recommend similar items for a given item ID.
+    ``backend="exact"`` computes brute‑force distances against the item
+    matrix in place (so a memory‑mapped matrix is never copied);
+    ``backend="lsh"`` uses an in‑process :class:`LSHIndex`, which supports
+    incremental inserts and deletes without a refit.
     """
 
-    def __init__(self, n_neighbors: int = 10, metric: str = "cosine"):
+    def __init__(self, n_neighbors: int = 10, metric: str = "cosine", dtype: type = np.float64,
+                 backend: str = "exact", lsh_params: Optional[Dict[str, Any]] = None):
+        if backend not in ("exact", "lsh"):
+            raise ValueError("backend must be 'exact' or 'lsh'.")
+        if backend == "lsh" and metric != "cosine":
+            raise ValueError("The lsh backend only supports the cosine metric.")
         self.n_neighbors = n_neighbors
         self.metric = metric
-        self.model: Optional[NearestNeighbors] = None
+        self.dtype = dtype
+        self.backend = backend
+        self.lsh_params = lsh_params or {}
+        self.index: Optional[LSHIndex] = None
+        self.vectorizer: Optional[TfidfVectorizer] = None
+        self.text_column = "description"
+        self.numeric_columns: List[str] = []
         self.item_ids: List[Any] = []
-        self.item_vectors: Optional[np.ndarray] = None
+        self.item_vectors: Optional[sp.csr_matrix] = None
+        self._id_to_row: Dict[Any, int] = {}
+
+    def _transform(self, items: pd.DataFrame) -> sp.csr_matrix:
+        tfidf = self.vectorizer.transform(items[self.text_column].fillna("").astype(str))
+        return _append_numeric(tfidf, items, self.numeric_columns, self.dtype)
+
+    def _build_exact(self) -> None:
+        self._id_to_row = {item_id: i for i, item_id in enumerate(self.item_ids)}
 
     def fit(self, items: pd.DataFrame, text_column: str = "description",
             numeric_columns: Optional[List[str]] = None) -> None:
@@ -133,23 +792,51 @@ class RecommendationEngine:
         text_column: Column containing free‑text description.
         numeric_columns: Optional list of numeric feature columns.
         """
-        vectorizer = TfidfVectorizer(stop_words="english", max_features=5000)
-        tfidf = vectorizer.fit_transform(items[text_column].fillna("").astype(str))
+        self.text_column = text_column
+        self.numeric_columns = numeric_columns or []
+        self.vectorizer = TfidfVectorizer(stop_words="english", max_features=5000, dtype=self.dtype)
+        self.vectorizer.fit(items[text_column].fillna("").astype(str))
+        vectors = self._transform(items)
+        ids = items["id"].tolist()
 
-        if numeric_columns:
-            numeric = items[numeric_columns].fillna(0).to_numpy()
-            numeric = (numeric - numeric.mean(axis=0)) / (numeric.std(axis=0) + 1e-8)
-            vectors = np.hstack([tfidf.toarray(), numeric])
+        if self.backend == "lsh":
+            self.index = LSHIndex(vectors.shape[1], dtype=self.dtype, **self.lsh_params)
+            self.index.add(ids, vectors)
         else:
-            vectors = tfidf.toarray()
+            self.item_ids = ids
+            self.item_vectors = vectors
+            self._build_exact()
+        logger.info("RecommendationEngine fitted on %d items.", len(ids))
 
-        self.model = NearestNeighbors(n_neighbors=self.n_neighbors,
-                                      metric=self.metric,
-                                      algorithm="auto")
-        self.model.fit(vectors)
-        self.item_ids = items["id"].tolist()
-        self.item_vectors = vectors
-        logger.info("RecommendationEngine fitted on %d items.", len(self.item_ids))
+    def add_items(self, items: pd.DataFrame) -> None:
+        """Add (or replace) items using the fitted vocabulary."""
+        if self.vectorizer is None:
+            raise RuntimeError("RecommendationEngine has not been fitted yet.")
+        vectors = self._transform(items)
+        ids = items["id"].tolist()
+        if self.backend == "lsh":
+            self.index.add(ids, vectors)
+            return
+        for item_id in ids:
+            if item_id in self._id_to_row:
+                self.remove_item(item_id)
+        self.item_ids = self.item_ids + ids
+        self.item_vectors = sp.vstack([self.item_vectors, vectors], format="csr")
+        self._build_exact()
+
+    def remove_item(self, item_id: Any) -> bool:
+        """Remove an item. Returns False if it is unknown."""
+        if self.backend == "lsh":
+            return self.index.remove(item_id) if self.index is not None else False
+        idx = self._id_to_row.get(item_id)
+        if idx is None:
+            return False
+        keep = np.ones(len(self.item_ids), dtype=bool)
+        keep[idx] = False
+        self.item_ids = [i for i, k in zip(self.item_ids, keep) if k]
+        self.item_vectors = self.item_vectors[keep]
+        self._build_exact()
+        return True
 
     def recommend(self, item_id: Any, top_k: Optional[int] = None) -> List[Tuple[Any, float]]:
         """
@@ -164,25 +851,88 @@ class RecommendationEngine:
         -------
         List of tuples ``(recommended_item_id, distance)`` sorted by increasing distance.
         """
-        if self.model is None or self.item_vectors is None:
+        if self.item_vectors is None and self.index is None:
             raise RuntimeError("RecommendationEngine has not been fitted yet.")
 
-        try:
-            idx = self.item_ids.index(item_id)
-        except ValueError as exc:
-            raise ValueError(f"Item id {item_id} not found in fitted data.") from exc
+        k = top_k or self.n_neighbors
+        if self.backend == "lsh":
+            idx = self.index.id_to_row.get(item_id)
+            if idx is None:
+                raise ValueError(f"Item id {item_id} not found in fitted data.")
+            hits = self.index.query(self.index.vectors[idx], k)
+            recs = [(other, 1.0 - sim) for other, sim in hits if other != item_id]
+            logger.debug("Recommendations for item %s: %s", item_id, recs)
+            return recs
 
-        vector = self.item_vectors[idx].reshape(1, -1)
-        distances, indices = self.model.kneighbors(vector, n_neighbors=top_k or self.n_neighbors)
+        idx = self._id_to_row.get(item_id)
+        if idx is None:
+            raise ValueError(f"Item id {item_id} not found in fitted data.")
+
+        distances = pairwise_distances(self.item_vectors[idx], self.item_vectors, metric=self.metric)[0]
+        k = min(k, len(self.item_ids))
+        nearest = np.argpartition(distances, k - 1)[:k] if k < len(distances) else np.arange(len(distances))
+        indices = nearest[np.argsort(distances[nearest], kind="stable")]
         # Exclude the query item itself (distance == 0)
         recs = []
-        for dist, i in zip(distances[0], indices[0]):
+        for dist, i in zip(distances[indices], indices):
             if i == idx:
                 continue
             recs.append((self.item_ids[i], float(dist)))
         logger.debug("Recommendations for item %s: %s", item_id, recs)
         return recs
 
+    def save(self, directory: str) -> None:
+        """
+        Write the fitted state (vocabulary, idf weights, item vectors or LSH
+        index, and item ids) to ``directory``.
+        """
+        if self.vectorizer is None:
+            raise RuntimeError("RecommendationEngine has not been fitted yet.")
+        os.makedirs(directory, exist_ok=True)
+        _save_vectorizer(directory, self.vectorizer)
+        manifest = {
+            "model": type(self).__name__,
+            "dtype": np.dtype(self.dtype).name,
+            "n_neighbors": self.n_neighbors,
+            "metric": self.metric,
+            "backend": self.backend,
+            "lsh_params": self.lsh_params,
+            "text_column": self.text_column,
+            "numeric_columns": self.numeric_columns,
+        }
+        if self.backend == "lsh":
+            self.index.save(directory)
+        else:
+            _write_json(directory, "ids.json", self.item_ids)
+            manifest["vectors_shape"] = _save_csr(directory, "vectors", self.item_vectors)
+        _write_json(directory, "manifest.json", manifest)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "RecommendationEngine":
+        """
+        Load an engine written by :meth:`save` without refitting.
+
+        With ``mmap=True`` the item vectors are memory‑mapped read‑only, so
+        processes loading the same directory share their pages.
+        """
+        manifest = _read_json(directory, "manifest.json")
+        if manifest["model"] != cls.__name__:
+            raise ValueError(f"{directory} contains a {manifest['model']}, not a {cls.__name__}.")
+        dtype = np.dtype(manifest["dtype"]).type
+        engine = cls(manifest["n_neighbors"], manifest["metric"], dtype=dtype,
+                     backend=manifest["backend"], lsh_params=manifest["lsh_params"])
+        engine.text_column = manifest["text_column"]
+        engine.numeric_columns = manifest["numeric_columns"]
+        engine.vectorizer = _load_vectorizer(directory, dtype)
+        if engine.backend == "lsh":
+            engine.index = LSHIndex.load(directory, mmap)
+        else:
+            engine.item_ids = _read_json(directory, "ids.json")
+            engine.item_vectors = _load_csr(directory, "vectors", manifest["vectors_shape"], mmap)
+            engine._build_exact()
+        logger.info("RecommendationEngine loaded from %s.", directory)
+        return engine
+
 
 class OpenAISummary:
     """
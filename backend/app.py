@@ -31,6 +31,12 @@ async def lifespan(app: FastAPI):
         print("[Sturgeon AI] Background scheduler started")
     except Exception as e:
         print(f"[Sturgeon AI] Scheduler start failed (non-fatal): {e}")
+    try:
+        from services.db_async import load_opportunity_index
+        indexed = await load_opportunity_index()
+        print(f"[Sturgeon AI] Match index loaded: {indexed} active opportunities")
+    except Exception as e:
+        print(f"[Sturgeon AI] Match index load failed (non-fatal): {e}")
     yield
     # Shutdown
     try:
@@ -38,6 +44,11 @@ async def lifespan(app: FastAPI):
         stop_scheduler()
     except Exception:
         pass
+    try:
+        from services.db_async import aclose
+        await aclose()
+    except Exception:
+        pass
     print("[Sturgeon AI] Backend shutting down")
 
 
@@ -0,0 +1,136 @@
+"""
+Benchmark: dense vs sparse OpportunityMatcher / RecommendationEngine.
+
+Each mode runs in a fresh subprocess so peak RSS is measured in isolation.
+
+    python benchmarks/bench_ai_engine.py --opportunities 100000
+"""
+import os
+import sys
+import time
+import json
+import argparse
+import resource
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+MODES = ["dense", "sparse-float64", "sparse-float32"]
+VOCAB = (
+    "cloud cybersecurity software data ai ml infrastructure network system application "
+    "janitorial hvac logistics training support maintenance engineering design research "
+    "consulting facilities management program analysis modernization migration security "
+    "devops agile testing helpdesk operations integration architecture compliance audit"
+).split()
+
+
+def synthetic_frames(n_opportunities: int, n_candidates: int, seed: int = 0):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    extra = [f"term{i}" for i in range(20000)]
+    words = np.array(VOCAB + extra)
+    weights = np.concatenate([np.full(len(VOCAB), 50.0), np.ones(len(extra))])
+    weights /= weights.sum()
+
+    def frame(prefix, n):
+        texts = [" ".join(rng.choice(words, size=40, p=weights)) for _ in range(n)]
+        return pd.DataFrame({
+            "id": [f"{prefix}_{i}" for i in range(n)],
+            "description": texts,
+            "years_experience": rng.integers(0, 20, n),
+            "location_score": rng.random(n),
+        })
+
+    return frame("opp", n_opportunities), frame("cand", n_candidates)
+
+
+def run_dense(opportunities, candidates, queries):
+    """The pre-sparse implementation: tfidf.toarray() + dense cosine_similarity."""
+    import numpy as np
+    import pandas as pd
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    numeric_columns = ["years_experience", "location_score"]
+
+    def features(vectorizer, df):
+        tfidf = vectorizer.transform(df["description"].fillna("").astype(str).tolist())
+        numeric = df[numeric_columns].fillna(0).to_numpy()
+        numeric = (numeric - numeric.mean(axis=0)) / (numeric.std(axis=0) + 1e-8)
+        return np.hstack([tfidf.toarray(), numeric])
+
+    started = time.perf_counter()
+    corpus = pd.concat([opportunities, candidates], ignore_index=True)
+    vectorizer = TfidfVectorizer(stop_words="english", max_features=5000)
+    vectorizer.fit(corpus["description"].fillna("").astype(str).tolist())
+    vectors = features(vectorizer, opportunities)
+    fit_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for cid in queries:
+        row = candidates[candidates["id"] == cid]
+        sims = cosine_similarity(features(vectorizer, row)[0].reshape(1, -1), vectors).flatten()
+        np.argsort(sims)[::-1][:10]
+    match_s = (time.perf_counter() - started) / len(queries)
+    return fit_s, match_s
+
+
+def run_sparse(opportunities, candidates, queries, dtype):
+    import numpy as np
+    from ai_engine import OpportunityMatcher
+
+    matcher = OpportunityMatcher(numeric_columns=["years_experience", "location_score"],
+                                 dtype=getattr(np, dtype))
+    started = time.perf_counter()
+    matcher.fit(opportunities, candidates)
+    fit_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for cid in queries:
+        matcher.match(cid, candidates, top_k=10)
+    match_s = (time.perf_counter() - started) / len(queries)
+    return fit_s, match_s
+
+
+def child(mode: str, n_opportunities: int) -> None:
+    import logging
+    logging.disable(logging.INFO)
+    opportunities, candidates = synthetic_frames(n_opportunities, 200)
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queries = candidates["id"].tolist()[:20]
+    if mode == "dense":
+        fit_s, match_s = run_dense(opportunities, candidates, queries)
+    else:
+        fit_s, match_s = run_sparse(opportunities, candidates, queries, mode.split("-")[1])
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"mode": mode, "fit_s": fit_s, "match_ms": match_s * 1000,
+                      "peak_rss_mb": peak_kb / 1024, "delta_rss_mb": (peak_kb - baseline_kb) / 1024}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--opportunities", type=int, default=20000)
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.opportunities)
+        return
+
+    print(f"{'mode':<16}{'fit (s)':>10}{'match (ms)':>12}{'peak RSS (MB)':>15}{'fit+match ΔRSS (MB)':>22}")
+    for mode in args.modes:
+        out = subprocess.run([sys.executable, __file__, "--child", mode,
+                              "--opportunities", str(args.opportunities)],
+                             capture_output=True, text=True)
+        if out.returncode != 0:
+            print(f"{mode:<16} failed: {out.stderr.strip().splitlines()[-1:]}")
+            continue
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"{mode:<16}{r['fit_s']:>10.2f}{r['match_ms']:>12.2f}{r['peak_rss_mb']:>15.0f}{r['delta_rss_mb']:>22.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark: route throughput with the sync vs the async Supabase helpers.
+
+A local stand-in for PostgREST answers every request after --latency-ms.
+Two copies of the notifications listing route run against it under
+--concurrency concurrent clients on one event loop, i.e. one worker:
+
+- sync:  services.db helpers called from ``async def``, as before
+- async: services.db_async helpers, both queries awaited together
+
+    python benchmarks/bench_db_async.py --requests 400 --concurrency 32 --latency-ms 20
+"""
+import os
+import sys
+import time
+import socket
+import asyncio
+import argparse
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def fake_postgrest(latency_s: float):
+    """ASGI app that answers any PostgREST call with an empty result after ``latency_s``."""
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        await asyncio.sleep(latency_s)
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"application/json"), (b"content-range", b"*/0")]})
+        await send({"type": "http.response.body", "body": b"[]"})
+    return app
+
+
+def serve(port: int, latency_s: float) -> None:
+    import uvicorn
+
+    uvicorn.run(fake_postgrest(latency_s), port=port, log_level="error", backlog=4096)
+
+
+def start_server(latency_s: float) -> str:
+    """Run the stand-in in its own process so it does not compete for this one's GIL."""
+    import httpx
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    multiprocessing.Process(target=serve, args=(port, latency_s), daemon=True).start()
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(500):
+        try:
+            httpx.get(url)
+            return url
+        except httpx.TransportError:
+            time.sleep(0.01)
+    raise RuntimeError("stand-in PostgREST server did not start")
+
+
+async def drive(app, path: str, requests: int, concurrency: int) -> float:
+    import httpx
+
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+
+    async def client(http):
+        while not queue.empty():
+            queue.get_nowait()
+            response = await http.get(path)
+            response.raise_for_status()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        started = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(concurrency)))
+        return requests / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    # services.db reads its settings at import time
+    os.environ["SUPABASE_URL"] = start_server(args.latency_ms / 1000)
+    os.environ["SUPABASE_SERVICE_ROLE_KEY"] = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.bench"
+    from fastapi import FastAPI
+
+    from services import db, db_async
+
+    app = FastAPI()
+
+    @app.get("/sync")
+    async def list_notifications_sync():
+        notifications = db.get_notifications("u1", limit=50)
+        unread_count = db.get_unread_notification_count("u1")
+        return {"notifications": notifications, "unread_count": unread_count}
+
+    @app.get("/async")
+    async def list_notifications_async():
+        notifications, unread_count = await asyncio.gather(
+            db_async.get_notifications("u1", limit=50),
+            db_async.get_unread_notification_count("u1"),
+        )
+        return {"notifications": notifications, "unread_count": unread_count}
+
+    async def run():
+        results = {}
+        for name in ("sync", "async"):
+            await drive(app, f"/{name}", args.concurrency, args.concurrency)  # warm up connections
+            results[name] = await drive(app, f"/{name}", args.requests, args.concurrency)
+        await db_async.aclose()
+        return results
+
+    results = asyncio.run(run())
+    print(f"{args.requests} requests, concurrency {args.concurrency}, "
+          f"{args.latency_ms:.0f} ms per PostgREST call, 2 calls per request")
+    print(f"{'helpers':<10}{'req/s':>10}")
+    for name, rps in results.items():
+        print(f"{name:<10}{rps:>10.1f}")
+    print(f"speedup   {results['async'] / results['sync']:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
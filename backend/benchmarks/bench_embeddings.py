@@ -0,0 +1,111 @@
+"""
+Benchmark: embedding ingest throughput and semantic_search latency, offline.
+
+Embeddings come from the deterministic local hashing provider, so no
+network access or API key is needed. The provider can be switched with
+--provider. N synthetic proposals are written to a database, a temporary
+SQLite file by default or --database-url. The script then times:
+
+- ingest: rebuild_all_embeddings from scratch (chunking, embedding, writes)
+- re-ingest: the same rebuild again, served from the embedding cache
+- queries: semantic_search p50/p99 per ranking mode, uncached
+
+    python benchmarks/bench_embeddings.py --proposals 2000 --queries 200
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+SECTIONS = ["Technical Approach", "Management Plan", "Past Performance", "Staffing", "Quality Control"]
+
+
+def synthetic_proposals(n: int, words_per_proposal: int, n_topics: int = 50, seed: int = 0):
+    """Proposal texts drawn from topic vocabularies, with section headings and identifiers."""
+    rng = np.random.default_rng(seed)
+    vocab = np.array([f"w{i}" for i in range(20000)])
+    topic_words = [rng.choice(len(vocab), size=120, replace=False) for _ in range(n_topics)]
+    texts = []
+    for i in range(n):
+        topic = topic_words[rng.integers(n_topics)]
+        section_words = np.array_split(vocab[rng.choice(topic, size=words_per_proposal)], len(SECTIONS))
+        body = "\n\n".join(f"{title}\n" + " ".join(words) for title, words in zip(SECTIONS, section_words))
+        texts.append(f"Proposal for solicitation W912DY-24-R-{i:05d}\n\n{body}")
+    return texts
+
+
+def percentiles(samples_ms):
+    return np.percentile(samples_ms, 50), np.percentile(samples_ms, 99)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--proposals", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=1200, help="words per proposal")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--provider", default="hashing")
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    # The provider is chosen when services.embeddings_ai is imported
+    os.environ["EMBEDDING_PROVIDER"] = args.provider
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    import services.embeddings_ai as embeddings_ai
+    from database import Base
+    from models.embeddings import EmbeddingCache, EmbeddingRecord, SemanticSearchCache
+    from models.proposal import Proposal
+
+    url = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/bench_embeddings.db"
+    engine = create_engine(url)
+    tables = [Proposal.__table__, EmbeddingRecord.__table__, EmbeddingCache.__table__,
+              SemanticSearchCache.__table__]
+    Base.metadata.drop_all(engine, tables=tables)
+    Base.metadata.create_all(engine, tables=tables)
+    db = sessionmaker(bind=engine)()
+
+    texts = synthetic_proposals(args.proposals, args.words)
+    db.add_all(Proposal(id=f"p{i}", name=f"Proposal {i}", user_id=f"u{i % 20}", raw_text=text)
+               for i, text in enumerate(texts))
+    db.commit()
+
+    started = time.perf_counter()
+    embeddings_ai.rebuild_all_embeddings(db=db)
+    ingest_s = time.perf_counter() - started
+    passages = db.query(EmbeddingRecord).count()
+    started = time.perf_counter()
+    embeddings_ai.rebuild_all_embeddings(db=db)
+    reingest_s = time.perf_counter() - started
+
+    print(f"\n{args.proposals} proposals, {passages} passages, provider={args.provider} "
+          f"({embeddings_ai.DEFAULT_EMBEDDING_MODEL}), {engine.dialect.name}")
+    print(f"{'ingest':<12}{ingest_s:>8.2f}s{args.proposals / ingest_s:>10.0f} proposals/s"
+          f"{passages / ingest_s:>10.0f} passages/s")
+    print(f"{'re-ingest':<12}{reingest_s:>8.2f}s{args.proposals / reingest_s:>10.0f} proposals/s (cached)")
+
+    rng = np.random.default_rng(1)
+    queries = [" ".join(rng.choice(texts[t].split(), size=6)) for t in rng.integers(args.proposals, size=args.queries)]
+    for mode in ("vector", "keyword", "hybrid"):
+        # One untimed query loads the in-process indexes
+        embeddings_ai.semantic_search(queries[0], top_k=args.k, use_cache=False, db=db, mode=mode)
+        latencies = []
+        for query in queries:
+            started = time.perf_counter()
+            embeddings_ai.semantic_search(query, top_k=args.k, use_cache=False, db=db, mode=mode)
+            latencies.append((time.perf_counter() - started) * 1000)
+        p50, p99 = percentiles(latencies)
+        print(f"{'query ' + mode:<20}p50 {p50:>7.2f} ms   p99 {p99:>7.2f} ms")
+
+    db.close()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
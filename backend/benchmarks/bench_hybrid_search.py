@@ -0,0 +1,104 @@
+"""
+Benchmark: vector-only, BM25-only and hybrid (RRF) passage retrieval.
+
+Synthetic passages are drawn from topic vocabularies and each cites a
+solicitation number, NAICS code and agency acronym. Two query sets are
+timed and scored by hit@k / MRR of the passage they were generated from:
+
+- semantic: a noisy copy of the passage vector plus a few of its words
+- identifier: the solicitation number alone, whose embedding carries no
+  topic signal (modelled as a random vector)
+
+    python benchmarks/bench_hybrid_search.py --passages 20000 --queries 300
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.hybrid_search import BM25Index, reciprocal_rank_fusion  # noqa: E402
+from services.vector_store import VectorStore  # noqa: E402
+
+AGENCIES = ["DISA", "USACE", "NAVSEA", "GSA", "DHS", "VA", "NASA", "DLA"]
+NAICS = ["541511", "541512", "541330", "561720", "236220", "541715", "518210", "561210"]
+
+
+def synthetic_corpus(n: int, dim: int, n_topics: int = 100, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    vocab = np.array([f"w{i}" for i in range(20000)])
+    topic_words = [rng.choice(len(vocab), size=80, replace=False) for _ in range(n_topics)]
+    centroids = rng.standard_normal((n_topics, dim))
+    texts, vectors, solicitations = [], np.empty((n, dim), dtype=np.float32), []
+    for i in range(n):
+        topic = rng.integers(n_topics)
+        solicitation = f"W{rng.integers(100, 999)}{chr(65 + i % 26)}{chr(65 + i // 26 % 26)}-24-R-{i:05d}"
+        words = " ".join(vocab[rng.choice(topic_words[topic], size=40)])
+        texts.append(f"{words} solicitation {solicitation} NAICS {rng.choice(NAICS)} {rng.choice(AGENCIES)}")
+        vectors[i] = centroids[topic] + 0.6 * rng.standard_normal(dim)
+        solicitations.append(solicitation)
+    return texts, vectors, solicitations
+
+
+def evaluate(name, search, queries, k):
+    hits, reciprocal_ranks = 0, 0.0
+    started = time.perf_counter()
+    results = [search(text, vector) for text, vector, _ in queries]
+    elapsed_ms = (time.perf_counter() - started) * 1000 / len(queries)
+    for ranking, (_, _, target) in zip(results, queries):
+        ids = [doc_id for doc_id, _ in ranking[:k]]
+        if target in ids:
+            hits += 1
+            reciprocal_ranks += 1.0 / (ids.index(target) + 1)
+    print(f"{name:<12}{hits / len(queries):>10.3f}{reciprocal_ranks / len(queries):>10.3f}{elapsed_ms:>12.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--passages", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--noise", type=float, default=3.0, help="query vector noise, per dimension")
+    args = parser.parse_args()
+
+    texts, vectors, solicitations = synthetic_corpus(args.passages, args.dim)
+    ids = [f"p{i}" for i in range(args.passages)]
+
+    started = time.perf_counter()
+    store = VectorStore()
+    store.add_many((doc_id, vector, "opportunity", None) for doc_id, vector in zip(ids, vectors))
+    vector_s = time.perf_counter() - started
+    started = time.perf_counter()
+    index = BM25Index()
+    index.add_many((doc_id, text, "opportunity", None) for doc_id, text in zip(ids, texts))
+    bm25_s = time.perf_counter() - started
+
+    rng = np.random.default_rng(1)
+    targets = rng.choice(args.passages, size=args.queries, replace=False)
+    semantic = [
+        (" ".join(rng.choice(texts[t].split()[:40], size=3)),
+         vectors[t] + args.noise * rng.standard_normal(args.dim), ids[t])
+        for t in targets
+    ]
+    identifier = [(solicitations[t], rng.standard_normal(args.dim), ids[t]) for t in targets]
+
+    n = args.k * 4  # passages ranked per method before fusion, as in semantic_search
+    methods = {
+        "vector": lambda text, vector: store.search(vector, n),
+        "bm25": lambda text, vector: index.search(text, n),
+        "hybrid": lambda text, vector: reciprocal_rank_fusion([index.search(text, n), store.search(vector, n)]),
+    }
+    print(f"{args.passages} passages, dim={args.dim}, k={args.k} "
+          f"(build: vectors {vector_s:.2f}s, bm25 {bm25_s:.2f}s)")
+    for label, queries in (("semantic queries", semantic), ("identifier queries", identifier)):
+        print(f"\n{label}\n{'method':<12}{'hit@k':>10}{'MRR':>10}{'ms/query':>12}")
+        for name, search in methods.items():
+            evaluate(name, search, queries, args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: LSH recall@k and latency against exact cosine neighbours.
+
+    python benchmarks/bench_recommendations.py --items 50000 --queries 200
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+from sklearn.preprocessing import normalize
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from ai_engine import LSHIndex, RecommendationEngine  # noqa: E402
+
+
+def clustered_items(n: int, n_topics: int = 200, seed: int = 0):
+    """Synthetic notices drawn from topic-specific vocabularies, like real SAM.gov text."""
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    vocab = np.array([f"w{i}" for i in range(30000)])
+    topics = [rng.choice(len(vocab), size=60, replace=False) for _ in range(n_topics)]
+    texts = []
+    for _ in range(n):
+        topic = topics[rng.integers(n_topics)]
+        words = np.concatenate([vocab[rng.choice(topic, size=30)], rng.choice(vocab, size=10)])
+        texts.append(" ".join(words))
+    return pd.DataFrame({"id": [f"item_{i}" for i in range(n)], "description": texts})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--tables", type=int, default=8)
+    parser.add_argument("--bits", type=int, default=8)
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.INFO)
+
+    items = clustered_items(args.items)
+    engine = RecommendationEngine(n_neighbors=args.k, dtype=np.float32)
+    engine.fit(items)
+    vectors = normalize(engine.item_vectors)
+    rng = np.random.default_rng(1)
+    queries = rng.choice(vectors.shape[0], size=args.queries, replace=False)
+
+    started = time.perf_counter()
+    exact = []
+    for q in queries:
+        sims = (vectors @ vectors[q].T).toarray().ravel()
+        exact.append(set(np.argpartition(-sims, args.k - 1)[:args.k].tolist()))
+    exact_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+    started = time.perf_counter()
+    index = LSHIndex(vectors.shape[1], n_tables=args.tables, n_bits=args.bits)
+    index.add(list(range(vectors.shape[0])), vectors)
+    build_s = time.perf_counter() - started
+
+    print(f"{args.items} items, k={args.k}, {args.tables} tables x {args.bits} bits "
+          f"(build {build_s:.2f}s)")
+    print(f"{'method':<18}{'recall@k':>10}{'ms/query':>10}{'candidates':>12}")
+    print(f"{'exact (brute)':<18}{1.0:>10.3f}{exact_ms:>10.2f}{vectors.shape[0]:>12}")
+    for n_probes in (0, 1, 2, 4, 8):
+        hits, scanned = 0, 0
+        started = time.perf_counter()
+        for q, truth in zip(queries, exact):
+            found = index.query(vectors[q], args.k, n_probes=n_probes)
+            hits += len(truth & {row for row, _ in found})
+        elapsed_ms = (time.perf_counter() - started) * 1000 / len(queries)
+        for q in queries[:20]:
+            scanned += index.candidates(vectors[q], n_probes).size
+        recall = hits / (len(queries) * args.k)
+        print(f"{'lsh probes=' + str(n_probes):<18}{recall:>10.3f}{elapsed_ms:>10.2f}"
+              f"{scanned // min(20, len(queries)):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Short-lived cache of opportunity totals per filter set.
+
+``GET /api/opportunities`` reports how many opportunities match its
+filters. The total arrives with the first page and is reused for the
+following pages of the same filter set, so paging never recounts. Entries
+live for OPPORTUNITY_COUNT_TTL_SECONDS. An opportunity upsert in this
+process clears the cache; in other workers a total is at most that stale.
+"""
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+OPPORTUNITY_COUNT_TTL_SECONDS = float(os.getenv("OPPORTUNITY_COUNT_TTL_SECONDS", "30"))
+OPPORTUNITY_COUNT_MAX_ENTRIES = int(os.getenv("OPPORTUNITY_COUNT_MAX_ENTRIES", "1024"))
+
+
+def count_key(filters: Dict[str, Any], mode: str) -> str:
+    """Order-insensitive key of a filter set and count mode; empty filters are ignored."""
+    return json.dumps([mode, sorted((k, v) for k, v in (filters or {}).items() if v)])
+
+
+class CountCache:
+    """In-process LRU of (filters, count mode) -> total with a TTL."""
+
+    def __init__(self, ttl_seconds: float = OPPORTUNITY_COUNT_TTL_SECONDS,
+                 max_entries: int = OPPORTUNITY_COUNT_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, filters: Dict[str, Any], mode: str = "exact") -> Optional[int]:
+        """The cached total, or None. An exact total also answers an estimated lookup."""
+        now = time.monotonic()
+        with self._lock:
+            for key in dict.fromkeys([count_key(filters, mode), count_key(filters, "exact")]):
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if entry[1] <= now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                return entry[0]
+        return None
+
+    def set(self, filters: Dict[str, Any], mode: str, total: int) -> None:
+        key = count_key(filters, mode)
+        with self._lock:
+            self._entries[key] = (total, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+opportunity_counts = CountCache()
@@ -0,0 +1,168 @@
+"""
+Incremental embedding refresh.
+
+Replaces the nightly full rebuild. Each source (proposals, opportunities) is
+read in (updated_at, id) order with keyset pagination, starting after the
+high-water mark stored in ``embedding_refresh_checkpoints``. Each page is
+embedded through the embedding cache, with provider requests spread over a
+bounded worker pool. The page's rows and the advanced checkpoint are
+committed in one transaction, so an interrupted run resumes after the last
+committed page.
+
+Rows updated within the last EMBED_REFRESH_LAG_SECONDS are left for the next
+run. A transaction that commits late with an older ``updated_at`` would
+otherwise land behind the watermark and never be picked up.
+"""
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple, NamedTuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+
+from models.embeddings import EmbeddingRefreshCheckpoint
+
+EMBED_REFRESH_PAGE_SIZE = int(os.getenv("EMBED_REFRESH_PAGE_SIZE", "512"))
+EMBED_REFRESH_WORKERS = int(os.getenv("EMBED_REFRESH_WORKERS", "4"))
+EMBED_REFRESH_LAG_SECONDS = float(os.getenv("EMBED_REFRESH_LAG_SECONDS", "60"))
+
+Keyset = Tuple[str, str]  # (ISO updated_at, id) of the last row processed
+
+
+class ChangedRow(NamedTuple):
+    updated_at: str
+    id: str
+    user_id: Optional[str]
+    text: str
+    proposal_id: Optional[str] = None
+    metadata: Optional[dict] = None
+
+
+class ProposalSource:
+    """Proposals from the SQLAlchemy database, embedded from generated or raw text."""
+
+    source_type = "proposal"
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def fetch_page(self, after: Optional[Keyset], before: str, limit: int) -> List[ChangedRow]:
+        from models.proposal import Proposal
+
+        query = self.db.query(
+            Proposal.id, Proposal.user_id, Proposal.updated_at, Proposal.generated_text, Proposal.raw_text
+        ).filter(
+            Proposal.updated_at.isnot(None),
+            Proposal.updated_at < _parse_naive(before)
+        )
+        if after:
+            query = query.filter(
+                tuple_(Proposal.updated_at, Proposal.id) > tuple_(_parse_naive(after[0]), after[1])
+            )
+        rows = query.order_by(Proposal.updated_at, Proposal.id).limit(limit).all()
+        return [
+            ChangedRow(updated_at.isoformat(), proposal_id, user_id, generated_text or raw_text or "", proposal_id)
+            for proposal_id, user_id, updated_at, generated_text, raw_text in rows
+        ]
+
+
+class OpportunitySource:
+    """Opportunities from Supabase, embedded from title and description."""
+
+    source_type = "opportunity"
+
+    def fetch_page(self, after: Optional[Keyset], before: str, limit: int) -> List[ChangedRow]:
+        from services.db import list_opportunities_changed_since
+
+        return [
+            ChangedRow(
+                row["updated_at"], str(row["id"]), None,
+                "\n\n".join(part for part in (row.get("title"), row.get("description")) if part),
+                metadata={"title": row.get("title"), "agency": row.get("agency"),
+                          "naics_code": row.get("naics_code")}
+            )
+            for row in list_opportunities_changed_since(after, before, limit)
+        ]
+
+
+def _parse_naive(timestamp: str) -> datetime:
+    """ISO timestamp as naive UTC, matching the ``proposals.updated_at`` column."""
+    value = datetime.fromisoformat(timestamp)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _checkpoint(db: Session, source_type: str) -> EmbeddingRefreshCheckpoint:
+    checkpoint = db.get(EmbeddingRefreshCheckpoint, source_type)
+    if checkpoint is None:
+        checkpoint = EmbeddingRefreshCheckpoint(source_type=source_type, rows_embedded=0)
+        db.add(checkpoint)
+    return checkpoint
+
+
+def refresh_source(
+    db: Session,
+    source,
+    page_size: int = EMBED_REFRESH_PAGE_SIZE,
+    max_workers: int = EMBED_REFRESH_WORKERS,
+    lag_seconds: float = EMBED_REFRESH_LAG_SECONDS,
+    now: Optional[datetime] = None
+) -> int:
+    """
+    Embed the rows of ``source`` changed since its checkpoint.
+
+    Returns the number of embeddings written. If a page fails, the exception
+    propagates with the checkpoint still at the last committed page.
+    """
+    from services.embeddings_ai import store_embeddings
+
+    before = ((now or datetime.now(timezone.utc)) - timedelta(seconds=lag_seconds)).isoformat()
+    checkpoint = _checkpoint(db, source.source_type)
+    after = (checkpoint.watermark_at, checkpoint.watermark_id) if checkpoint.watermark_at else None
+
+    written = 0
+    try:
+        while True:
+            rows = source.fetch_page(after, before, page_size)
+            if not rows:
+                break
+            items = [
+                {"user_id": row.user_id, "text": row.text, "source_type": source.source_type,
+                 "source_id": row.id, "proposal_id": row.proposal_id, "metadata": row.metadata}
+                for row in rows if row.text.strip()
+            ]
+            # The checkpoint rides along in the same commit as the page's rows
+            after = (rows[-1].updated_at, rows[-1].id)
+            checkpoint.watermark_at, checkpoint.watermark_id = after
+            checkpoint.rows_embedded = (checkpoint.rows_embedded or 0) + len(items)
+            store_embeddings(db, items, max_concurrency=max_workers)
+            written += len(items)
+            if len(rows) < page_size:
+                break
+    except Exception:
+        db.rollback()
+        raise
+    return written
+
+
+def refresh_embeddings(db: Session, sources=None, **options) -> dict:
+    """
+    Run ``refresh_source`` for every source (proposals and opportunities by
+    default). A failing source is logged and does not stop the others.
+    Returns embeddings written per source type.
+    """
+    if sources is None:
+        sources = [ProposalSource(db), OpportunitySource()]
+
+    counts = {}
+    for source in sources:
+        started = time.perf_counter()
+        try:
+            counts[source.source_type] = refresh_source(db, source, **options)
+            print(f"[EmbeddingRefresh] {source.source_type}: {counts[source.source_type]} embeddings "
+                  f"in {time.perf_counter() - started:.1f}s")
+        except Exception as e:
+            print(f"[EmbeddingRefresh] {source.source_type} failed, will resume from checkpoint: {e}")
+    return counts
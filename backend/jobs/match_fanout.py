@@ -0,0 +1,117 @@
+"""
+Nightly "new matches" fan-out.
+
+Scores every company profile against the opportunities imported by the
+latest SAM.gov sync. The users x opportunities matrix is split into tiles
+that run in a process pool; each tile builds one OpportunityBlock and
+re-scores it for every profile in the tile, and the per-user top matches
+are written back in bulk. Scores include the opportunity's own NAICS code
+(``naics_alignment``). The pool is driven from a worker thread and the
+database calls are async, so the scheduler's event loop keeps serving
+requests while the job runs.
+
+Users read their stored matches from GET /api/opportunities/user/matches.
+"""
+import os
+import time
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Any, Tuple
+
+from match_engine import OpportunityBlock, TopKMatcher, company_profile
+
+MATCHES_PER_USER = int(os.getenv("MATCH_FANOUT_TOP_K", "10"))
+USERS_PER_TILE = int(os.getenv("MATCH_FANOUT_USERS_PER_TILE", "250"))
+OPPORTUNITIES_PER_TILE = int(os.getenv("MATCH_FANOUT_OPPS_PER_TILE", "2000"))
+MAX_WORKERS = int(os.getenv("MATCH_FANOUT_WORKERS", str(os.cpu_count() or 2)))
+
+Profile = Tuple[str, List[str], List[str]]
+
+
+def score_tile(profiles: List[Profile], opportunities: List[Dict[str, Any]],
+               top_k: int) -> Dict[str, List[Dict[str, Any]]]:
+    """Top matches per user for one tile. Runs inside a worker process."""
+    block = OpportunityBlock(opportunities)
+    tile_matches = {}
+    for user_id, naics_codes, certifications in profiles:
+        matcher = TopKMatcher(naics_codes, certifications, top_k, naics_alignment=True)
+        matcher.add_opportunity_block(block)
+        tile_matches[user_id] = matcher.results()
+    return tile_matches
+
+
+def _chunks(items: List[Any], size: int) -> List[List[Any]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _fan_out(profiles: List[Profile], opportunities: List[Dict[str, Any]],
+             top_k: int, max_workers: int) -> Dict[str, List[Dict[str, Any]]]:
+    user_tiles = _chunks(profiles, USERS_PER_TILE)
+    opp_tiles = _chunks(opportunities, OPPORTUNITIES_PER_TILE)
+    if not user_tiles or not opp_tiles:
+        return {}
+
+    merged: Dict[str, List[Dict[str, Any]]] = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(score_tile, users, opps, top_k) for users in user_tiles for opps in opp_tiles]
+        # Tiles are merged in submission order, i.e. opportunity order per user
+        for future in futures:
+            for user_id, matches in future.result().items():
+                merged.setdefault(user_id, []).extend(matches)
+
+    return {
+        user_id: sorted(matches, key=lambda m: m["match_score"], reverse=True)[:top_k]
+        for user_id, matches in merged.items()
+    }
+
+
+async def fan_out_matches(profiles: List[Profile], opportunities: List[Dict[str, Any]],
+                          top_k: int = MATCHES_PER_USER,
+                          max_workers: int = MAX_WORKERS) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Score all profiles x opportunities in a process pool, off the event loop.
+
+    Returns the ``top_k`` matches per user. Opportunity tiles are merged in
+    order with a stable sort, so ties rank exactly as in match_opportunities.
+    """
+    return await asyncio.to_thread(_fan_out, profiles, opportunities, top_k, max_workers)
+
+
+async def run_new_match_fanout(opportunities: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Match newly synced opportunities against every company and store the top matches."""
+    print(f"[Jobs] Starting new-match fan-out at {datetime.utcnow()}")
+
+    try:
+        from services.db_async import list_company_profiles, upsert_opportunity_matches
+
+        profiles = [company_profile(c) for c in await list_company_profiles() if c.get("user_id")]
+        pairs = len(profiles) * len(opportunities)
+        if not pairs:
+            print("[Jobs] New-match fan-out skipped: no profiles or no new opportunities")
+            return {"pairs": 0, "written": 0}
+
+        started = time.perf_counter()
+        matches = await fan_out_matches(profiles, opportunities)
+        elapsed = time.perf_counter() - started
+
+        rows = [
+            {
+                "user_id": user_id,
+                "opportunity_id": m["opportunity_id"],
+                "match_score": m["match_score"],
+                "reasons": m["reasons"],
+                "component_scores": m["component_scores"],
+            }
+            for user_id, user_matches in matches.items()
+            for m in user_matches
+        ]
+        written = await upsert_opportunity_matches(rows)
+
+        rate = pairs / elapsed if elapsed > 0 else float("inf")
+        print(f"[Jobs] New-match fan-out complete: {pairs} pairs scored in {elapsed:.2f}s "
+              f"({rate:,.0f} pairs/s), {written} matches written for {len(matches)} users")
+        return {"pairs": pairs, "seconds": elapsed, "pairs_per_second": rate, "written": written}
+    except Exception as e:
+        print(f"[Jobs] New-match fan-out error: {e}")
+        return {"pairs": 0, "written": 0, "error": str(e)}
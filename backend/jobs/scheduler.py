@@ -30,6 +30,7 @@ async def sync_sam_opportunities():
         )
 
         imported = 0
+        synced = []
         for opp in result.get("opportunities", []):
             if not opp.get("id"):
                 continue
@@ -46,12 +47,18 @@ async def sync_sam_opportunities():
                 "source": "SAM.gov",
                 "status": "active",
             }
-            upsert_opportunity(data)
+            row = upsert_opportunity(data)
+            if row:
+                synced.append(row)
             imported += 1
 
         print(f"[Jobs] SAM.gov sync complete: {imported} opportunities imported")
     except Exception as e:
         print(f"[Jobs] SAM.gov sync error: {e}")
+        return
+
+    from jobs.match_fanout import run_new_match_fanout
+    await run_new_match_fanout(synced)
 
 
 async def send_deadline_reminders():
@@ -146,14 +153,18 @@ async def archive_expired_opportunities():
 
     try:
         from services.db import supabase
+        from match_index import opportunity_index
 
         today = datetime.utcnow().isoformat()
-        supabase.table("opportunities") \
+        result = supabase.table("opportunities") \
             .update({"status": "archived"}) \
             .eq("status", "active") \
             .lt("response_deadline", today) \
             .execute()
 
+        for row in (result.data or []):
+            opportunity_index.remove(row["id"])
+
         print("[Jobs] Expired opportunities archived")
     except Exception as e:
         print(f"[Jobs] Archive error: {e}")
@@ -0,0 +1,245 @@
+"""
+Match-result cache for the opportunity match engine.
+
+Entries are keyed by (profile hash, opportunity id, opportunity updated_at),
+where the profile hash also covers match_engine.MATCH_SCORING_VERSION, so a
+scoring change or a changed opportunity simply misses and a reloaded matches page only
+scores what actually changed. The in-memory backend is an LRU bounded by an
+approximate byte budget; the Redis backend shares entries across workers.
+Both keep reverse indexes so ``upsert_company`` / ``upsert_opportunity`` can
+drop exactly the entries they make unreachable.
+"""
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict, Counter
+from typing import List, Dict, Any, Optional, Tuple, Set
+
+import numpy as np
+
+from match_engine import MATCH_SCORING_VERSION, CompiledProfile, OpportunityBlock
+
+MATCH_CACHE_MAX_BYTES = int(os.getenv("MATCH_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+MATCH_CACHE_TTL_SECONDS = int(os.getenv("MATCH_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+EntryKey = Tuple[str, str, str]  # (profile_hash, opportunity_id, version)
+
+
+def profile_hash(naics_codes: List[str], certifications: List[str]) -> str:
+    """
+    Stable hash of the profile fields that affect match scores
+    (order-insensitive) and of the scoring version that produced them.
+    """
+    payload = json.dumps([MATCH_SCORING_VERSION, sorted(naics_codes or []), sorted(certifications or [])])
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def opportunity_version(opportunity: Dict[str, Any]) -> str:
+    return str(opportunity.get('updated_at') or '')
+
+
+class MemoryMatchCache:
+    """In-process LRU cache with a memory cap and per-profile/per-opportunity indexes."""
+
+    def __init__(self, max_bytes: int = MATCH_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self._entries: "OrderedDict[EntryKey, Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self._by_profile: Dict[str, Set[EntryKey]] = {}
+        self._by_opportunity: Dict[str, Set[EntryKey]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_many(self, keys: List[EntryKey]) -> List[Optional[Dict[str, Any]]]:
+        found = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                found.append(entry[0] if entry else None)
+        return found
+
+    def set_many(self, items: List[Tuple[EntryKey, Dict[str, Any]]]) -> None:
+        with self._lock:
+            for key, value in items:
+                size = len(json.dumps(value)) + 256  # rough per-entry overhead
+                if key in self._entries:
+                    self._drop(key)
+                self._entries[key] = (value, size)
+                self.size_bytes += size
+                self._by_profile.setdefault(key[0], set()).add(key)
+                self._by_opportunity.setdefault(key[1], set()).add(key)
+            while self.size_bytes > self.max_bytes and self._entries:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: EntryKey) -> None:
+        _, size = self._entries.pop(key)
+        self.size_bytes -= size
+        for index, field in ((self._by_profile, key[0]), (self._by_opportunity, key[1])):
+            keys = index.get(field)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del index[field]
+
+    def invalidate_profile(self, phash: str) -> int:
+        with self._lock:
+            keys = list(self._by_profile.get(phash, ()))
+            for key in keys:
+                self._drop(key)
+        return len(keys)
+
+    def invalidate_opportunity(self, opportunity_id: str) -> int:
+        with self._lock:
+            keys = list(self._by_opportunity.get(str(opportunity_id), ()))
+            for key in keys:
+                self._drop(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_profile.clear()
+            self._by_opportunity.clear()
+            self.size_bytes = 0
+
+
+class RedisMatchCache:
+    """
+    Redis-backed cache sharing entries across workers and replicas.
+
+    Eviction under memory pressure is left to Redis (``maxmemory-policy
+    allkeys-lru``); entries also carry a TTL so orphaned index sets age out.
+    """
+
+    def __init__(self, client, prefix: str = "match", ttl: int = MATCH_CACHE_TTL_SECONDS):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def _key(self, key: EntryKey) -> str:
+        return f"{self.prefix}:{key[0]}:{key[1]}:{key[2]}"
+
+    def get_many(self, keys: List[EntryKey]) -> List[Optional[Dict[str, Any]]]:
+        if not keys:
+            return []
+        raw = self.client.mget([self._key(k) for k in keys])
+        return [json.loads(v) if v is not None else None for v in raw]
+
+    def set_many(self, items: List[Tuple[EntryKey, Dict[str, Any]]]) -> None:
+        if not items:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        for key, value in items:
+            redis_key = self._key(key)
+            pipe.set(redis_key, json.dumps(value), ex=self.ttl)
+            for index_key in (f"{self.prefix}:profile:{key[0]}", f"{self.prefix}:opp:{key[1]}"):
+                pipe.sadd(index_key, redis_key)
+                pipe.expire(index_key, self.ttl)
+        pipe.execute()
+
+    def _invalidate(self, index_key: str) -> int:
+        keys = self.client.smembers(index_key)
+        pipe = self.client.pipeline(transaction=False)
+        if keys:
+            pipe.delete(*keys)
+        pipe.delete(index_key)
+        pipe.execute()
+        return len(keys)
+
+    def invalidate_profile(self, phash: str) -> int:
+        return self._invalidate(f"{self.prefix}:profile:{phash}")
+
+    def invalidate_opportunity(self, opportunity_id: str) -> int:
+        return self._invalidate(f"{self.prefix}:opp:{opportunity_id}")
+
+
+class MatchCache:
+    """
+    Front-end used by the app: wraps a backend and tracks which profile hash
+    each user currently has, so a company update only drops entries that no
+    other user can still hit.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else MemoryMatchCache()
+        self._user_profiles: Dict[str, str] = {}
+        self._profile_users: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def remember_user(self, user_id: str, phash: str) -> None:
+        with self._lock:
+            previous = self._user_profiles.get(user_id)
+            if previous == phash:
+                return
+            self._user_profiles[user_id] = phash
+            self._profile_users[phash] += 1
+        if previous:
+            self._release(previous)
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Call when a user's company profile changes."""
+        with self._lock:
+            previous = self._user_profiles.pop(user_id, None)
+        if previous:
+            self._release(previous)
+
+    def _release(self, phash: str) -> None:
+        with self._lock:
+            self._profile_users[phash] -= 1
+            still_used = self._profile_users[phash] > 0
+            if not still_used:
+                del self._profile_users[phash]
+        if not still_used:
+            self.backend.invalidate_profile(phash)
+
+    def invalidate_opportunity(self, opportunity_id: str) -> None:
+        """Call when an opportunity is upserted; its old-version entries become unreachable."""
+        self.backend.invalidate_opportunity(str(opportunity_id))
+
+    def match_opportunities(self, opportunities: List[Dict[str, Any]],
+                            naics_codes: List[str], certifications: List[str],
+                            user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Same result as ``match_engine.match_opportunities``; only cache misses
+        are scored, in a single batch.
+        """
+        phash = profile_hash(naics_codes, certifications)
+        if user_id:
+            self.remember_user(user_id, phash)
+
+        keys = [(phash, str(opp['id']), opportunity_version(opp)) for opp in opportunities]
+        results = self.backend.get_many(keys)
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            profile = CompiledProfile(naics_codes, certifications)
+            block = OpportunityBlock([opportunities[i] for i in missing])
+            scores = profile.score(block)
+            fresh = []
+            for row, i in enumerate(missing):
+                results[i] = profile.result(block, scores, row)
+                fresh.append((keys[i], results[i]))
+            self.backend.set_many(fresh)
+
+        scores = np.array([r['match_score'] for r in results], dtype=np.float64)
+        order = np.argsort(-scores, kind='stable')
+        return [results[i] for i in order.tolist()]
+
+
+def _default_backend():
+    redis_url = os.getenv("REDIS_URL")
+    if os.getenv("MATCH_CACHE_BACKEND", "memory").lower() == "redis" and redis_url:
+        try:
+            from redis import Redis
+            return RedisMatchCache(Redis.from_url(redis_url))
+        except Exception as e:
+            print(f"[Sturgeon AI] WARNING: Redis match cache unavailable: {e}. Using in-memory cache.")
+    return MemoryMatchCache()
+
+
+match_cache = MatchCache(_default_backend())
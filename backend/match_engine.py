@@ -3,50 +3,195 @@ AI-powered matching module for government contract opportunities.
 Matches company profiles with opportunities based on NAICS codes, certifications, and other factors.
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, NamedTuple, Iterable, AsyncIterable, Optional, Union, Tuple
+from collections import Counter
+from functools import lru_cache
+import bisect
+import heapq
 import re
 
-def calculate_naics_match(opportunity_tags: List[str], company_naics: List[str]) -> float:
+import numpy as np
+
+# Common NAICS to keyword mapping
+NAICS_KEYWORDS: Dict[str, List[str]] = {
+    '541511': ['software', 'development', 'programming', 'custom', 'application'],
+    '541512': ['computer', 'systems', 'design', 'integration', 'consulting'],
+    '541513': ['computer', 'facilities', 'management', 'services'],
+    '541519': ['technology', 'consulting', 'IT', 'information'],
+    '541330': ['engineering', 'technical', 'design'],
+    '561210': ['facilities', 'support', 'management'],
+    '541614': ['management', 'consulting', 'business'],
+    '541715': ['research', 'development', 'R&D', 'scientific'],
+}
+
+# Technical keywords that indicate good matches
+TECH_KEYWORDS: List[str] = ['cloud', 'cybersecurity', 'software', 'data', 'ai', 'ml',
+                            'infrastructure', 'network', 'system', 'application']
+
+# Part of every match-cache key (match_cache.py). Bump it whenever the scores
+# for an unchanged profile and opportunity change, so cached results expire.
+MATCH_SCORING_VERSION = 2
+
+# Opt-in (``naics_alignment=True``) NAICS score floor when the opportunity's own
+# code aligns with a company code: the same code, the same 4-digit industry
+# group or the same 3-digit subsector. Off by default, so existing callers keep
+# their scores; the nightly fan-out turns it on.
+NAICS_ALIGNMENT_SCORES: List[Tuple[int, float]] = [(6, 100.0), (4, 70.0), (3, 55.0)]
+
+
+def company_profile(company: Dict[str, Any]) -> Tuple[str, List[str], List[str]]:
+    """
+    (user_id, naics_codes, certifications) for a companies row. Certifications
+    are SDVOSB when ``sdvosb_certified`` plus the type of every active
+    embedded ``certification_documents`` row.
+    """
+    certifications = ["SDVOSB"] if company.get("sdvosb_certified") else []
+    for document in company.get("certification_documents") or []:
+        cert = (document.get("document_type") or "").strip()
+        if cert and document.get("status", "active") == "active" and cert not in certifications:
+            certifications.append(cert)
+    return str(company["user_id"]), company.get("naics_codes") or [], certifications
+
+
+def opportunity_tags(opportunity: Dict[str, Any]) -> List[str]:
+    """
+    Tags scored against the NAICS keyword groups: ``tags`` when given,
+    otherwise the ``keywords`` column of an opportunities row.
+    """
+    return opportunity.get('tags') or opportunity.get('keywords') or []
+
+
+def naics_alignment_score(opportunity_naics: Optional[str], company_naics: List[str]) -> float:
+    """Best NAICS_ALIGNMENT_SCORES entry for the opportunity's NAICS code, or 0."""
+    code = (opportunity_naics or '').strip()
+    best = 0.0
+    for company_code in company_naics or []:
+        company_code = company_code.strip()
+        for digits, score in NAICS_ALIGNMENT_SCORES:
+            if len(code) >= digits and len(company_code) >= digits and code[:digits] == company_code[:digits]:
+                best = max(best, score)
+                break
+    return best
+
+
+# ── Compiled keyword matching ─────────────────────────────────────────
+
+class KeywordMatcher:
+    """
+    Multi-pattern substring matcher compiled from named keyword groups.
+
+    Keywords are lower-cased and de-duplicated once per table, and texts are
+    lower-cased once per scan, instead of once per (keyword, tag) pair.
+    Many short texts (tags, or a block of descriptions) are joined into a
+    single buffer and each distinct keyword is located with its own C-level
+    ``str.find`` sweep; after a hit the sweep jumps to the next segment.
+
+    A scan therefore costs O(len(text) x keywords) character work plus
+    Python-level work per (segment, keyword) hit. The tables here have a few
+    dozen keywords, where these sweeps beat a combined trie regex (Python's
+    ``re`` has no multi-literal automaton and pays per text position); a
+    table with hundreds of keywords would want an Aho-Corasick automaton.
+    Results are identical to ``keyword.lower() in text.lower()``.
+    """
+
+    SEPARATOR = '\n'
+
+    def __init__(self, groups: Dict[str, List[str]]):
+        self.group_names: List[str] = list(groups)
+        self.keywords: List[str] = sorted({kw.lower() for kws in groups.values() for kw in kws})
+        index = {kw: i for i, kw in enumerate(self.keywords)}
+
+        # keyword x group multiplicity, so duplicated keywords count per occurrence
+        self.group_counts = np.zeros((len(self.keywords), len(self.group_names)))
+        for g, kws in enumerate(groups.values()):
+            for kw in kws:
+                self.group_counts[index[kw.lower()], g] += 1
+        self._memberships = [
+            [(name, int(count)) for name, count in zip(self.group_names, row) if count]
+            for row in self.group_counts.tolist()
+        ]
+
+    def find(self, text: str) -> List[int]:
+        """Indices of keywords occurring anywhere in ``text``."""
+        text = text.lower()
+        return [i for i, kw in enumerate(self.keywords) if kw in text]
+
+    def scan(self, *texts: str) -> Dict[str, int]:
+        """Hit counts per keyword group, summed over one or more texts."""
+        counts = dict.fromkeys(self.group_names, 0)
+        for text in texts:
+            for k in self.find(text):
+                for name, count in self._memberships[k]:
+                    counts[name] += count
+        return counts
+
+    def segment_hits(self, segments: List[str]) -> np.ndarray:
+        """
+        Hit counts per (segment, group) for many texts scanned as one buffer.
+
+        A keyword found several times in one segment counts once for it.
+        """
+        hits = np.zeros((len(segments), len(self.group_names)))
+        if not segments or not self.keywords:
+            return hits
+
+        # Lower-case per segment first: lower() can change a string's length
+        segments = [seg.lower() for seg in segments]
+        # Exclusive end offset (separator included) of each segment
+        ends = np.cumsum([len(seg) + 1 for seg in segments]).tolist()
+        joined = self.SEPARATOR.join(segments)
+
+        seg_idx: List[int] = []
+        kw_idx: List[int] = []
+        for k, kw in enumerate(self.keywords):
+            pos = joined.find(kw)
+            while pos != -1:
+                owner = bisect.bisect_right(ends, pos)
+                seg_idx.append(owner)
+                kw_idx.append(k)
+                pos = joined.find(kw, ends[owner])
+        if seg_idx:
+            np.add.at(hits, seg_idx, self.group_counts[kw_idx])
+        return hits
+
+
+@lru_cache(maxsize=32)
+def _compiled_matcher(groups: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> KeywordMatcher:
+    return KeywordMatcher({name: list(kws) for name, kws in groups})
+
+
+def keyword_matcher(groups: Dict[str, List[str]]) -> KeywordMatcher:
+    """Return the compiled matcher for a keyword table, compiling it once per table."""
+    return _compiled_matcher(tuple((name, tuple(kws)) for name, kws in groups.items()))
+
+
+def calculate_naics_match(opportunity_tags: List[str], company_naics: List[str],
+                          opportunity_naics: Optional[str] = None) -> float:
     """
     Calculate match score based on NAICS codes.
-    Returns a score between 0-100.
+    Returns a score between 0-100. Passing ``opportunity_naics`` opts in to
+    the NAICS_ALIGNMENT_SCORES floor.
     """
     if not company_naics:
         return 0.0
 
-    # Common NAICS to keyword mapping
-    naics_keywords = {
-        '541511': ['software', 'development', 'programming', 'custom', 'application'],
-        '541512': ['computer', 'systems', 'design', 'integration', 'consulting'],
-        '541513': ['computer', 'facilities', 'management', 'services'],
-        '541519': ['technology', 'consulting', 'IT', 'information'],
-        '541330': ['engineering', 'technical', 'design'],
-        '561210': ['facilities', 'support', 'management'],
-        '541614': ['management', 'consulting', 'business'],
-        '541715': ['research', 'development', 'R&D', 'scientific'],
-    }
-
+    alignment = naics_alignment_score(opportunity_naics, company_naics)
     score = 0.0
-    relevant_keywords = []
-
-    for naics in company_naics:
-        if naics in naics_keywords:
-            relevant_keywords.extend(naics_keywords[naics])
+    relevant_naics = [naics for naics in company_naics if naics in NAICS_KEYWORDS]
 
-    if not relevant_keywords:
-        return 30.0  # Base score if NAICS not in our mapping
+    if not relevant_naics:
+        return max(30.0, alignment)  # Base score if NAICS not in our mapping
 
     # Check how many keywords match the opportunity tags
-    matches = sum(1 for keyword in relevant_keywords 
-                  for tag in opportunity_tags 
-                  if keyword.lower() in tag.lower())
+    per_group = keyword_matcher(NAICS_KEYWORDS).scan(*opportunity_tags)
+    matches = sum(per_group[naics] for naics in relevant_naics)
 
     if matches > 0:
         score = min(100.0, 40.0 + (matches * 15.0))
     else:
         score = 30.0
 
-    return score
+    return max(score, alignment)
 
 def calculate_certification_match(certifications: List[str]) -> float:
     """
@@ -77,11 +222,7 @@ def calculate_keyword_relevance(opportunity_desc: str, opportunity_title: str,
     """
     combined_text = f"{opportunity_title} {opportunity_desc}".lower()
 
-    # Technical keywords that indicate good matches
-    tech_keywords = ['cloud', 'cybersecurity', 'software', 'data', 'ai', 'ml', 
-                     'infrastructure', 'network', 'system', 'application']
-
-    matches = sum(1 for keyword in tech_keywords if keyword in combined_text)
+    matches = keyword_matcher({'tech': TECH_KEYWORDS}).scan(combined_text)['tech']
     return min(20.0, matches * 4.0)
 
 def generate_match_reasons(naics_score: float, cert_score: float, 
@@ -116,20 +257,24 @@ def generate_match_reasons(naics_score: float, cert_score: float,
     return reasons[:4]  # Return top 4 reasons
 
 def match_opportunity(opportunity: Dict[str, Any], naics_codes: List[str], 
-                     certifications: List[str]) -> Dict[str, Any]:
+                     certifications: List[str], naics_alignment: bool = False) -> Dict[str, Any]:
     """
     Match a single opportunity against company profile.
 
     Args:
-        opportunity: Dict with id, title, description, tags, etc.
+        opportunity: Dict with id, title, description, naics_code, tags or keywords, etc.
         naics_codes: List of company NAICS codes
         certifications: List of company certifications
+        naics_alignment: Also score the opportunity's own naics_code against
+            the company codes (NAICS_ALIGNMENT_SCORES)
 
     Returns:
         Dict with opportunity_id, match_score, and reasons
     """
     # Calculate component scores
-    naics_score = calculate_naics_match(opportunity.get('tags', []), naics_codes)
+    tags = opportunity_tags(opportunity)
+    naics_score = calculate_naics_match(tags, naics_codes,
+                                        opportunity.get('naics_code') if naics_alignment else None)
     cert_score = calculate_certification_match(certifications)
     keyword_score = calculate_keyword_relevance(
         opportunity.get('description', ''),
@@ -142,8 +287,7 @@ def match_opportunity(opportunity: Dict[str, Any], naics_codes: List[str],
     final_score = (naics_score * 0.60) + (cert_score * 0.25) + (keyword_score * 0.15)
 
     # Generate reasons
-    reasons = generate_match_reasons(naics_score, cert_score, keyword_score, 
-                                     opportunity.get('tags', []))
+    reasons = generate_match_reasons(naics_score, cert_score, keyword_score, tags)
 
     return {
         'opportunity_id': str(opportunity['id']),
@@ -156,9 +300,267 @@ def match_opportunity(opportunity: Dict[str, Any], naics_codes: List[str],
         }
     }
 
+# ── Batch scoring engine ──────────────────────────────────────────────
+
+class OpportunityBlock:
+    """
+    Column-oriented view over a list of opportunity dicts.
+
+    Everything that does not depend on the company profile (lower-cased
+    text, the tag and NAICS code vocabularies, keyword relevance) is computed once here so a
+    block can be re-scored against many profiles cheaply.
+    """
+
+    def __init__(self, opportunities: List[Dict[str, Any]]):
+        self.ids: List[str] = []
+        self.tags: List[List[str]] = []
+        self.texts: List[str] = []
+
+        vocab: Dict[str, int] = {}
+        tag_codes: List[int] = []
+        tag_counts: List[int] = []
+        naics_vocab: Dict[str, int] = {}
+        naics_codes: List[int] = []
+
+        for opp in opportunities:
+            tags = opportunity_tags(opp)
+            naics_codes.append(naics_vocab.setdefault((opp.get('naics_code') or '').strip(), len(naics_vocab)))
+            self.ids.append(str(opp['id']))
+            self.tags.append(tags)
+            self.texts.append(f"{opp.get('title', '')} {opp.get('description', '')}".lower())
+            for tag in tags:
+                tag_codes.append(vocab.setdefault(tag.lower(), len(vocab)))
+            tag_counts.append(len(tags))
+
+        self.tag_vocab: List[str] = list(vocab)
+        self.tag_codes = np.asarray(tag_codes, dtype=np.int64)
+        self.tag_owner = np.repeat(np.arange(len(self.ids)), tag_counts)
+        self.naics_vocab: List[str] = list(naics_vocab)
+        self.naics_codes = np.asarray(naics_codes, dtype=np.int64)
+        self._keyword_scores = None
+        self._tag_group_hits = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def keyword_scores(self) -> np.ndarray:
+        """Keyword relevance (0-20) for every opportunity in the block."""
+        if self._keyword_scores is None:
+            hits = keyword_matcher({'tech': TECH_KEYWORDS}).segment_hits(self.texts)
+            self._keyword_scores = np.minimum(20.0, hits[:, 0] * 4.0)
+        return self._keyword_scores
+
+    @property
+    def tag_group_hits(self) -> np.ndarray:
+        """NAICS keyword-group hit counts for every distinct tag in the block."""
+        if self._tag_group_hits is None:
+            self._tag_group_hits = keyword_matcher(NAICS_KEYWORDS).segment_hits(self.tag_vocab)
+        return self._tag_group_hits
+
+
+class BlockScores(NamedTuple):
+    """Per-opportunity component and final scores for an OpportunityBlock."""
+    naics: np.ndarray
+    certifications: np.ndarray
+    keywords: np.ndarray
+    total: np.ndarray
+
+
+class CompiledProfile:
+    """
+    A company profile compiled once for scoring many opportunities.
+
+    Produces exactly the same component scores as ``calculate_naics_match``,
+    ``calculate_certification_match`` and ``calculate_keyword_relevance``
+    (``match_opportunity`` with the same ``naics_alignment``).
+    """
+
+    def __init__(self, naics_codes: List[str], certifications: List[str],
+                 naics_alignment: bool = False):
+        self.has_naics = bool(naics_codes)
+        self.naics_codes = list(naics_codes or [])
+        self.naics_alignment = naics_alignment
+        # Weight of each NAICS keyword group; repeated codes count per occurrence,
+        # as in calculate_naics_match
+        codes = Counter(naics_codes or [])
+        self.group_weights = np.array(
+            [codes[naics] for naics in keyword_matcher(NAICS_KEYWORDS).group_names],
+            dtype=np.float64,
+        )
+        self.cert_score = calculate_certification_match(certifications)
+
+    def naics_scores(self, block: OpportunityBlock) -> np.ndarray:
+        n = len(block)
+        if not self.has_naics:
+            return np.zeros(n)
+        alignment = np.zeros(n)
+        if self.naics_alignment:
+            alignment = np.array([naics_alignment_score(code, self.naics_codes) for code in block.naics_vocab],
+                                 dtype=np.float64)[block.naics_codes]
+        if not self.group_weights.any():
+            return np.maximum(30.0, alignment)
+
+        per_tag = (block.tag_group_hits @ self.group_weights)[block.tag_codes]
+        matches = np.bincount(block.tag_owner, weights=per_tag, minlength=n)
+        scores = np.where(matches > 0, np.minimum(100.0, 40.0 + (matches * 15.0)), 30.0)
+        return np.maximum(scores, alignment)
+
+    def score(self, block: OpportunityBlock) -> BlockScores:
+        """Score every opportunity in ``block`` against this profile."""
+        naics = self.naics_scores(block)
+        certs = np.full(len(block), self.cert_score)
+        keywords = block.keyword_scores
+        # NAICS: 60%, Certifications: 25%, Keywords: 15%
+        total = (naics * 0.60) + (certs * 0.25) + (keywords * 0.15)
+        return BlockScores(naics, certs, keywords, total)
+
+    def result(self, block: OpportunityBlock, scores: BlockScores, i: int) -> Dict[str, Any]:
+        """Build the ``match_opportunity`` result dict for row ``i``."""
+        naics_score = float(scores.naics[i])
+        cert_score = float(scores.certifications[i])
+        keyword_score = float(scores.keywords[i])
+        return {
+            'opportunity_id': block.ids[i],
+            'match_score': round(float(scores.total[i]), 2),
+            'reasons': generate_match_reasons(naics_score, cert_score, keyword_score,
+                                              block.tags[i]),
+            'component_scores': {
+                'naics': round(naics_score, 2),
+                'certifications': round(cert_score, 2),
+                'keywords': round(keyword_score, 2),
+            }
+        }
+
+    def match(self, block: OpportunityBlock) -> List[Dict[str, Any]]:
+        """Score a block and return results sorted by match_score descending."""
+        scores = self.score(block)
+        order = np.argsort(-_rounded(scores.total), kind='stable')
+        return [self.result(block, scores, i) for i in order.tolist()]
+
+
+def _rounded(total: np.ndarray) -> np.ndarray:
+    # Python's round() so ranking agrees exactly with the reported match_score
+    return np.array([round(x, 2) for x in total.tolist()])
+
+
+# ── Streaming top-k ───────────────────────────────────────────────────
+
+class TopKMatcher:
+    """
+    Keeps the ``top_k`` best matches seen so far in a bounded min-heap.
+
+    Opportunities are fed in blocks; only row ids, tags and component
+    scores of the current survivors are retained, and match reasons are
+    generated once for the final survivors. Ties keep input order, so the
+    result equals ``match_opportunities(...)[:top_k]``.
+    """
+
+    def __init__(self, naics_codes: List[str], certifications: List[str], top_k: int = 25,
+                 naics_alignment: bool = False):
+        if top_k < 1:
+            raise ValueError("top_k must be at least 1")
+        self.profile = CompiledProfile(naics_codes, certifications, naics_alignment)
+        self.top_k = top_k
+        self.scanned = 0
+        # Entries: (rounded_score, -seq, seq, opportunity_id, tags, naics, certs, keywords)
+        self._heap: List[tuple] = []
+
+    def add_block(self, opportunities: List[Dict[str, Any]]) -> None:
+        if opportunities:
+            self.add_opportunity_block(OpportunityBlock(opportunities))
+
+    def add_opportunity_block(self, block: OpportunityBlock) -> None:
+        """Feed an already built block, e.g. one shared by many profiles."""
+        if not len(block):
+            return
+        scores = self.profile.score(block)
+        rounded = _rounded(scores.total)
+
+        # Only the block's own top-k can possibly enter the heap
+        rows = np.arange(len(block))
+        candidates = np.lexsort((rows, -rounded))[:self.top_k]
+
+        heap = self._heap
+        for i in candidates.tolist():
+            seq = self.scanned + i
+            key = (rounded[i], -seq)
+            if len(heap) >= self.top_k and key <= heap[0][:2]:
+                # Block candidates are in rank order, so the rest are worse too
+                break
+            entry = key + (seq, block.ids[i], block.tags[i], float(scores.naics[i]),
+                           float(scores.certifications[i]), float(scores.keywords[i]))
+            if len(heap) < self.top_k:
+                heapq.heappush(heap, entry)
+            else:
+                heapq.heapreplace(heap, entry)
+        self.scanned += len(block)
+
+    def results(self) -> List[Dict[str, Any]]:
+        """Survivors sorted by match_score descending, with reasons."""
+        results = []
+        for _, _, _, opp_id, tags, naics_score, cert_score, keyword_score in sorted(
+                self._heap, reverse=True):
+            final_score = (naics_score * 0.60) + (cert_score * 0.25) + (keyword_score * 0.15)
+            results.append({
+                'opportunity_id': opp_id,
+                'match_score': round(final_score, 2),
+                'reasons': generate_match_reasons(naics_score, cert_score, keyword_score, tags),
+                'component_scores': {
+                    'naics': round(naics_score, 2),
+                    'certifications': round(cert_score, 2),
+                    'keywords': round(keyword_score, 2),
+                }
+            })
+        return results
+
+
+def match_top_k(opportunities: Iterable[Dict[str, Any]],
+                naics_codes: List[str],
+                certifications: List[str],
+                top_k: int = 25,
+                block_size: int = 1000) -> List[Dict[str, Any]]:
+    """
+    Stream opportunities and return only the ``top_k`` best matches.
+
+    Memory stays O(top_k + block_size) regardless of how many
+    opportunities the iterable yields.
+    """
+    matcher = TopKMatcher(naics_codes, certifications, top_k)
+    block = []
+    for opp in opportunities:
+        block.append(opp)
+        if len(block) >= block_size:
+            matcher.add_block(block)
+            block = []
+    matcher.add_block(block)
+    return matcher.results()
+
+
+async def amatch_top_k(opportunities: Union[AsyncIterable[Dict[str, Any]], Iterable[Dict[str, Any]]],
+                       naics_codes: List[str],
+                       certifications: List[str],
+                       top_k: int = 25,
+                       block_size: int = 1000) -> List[Dict[str, Any]]:
+    """Async variant of ``match_top_k`` accepting an async iterator or a plain iterable."""
+    if not hasattr(opportunities, '__aiter__'):
+        return match_top_k(opportunities, naics_codes, certifications, top_k, block_size)
+
+    matcher = TopKMatcher(naics_codes, certifications, top_k)
+    block = []
+    async for opp in opportunities:
+        block.append(opp)
+        if len(block) >= block_size:
+            matcher.add_block(block)
+            block = []
+    matcher.add_block(block)
+    return matcher.results()
+
+
 def match_opportunities(opportunities: List[Dict[str, Any]], 
                        naics_codes: List[str], 
-                       certifications: List[str]) -> List[Dict[str, Any]]:
+                       certifications: List[str],
+                       top_k: Optional[int] = None) -> List[Dict[str, Any]]:
     """
     Match multiple opportunities against company profile.
 
@@ -166,16 +568,13 @@ def match_opportunities(opportunities: List[Dict[str, Any]],
         opportunities: List of opportunity dicts
         naics_codes: List of company NAICS codes
         certifications: List of company certifications
+        top_k: If set, only the best ``top_k`` matches are built and returned
 
     Returns:
         List of match results, sorted by match_score descending
     """
-    matches = []
-    for opp in opportunities:
-        match_result = match_opportunity(opp, naics_codes, certifications)
-        matches.append(match_result)
-
-    # Sort by match score descending
-    matches.sort(key=lambda x: x['match_score'], reverse=True)
+    if top_k is not None:
+        return match_top_k(opportunities, naics_codes, certifications, top_k)
 
-    return matches
+    profile = CompiledProfile(naics_codes, certifications)
+    return profile.match(OpportunityBlock(opportunities))
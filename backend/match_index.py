@@ -0,0 +1,228 @@
+"""
+Inverted index over the opportunities corpus for match candidate pruning.
+
+Maps NAICS codes, their 3/4-digit prefixes and normalized keyword tokens
+(an opportunities row's ``keywords``, or ``tags`` when given) to opportunity
+ids. A company profile only needs exact scoring for opportunities whose
+keywords hit one of its NAICS keyword groups (or whose NAICS code shares a
+prefix with the profile); everything else cannot rise above the 30-point
+NAICS base score and is ranked after them with a constant.
+
+Only ids and their keys are held; the rows to score are fetched by the
+caller, so the index stays small for the whole corpus. The process-wide
+index is filled from the database at startup (services.db_async
+``load_opportunity_index``) and kept current by ``upsert_opportunity``.
+"""
+
+from typing import List, Dict, Any, Optional, Set, Iterable, Callable
+import re
+
+import numpy as np
+
+from match_engine import (
+    NAICS_KEYWORDS,
+    TopKMatcher,
+    calculate_certification_match,
+    generate_match_reasons,
+    keyword_matcher,
+    opportunity_tags,
+)
+
+# 2-digit sectors are left out: each covers so much of the corpus that a
+# posting list on them would make nearly every opportunity a candidate
+NAICS_PREFIX_LENGTHS = (3, 4)
+
+
+def normalize_tag(tag: str) -> str:
+    """Lower-case and collapse whitespace; keywords never span whitespace."""
+    return re.sub(r'\s+', ' ', tag.strip().lower())
+
+
+def naics_keys(naics_code: Optional[str]) -> List[str]:
+    """Index keys for a NAICS code: the full code plus its 3/4-digit prefixes."""
+    code = (naics_code or '').strip()
+    if not code:
+        return []
+    keys = [f"naics:{code}"]
+    keys.extend(f"naics{n}:{code[:n]}" for n in NAICS_PREFIX_LENGTHS if len(code) >= n)
+    return keys
+
+
+class OpportunityIndex:
+    """
+    Incrementally maintained inverted index of opportunities.
+
+    ``add`` replaces any previous version of an opportunity, so it can be
+    called with every row returned by ``upsert_opportunity``. ``loaded`` is
+    set once the whole corpus has been added.
+    """
+
+    def __init__(self):
+        self.loaded = False
+        self._order: Dict[str, int] = {}
+        self._keys: Dict[str, List[str]] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._seq = 0
+
+        # Distinct tag tokens and their NAICS keyword-group hits, grown lazily
+        self._tag_tokens: List[str] = []
+        self._tag_rows: Dict[str, int] = {}
+        self._tag_hits = np.zeros((0, len(NAICS_KEYWORDS)))
+        self._scanned_tokens = 0
+        # Tokens whose last opportunity went away since the last compaction
+        self._dropped_tokens = 0
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __contains__(self, opportunity_id: Any) -> bool:
+        return str(opportunity_id) in self._order
+
+    def add(self, opportunity: Dict[str, Any]) -> None:
+        """Index (or re-index) a single opportunity."""
+        opp_id = str(opportunity['id'])
+        if opp_id in self._order:
+            self._unlink(opp_id)
+        else:
+            self._order[opp_id] = self._seq
+            self._seq += 1
+
+        keys = naics_keys(opportunity.get('naics_code'))
+        for tag in opportunity_tags(opportunity):
+            token = normalize_tag(tag)
+            if token not in self._tag_rows:
+                self._tag_rows[token] = len(self._tag_tokens)
+                self._tag_tokens.append(token)
+            keys.append(f"tag:{token}")
+
+        self._keys[opp_id] = keys
+        for key in keys:
+            self._postings.setdefault(key, set()).add(opp_id)
+
+    def add_many(self, opportunities: Iterable[Dict[str, Any]]) -> None:
+        for opp in opportunities:
+            self.add(opp)
+
+    def remove(self, opportunity_id: Any) -> bool:
+        """Drop an opportunity from the index. Returns False if it was not indexed."""
+        opp_id = str(opportunity_id)
+        if opp_id not in self._order:
+            return False
+        self._unlink(opp_id)
+        del self._order[opp_id]
+        return True
+
+    def _unlink(self, opp_id: str) -> None:
+        for key in self._keys.pop(opp_id, []):
+            ids = self._postings.get(key)
+            if ids is not None:
+                ids.discard(opp_id)
+                if not ids:
+                    del self._postings[key]
+                    if key.startswith("tag:"):
+                        self._dropped_tokens += 1
+        if self._dropped_tokens * 2 > len(self._tag_tokens):
+            self._compact_tokens()
+
+    def _compact_tokens(self) -> None:
+        """Forget tag tokens no indexed opportunity has any more."""
+        live = [row for row, token in enumerate(self._tag_tokens) if f"tag:{token}" in self._postings]
+        scanned = [row for row in live if row < self._scanned_tokens]
+        self._tag_hits = self._tag_hits[scanned]
+        self._scanned_tokens = len(scanned)
+        self._tag_tokens = [self._tag_tokens[row] for row in live]
+        self._tag_rows = {token: row for row, token in enumerate(self._tag_tokens)}
+        self._dropped_tokens = 0
+
+    def lookup(self, key: str) -> Set[str]:
+        return set(self._postings.get(key, ()))
+
+    # ── Candidate generation ──────────────────────────────────────────
+
+    def _group_hits(self) -> np.ndarray:
+        """Tag-token x NAICS-group hits, scanning only tokens added since last call."""
+        if self._scanned_tokens < len(self._tag_tokens):
+            new_tokens = self._tag_tokens[self._scanned_tokens:]
+            new_hits = keyword_matcher(NAICS_KEYWORDS).segment_hits(new_tokens)
+            self._tag_hits = np.vstack([self._tag_hits, new_hits])
+            self._scanned_tokens = len(self._tag_tokens)
+        return self._tag_hits
+
+    def tag_candidates(self, naics_codes: List[str]) -> Set[str]:
+        """Opportunities with a keyword token containing a keyword of the profile's NAICS groups."""
+        wanted = set(naics_codes or [])
+        group_names = keyword_matcher(NAICS_KEYWORDS).group_names
+        groups = [g for g, naics in enumerate(group_names) if naics in wanted]
+        if not groups or not self._tag_tokens:
+            return set()
+
+        rows = np.flatnonzero(self._group_hits()[:, groups].any(axis=1))
+        candidates: Set[str] = set()
+        for row in rows.tolist():
+            candidates |= self._postings.get(f"tag:{self._tag_tokens[row]}", set())
+        return candidates
+
+    def naics_candidates(self, naics_codes: List[str]) -> Set[str]:
+        """Opportunities whose NAICS code equals or shares a 3/4-digit prefix with the profile."""
+        candidates: Set[str] = set()
+        for code in naics_codes or []:
+            code = code.strip()
+            candidates |= self._postings.get(f"naics:{code}", set())
+            for n in NAICS_PREFIX_LENGTHS:
+                if len(code) >= n:
+                    candidates |= self._postings.get(f"naics{n}:{code[:n]}", set())
+        return candidates
+
+    def candidates(self, naics_codes: List[str]) -> Set[str]:
+        return self.tag_candidates(naics_codes) | self.naics_candidates(naics_codes)
+
+    # ── Matching ──────────────────────────────────────────────────────
+
+    def match(self, naics_codes: List[str], certifications: List[str],
+              fetch: Callable[[List[str]], Iterable[Dict[str, Any]]],
+              top_k: int = 25) -> List[Dict[str, Any]]:
+        """
+        Top matches for a profile, scoring only candidate opportunities exactly.
+
+        ``fetch`` returns the opportunity rows for a list of ids, e.g. an
+        ``in_("id", ids)`` select. Candidates are ranked with the regular
+        match engine. If fewer than
+        ``top_k`` candidates exist, the remainder is filled from the tail in
+        index order with a constant score: the NAICS base score plus the
+        profile's certification score (keyword relevance is not evaluated).
+        """
+        candidate_ids = sorted(self.candidates(naics_codes), key=self._order.__getitem__)
+        matcher = TopKMatcher(naics_codes, certifications, top_k)
+        rows = sorted(fetch(candidate_ids) if candidate_ids else [],
+                      key=lambda row: self._order.get(str(row['id']), self._seq))
+        matcher.add_block(rows)
+        results = matcher.results()
+        if len(results) >= top_k:
+            return results
+
+        naics_score = 30.0 if naics_codes else 0.0
+        cert_score = calculate_certification_match(certifications)
+        tail_score = round((naics_score * 0.60) + (cert_score * 0.25), 2)
+
+        chosen = set(candidate_ids)
+        for opp_id in self._order:  # insertion order
+            if len(results) >= top_k:
+                break
+            if opp_id in chosen:
+                continue
+            results.append({
+                'opportunity_id': opp_id,
+                'match_score': tail_score,
+                'reasons': generate_match_reasons(naics_score, cert_score, 0.0, []),
+                'component_scores': {
+                    'naics': naics_score,
+                    'certifications': round(cert_score, 2),
+                    'keywords': 0.0,
+                }
+            })
+        return results
+
+
+# Process-wide index, loaded at startup by load_opportunity_index and kept
+# current by services.db.upsert_opportunity
+opportunity_index = OpportunityIndex()
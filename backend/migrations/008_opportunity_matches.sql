@@ -0,0 +1,19 @@
+-- Nightly new-match fan-out results (jobs/match_fanout.py)
+create table if not exists opportunity_matches (
+  id uuid primary key default gen_random_uuid(),
+  user_id uuid not null references auth.users(id) on delete cascade,
+  opportunity_id uuid not null references opportunities(id) on delete cascade,
+  match_score numeric not null,
+  reasons text[],
+  component_scores jsonb,
+  created_at timestamptz default now(),
+  unique (user_id, opportunity_id)
+);
+
+create index if not exists idx_opportunity_matches_user_score
+  on opportunity_matches (user_id, match_score desc);
+
+alter table opportunity_matches enable row level security;
+
+create policy "Users can read own matches" on opportunity_matches
+  for select using (auth.uid() = user_id);
@@ -0,0 +1,3 @@
+-- Keyset order for the incremental embedding refresh (jobs/embedding_refresh.py)
+create index if not exists idx_opportunities_updated_at_id
+  on opportunities (updated_at, id);
@@ -0,0 +1,3 @@
+-- Keyset order for GET /api/opportunities cursor pagination (services/db.py _opportunity_page)
+create index if not exists idx_opportunities_posted_id
+  on opportunities (posted_date desc nulls last, id desc);
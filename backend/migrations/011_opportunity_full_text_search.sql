@@ -0,0 +1,50 @@
+-- Full-text search for opportunity keyword queries (services/db.py search_opportunities).
+-- Title ranks above agency/NAICS, which rank above the description.
+alter table opportunities add column if not exists search_vector tsvector
+  generated always as (
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(agency, '') || ' ' || coalesce(naics_code, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(description, '')), 'C')
+  ) stored;
+
+create index if not exists idx_opportunities_search_vector
+  on opportunities using gin (search_vector);
+
+-- schema.sql's expression index over title || description is superseded by
+-- idx_opportunities_search_vector; drop it so writes maintain only one GIN index
+drop index if exists idx_opportunities_search;
+
+-- Substring (ilike '%...%') agency filters
+create extension if not exists pg_trgm;
+create index if not exists idx_opportunities_agency_trgm
+  on opportunities using gin (agency gin_trgm_ops);
+
+-- Websearch-syntax query ("quoted phrases", or, -exclusions) ranked by relevance.
+-- Rows come back as json without search_vector, plus search_rank.
+create or replace function search_opportunities_ranked(
+  query text,
+  naics_code text default null,
+  agency text default null,
+  set_aside text default null,
+  status text default null,
+  max_rows integer default 50,
+  skip_rows integer default 0
+) returns setof jsonb
+language sql stable
+as $$
+  -- Rank ids first, so only the returned page is converted to json
+  select to_jsonb(o) - 'search_vector' || jsonb_build_object('search_rank', top.rank)
+  from (
+    select o.id, o.posted_date, ts_rank(o.search_vector, websearch_to_tsquery('english', query)) as rank
+    from opportunities o
+    where o.search_vector @@ websearch_to_tsquery('english', query)
+      and (search_opportunities_ranked.naics_code is null or o.naics_code = search_opportunities_ranked.naics_code)
+      and (search_opportunities_ranked.agency is null or o.agency ilike '%' || search_opportunities_ranked.agency || '%')
+      and (search_opportunities_ranked.set_aside is null or o.set_aside = search_opportunities_ranked.set_aside)
+      and (search_opportunities_ranked.status is null or o.status = search_opportunities_ranked.status)
+    order by rank desc, o.posted_date desc nulls last, o.id desc
+    limit max_rows offset skip_rows
+  ) top
+  join opportunities o on o.id = top.id
+  order by top.rank desc, top.posted_date desc nulls last, top.id desc
+$$;
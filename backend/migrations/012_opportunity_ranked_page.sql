@@ -0,0 +1,41 @@
+-- Ranked keyword search page plus its total in one call (services/db.py search_opportunities_counted).
+-- Supersedes search_opportunities_ranked from 011.
+drop function if exists search_opportunities_ranked(text, text, text, text, text, integer, integer);
+
+-- One (rows, total) row. Rows are json without search_vector, plus search_rank.
+-- Ranking already visits every match, so the exact total costs little extra;
+-- it is null when with_total is false.
+create or replace function search_opportunities_ranked_page(
+  query text,
+  naics_code text default null,
+  agency text default null,
+  set_aside text default null,
+  status text default null,
+  max_rows integer default 50,
+  skip_rows integer default 0,
+  with_total boolean default false
+) returns table (rows jsonb, total bigint)
+language sql stable
+as $$
+  with matches as (
+    select o.id, o.posted_date, ts_rank(o.search_vector, websearch_to_tsquery('english', query)) as rank
+    from opportunities o
+    where o.search_vector @@ websearch_to_tsquery('english', query)
+      and (search_opportunities_ranked_page.naics_code is null or o.naics_code = search_opportunities_ranked_page.naics_code)
+      and (search_opportunities_ranked_page.agency is null or o.agency ilike '%' || search_opportunities_ranked_page.agency || '%')
+      and (search_opportunities_ranked_page.set_aside is null or o.set_aside = search_opportunities_ranked_page.set_aside)
+      and (search_opportunities_ranked_page.status is null or o.status = search_opportunities_ranked_page.status)
+  ), top as (
+    -- Rank ids first, so only the returned page is converted to json
+    select * from matches
+    order by rank desc, posted_date desc nulls last, id desc
+    limit max_rows offset skip_rows
+  )
+  select
+    coalesce((
+      select jsonb_agg(to_jsonb(o) - 'search_vector' || jsonb_build_object('search_rank', top.rank)
+                       order by top.rank desc, top.posted_date desc nulls last, top.id desc)
+      from top join opportunities o on o.id = top.id
+    ), '[]'::jsonb),
+    case when with_total then (select count(*) from matches) end
+$$;
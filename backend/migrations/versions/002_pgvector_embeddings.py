@@ -0,0 +1,65 @@
+"""pgvector column and HNSW index for embeddings
+
+Revision ID: 002_pgvector_embeddings
+Revises: 001_initial
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002_pgvector_embeddings'
+down_revision = '001_initial'
+branch_labels = None
+depends_on = None
+
+EMBEDDING_DIM = 1536
+
+
+def _pgvector_available(bind) -> bool:
+    """Whether this server can create the vector extension (it is optional)."""
+    if bind.dialect.name != 'postgresql':
+        return False
+    return bind.execute(sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'vector'")).first() is not None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # Without pgvector there is no vector column or index; search stays on the
+    # in-process vector store (EMBEDDINGS_BACKEND=memory)
+    if not _pgvector_available(bind):
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+
+    # The embeddings table is created from the ORM models; skip if it is not there yet
+    if 'embeddings' not in sa.inspect(bind).get_table_names():
+        return
+
+    op.execute(f"ALTER TABLE embeddings ADD COLUMN IF NOT EXISTS embedding_vec vector({EMBEDDING_DIM})")
+
+    # Backfill from the JSON column; a JSON array of numbers is a valid vector literal
+    op.execute(f"""
+        UPDATE embeddings
+        SET embedding_vec = CAST(CAST(vector AS text) AS vector({EMBEDDING_DIM}))
+        WHERE embedding_vec IS NULL
+          AND json_typeof(CAST(vector AS json)) = 'array'
+          AND json_array_length(CAST(vector AS json)) = {EMBEDDING_DIM}
+    """)
+
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_embedding_vec_hnsw
+        ON embeddings USING hnsw (embedding_vec vector_cosine_ops)
+        WITH (m = 16, ef_construction = 64)
+    """)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if 'embeddings' not in inspector.get_table_names():
+        return
+    if 'embedding_vec' not in {column['name'] for column in inspector.get_columns('embeddings')}:
+        return
+    op.execute("DROP INDEX IF EXISTS ix_embedding_vec_hnsw")
+    op.execute("ALTER TABLE embeddings DROP COLUMN IF EXISTS embedding_vec")
@@ -0,0 +1,78 @@
+"""embedding_cache table and one embedding per source
+
+Revision ID: 003_embedding_cache
+Revises: 002_pgvector_embeddings
+Create Date: 2026-10-17 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003_embedding_cache'
+down_revision = '002_pgvector_embeddings'
+branch_labels = None
+depends_on = None
+
+
+# Rebuilds used to insert a new row per run; keep the newest row per source
+_DEDUPE_POSTGRESQL = """
+    DELETE FROM embeddings e
+    USING embeddings newer
+    WHERE e.source_type = newer.source_type
+      AND e.source_id = newer.source_id
+      AND (COALESCE(newer.created_at, 'epoch'), newer.id)
+          > (COALESCE(e.created_at, 'epoch'), e.id)
+"""
+# Same rule without DELETE ... USING or row comparisons (SQLite and others)
+_DEDUPE_PORTABLE = """
+    DELETE FROM embeddings
+    WHERE EXISTS (
+        SELECT 1 FROM embeddings newer
+        WHERE newer.source_type = embeddings.source_type
+          AND newer.source_id = embeddings.source_id
+          AND (newer.created_at > embeddings.created_at
+               OR (newer.created_at IS NOT NULL AND embeddings.created_at IS NULL)
+               OR ((newer.created_at = embeddings.created_at
+                    OR (newer.created_at IS NULL AND embeddings.created_at IS NULL))
+                   AND newer.id > embeddings.id))
+    )
+"""
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = inspector.get_table_names()
+
+    # Databases booted by the app already have the table from Base.metadata.create_all
+    if 'embedding_cache' not in tables:
+        op.create_table(
+            'embedding_cache',
+            sa.Column('text_hash', sa.String(length=64), nullable=False),
+            sa.Column('embedding_model', sa.String(length=100), nullable=False),
+            sa.Column('vector', sa.JSON(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.PrimaryKeyConstraint('text_hash', 'embedding_model')
+        )
+
+    if 'embeddings' not in tables:
+        return
+    # create_all builds the current per-passage constraint; deduplicating per
+    # source there would delete every passage but one
+    constraints = {c['name'] for c in inspector.get_unique_constraints('embeddings')}
+    if constraints & {'uq_embedding_source', 'uq_embedding_source_chunk'}:
+        return
+
+    op.execute(_DEDUPE_POSTGRESQL if bind.dialect.name == 'postgresql' else _DEDUPE_PORTABLE)
+    with op.batch_alter_table('embeddings') as batch_op:
+        batch_op.create_unique_constraint('uq_embedding_source', ['source_type', 'source_id'])
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if 'embeddings' in inspector.get_table_names() and 'uq_embedding_source' in {
+            c['name'] for c in inspector.get_unique_constraints('embeddings')}:
+        with op.batch_alter_table('embeddings') as batch_op:
+            batch_op.drop_constraint('uq_embedding_source', type_='unique')
+    op.drop_table('embedding_cache')
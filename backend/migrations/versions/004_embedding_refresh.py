@@ -0,0 +1,42 @@
+"""embedding refresh checkpoints and proposal keyset index
+
+Revision ID: 004_embedding_refresh
+Revises: 003_embedding_cache
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004_embedding_refresh'
+down_revision = '003_embedding_cache'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+
+    # Databases booted by the app already have both from Base.metadata.create_all
+    if 'embedding_refresh_checkpoints' not in tables:
+        op.create_table(
+            'embedding_refresh_checkpoints',
+            sa.Column('source_type', sa.String(length=50), nullable=False),
+            sa.Column('watermark_at', sa.String(length=64), nullable=True),
+            sa.Column('watermark_id', sa.String(length=255), nullable=True),
+            sa.Column('rows_embedded', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP')),
+            sa.PrimaryKeyConstraint('source_type')
+        )
+
+    if 'proposals' in tables and 'ix_proposal_updated_at_id' not in {
+            index['name'] for index in inspector.get_indexes('proposals')}:
+        op.create_index('ix_proposal_updated_at_id', 'proposals', ['updated_at', 'id'])
+
+
+def downgrade() -> None:
+    if 'proposals' in sa.inspect(op.get_bind()).get_table_names():
+        op.drop_index('ix_proposal_updated_at_id', table_name='proposals')
+    op.drop_table('embedding_refresh_checkpoints')
@@ -0,0 +1,50 @@
+"""passage-level embeddings: chunk index and offsets
+
+Revision ID: 005_embedding_passages
+Revises: 004_embedding_refresh
+Create Date: 2026-10-17 13:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005_embedding_passages'
+down_revision = '004_embedding_refresh'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if 'embeddings' not in inspector.get_table_names():
+        return
+
+    # Tables created by Base.metadata.create_all already have the passage columns
+    columns = {c['name'] for c in inspector.get_columns('embeddings')}
+    constraints = {c['name'] for c in inspector.get_unique_constraints('embeddings')}
+    with op.batch_alter_table('embeddings') as batch_op:
+        # Existing rows are whole-document embeddings, i.e. passage 0
+        if 'chunk_index' not in columns:
+            batch_op.add_column(sa.Column('chunk_index', sa.Integer(), nullable=False, server_default='0'))
+        if 'char_start' not in columns:
+            batch_op.add_column(sa.Column('char_start', sa.Integer(), nullable=True))
+        if 'char_end' not in columns:
+            batch_op.add_column(sa.Column('char_end', sa.Integer(), nullable=True))
+        if 'uq_embedding_source' in constraints:
+            batch_op.drop_constraint('uq_embedding_source', type_='unique')
+        if 'uq_embedding_source_chunk' not in constraints:
+            batch_op.create_unique_constraint('uq_embedding_source_chunk',
+                                              ['source_type', 'source_id', 'chunk_index'])
+
+
+def downgrade() -> None:
+    if 'embeddings' not in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.execute("DELETE FROM embeddings WHERE chunk_index > 0")
+    op.drop_constraint('uq_embedding_source_chunk', 'embeddings', type_='unique')
+    op.create_unique_constraint('uq_embedding_source', 'embeddings', ['source_type', 'source_id'])
+    op.drop_column('embeddings', 'char_end')
+    op.drop_column('embeddings', 'char_start')
+    op.drop_column('embeddings', 'chunk_index')
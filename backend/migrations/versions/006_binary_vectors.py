@@ -0,0 +1,121 @@
+"""binary vector storage for embeddings and embedding_cache
+
+Revision ID: 006_binary_vectors
+Revises: 005_embedding_passages
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+import numpy as np
+
+# revision identifiers, used by Alembic.
+revision = '006_binary_vectors'
+down_revision = '005_embedding_passages'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def _as_list(value):
+    # JSON columns come back parsed on PostgreSQL, as text on some drivers
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def _to_binary(table, key_columns) -> None:
+    """Move JSON vectors into vector_data as float32 bytes, in keyset-ordered batches."""
+    bind = op.get_bind()
+    keys = [table.c[name] for name in key_columns]
+    after = None
+    while True:
+        query = sa.select(*keys, table.c.vector).where(table.c.vector.isnot(None), table.c.vector_data.is_(None))
+        if after is not None:
+            query = query.where(sa.tuple_(*keys) > sa.tuple_(*after))
+        rows = bind.execute(query.order_by(*keys).limit(BATCH_SIZE)).all()
+        if not rows:
+            return
+        for *key, vector in rows:
+            values = {'vector_data': np.asarray(_as_list(vector), dtype='<f4').tobytes(), 'vector': None}
+            if 'vector_format' in table.c:
+                values['vector_format'] = 'float32'
+            bind.execute(table.update().where(sa.and_(*(k == v for k, v in zip(keys, key)))).values(**values))
+        after = rows[-1][:len(keys)]
+
+
+def _to_json(table, key_columns) -> None:
+    """Inverse of ``_to_binary``; quantized rows are widened to float32 first."""
+    bind = op.get_bind()
+    keys = [table.c[name] for name in key_columns]
+    extra = [table.c.vector_format, table.c.vector_scale] if 'vector_format' in table.c else []
+    rows = bind.execute(
+        sa.select(*keys, table.c.vector_data, *extra).where(table.c.vector.is_(None), table.c.vector_data.isnot(None))
+    ).all()
+    for row in rows:
+        key, data = row[:len(keys)], row[len(keys)]
+        fmt, scale = row[len(keys) + 1:] if extra else ('float32', None)
+        values = np.frombuffer(data, dtype={'float16': '<f2', 'int8': 'i1'}.get(fmt, '<f4')).astype(float)
+        if fmt == 'int8':
+            values *= scale or 1.0
+        bind.execute(table.update().where(sa.and_(*(k == v for k, v in zip(keys, key))))
+                     .values(vector=values.tolist()))
+
+
+def _tables():
+    embeddings = sa.table(
+        'embeddings', sa.column('id', sa.String), sa.column('vector', sa.JSON(none_as_null=True)),
+        sa.column('vector_data', sa.LargeBinary), sa.column('vector_format', sa.String),
+        sa.column('vector_scale', sa.Float)
+    )
+    cache = sa.table(
+        'embedding_cache', sa.column('text_hash', sa.String), sa.column('embedding_model', sa.String),
+        sa.column('vector', sa.JSON(none_as_null=True)), sa.column('vector_data', sa.LargeBinary)
+    )
+    return embeddings, cache
+
+
+def _add_binary_columns(inspector, table_name, columns) -> None:
+    """Add the missing ``columns`` and make the legacy JSON column nullable."""
+    # Tables created by Base.metadata.create_all already have the new columns
+    existing = {c['name']: c for c in inspector.get_columns(table_name)}
+    with op.batch_alter_table(table_name) as batch_op:
+        for column in columns:
+            if column.name not in existing:
+                batch_op.add_column(column)
+        if not existing['vector']['nullable']:
+            batch_op.alter_column('vector', existing_type=sa.JSON(), nullable=True)
+
+
+def upgrade() -> None:
+    embeddings, cache = _tables()
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+
+    if 'embeddings' in tables:
+        _add_binary_columns(inspector, 'embeddings', [
+            sa.Column('vector_data', sa.LargeBinary(), nullable=True),
+            sa.Column('vector_format', sa.String(length=16), nullable=True),
+            sa.Column('vector_scale', sa.Float(), nullable=True),
+        ])
+        _to_binary(embeddings, ['id'])
+
+    if 'embedding_cache' in tables:
+        _add_binary_columns(inspector, 'embedding_cache', [sa.Column('vector_data', sa.LargeBinary(), nullable=True)])
+        _to_binary(cache, ['text_hash', 'embedding_model'])
+
+
+def downgrade() -> None:
+    embeddings, cache = _tables()
+
+    _to_json(cache, ['text_hash', 'embedding_model'])
+    op.alter_column('embedding_cache', 'vector', existing_type=sa.JSON(), nullable=False)
+    op.drop_column('embedding_cache', 'vector_data')
+
+    if 'embeddings' in sa.inspect(op.get_bind()).get_table_names():
+        _to_json(embeddings, ['id'])
+        op.alter_column('embeddings', 'vector', existing_type=sa.JSON(), nullable=False)
+        op.drop_column('embeddings', 'vector_scale')
+        op.drop_column('embeddings', 'vector_format')
+        op.drop_column('embeddings', 'vector_data')
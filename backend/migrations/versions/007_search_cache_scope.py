@@ -0,0 +1,60 @@
+"""semantic_search_cache composite key, scope columns and TTL
+
+Revision ID: 007_search_cache_scope
+Revises: 006_binary_vectors
+Create Date: 2026-10-17 14:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007_search_cache_scope'
+down_revision = '006_binary_vectors'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The table is created from the ORM models; skip if it is not there yet
+    inspector = sa.inspect(op.get_bind())
+    if 'semantic_search_cache' not in inspector.get_table_names():
+        return
+    # Tables created by Base.metadata.create_all are already scoped
+    columns = {c['name'] for c in inspector.get_columns('semantic_search_cache')}
+    if {'user_id', 'source_type', 'expires_at'} <= columns:
+        return
+
+    # Old entries are keyed by md5(query) alone and may hold another user's results
+    op.execute("DELETE FROM semantic_search_cache")
+    op.execute("DROP INDEX IF EXISTS ix_search_cache_query_hash")
+    op.execute("DROP INDEX IF EXISTS ix_semantic_search_cache_query_hash")
+
+    with op.batch_alter_table('semantic_search_cache') as batch_op:
+        if 'user_id' not in columns:
+            batch_op.add_column(sa.Column('user_id', sa.String(), nullable=True))
+        if 'source_type' not in columns:
+            batch_op.add_column(sa.Column('source_type', sa.String(length=50), nullable=True))
+        if 'expires_at' not in columns:
+            batch_op.add_column(sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False))
+    indexes = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('semantic_search_cache')}
+    if 'uq_search_cache_query_hash' not in indexes:
+        op.create_index('uq_search_cache_query_hash', 'semantic_search_cache', ['query_hash'], unique=True)
+    if 'ix_search_cache_last_accessed' not in indexes:
+        op.create_index('ix_search_cache_last_accessed', 'semantic_search_cache', ['last_accessed'])
+    if 'ix_search_cache_expires_at' not in indexes:
+        op.create_index('ix_search_cache_expires_at', 'semantic_search_cache', ['expires_at'])
+
+
+def downgrade() -> None:
+    if 'semantic_search_cache' not in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.execute("DELETE FROM semantic_search_cache")
+    op.drop_index('ix_search_cache_expires_at', table_name='semantic_search_cache')
+    op.drop_index('ix_search_cache_last_accessed', table_name='semantic_search_cache')
+    op.drop_index('uq_search_cache_query_hash', table_name='semantic_search_cache')
+    op.drop_column('semantic_search_cache', 'expires_at')
+    op.drop_column('semantic_search_cache', 'source_type')
+    op.drop_column('semantic_search_cache', 'user_id')
+    op.create_index('ix_search_cache_query_hash', 'semantic_search_cache', ['query_hash'])
@@ -1,7 +1,7 @@
 """
 Embedding models for vector search and semantic matching
 """
-from sqlalchemy import Column, String, JSON, DateTime, ForeignKey, Text, Integer, Index, Float
+from sqlalchemy import Column, String, JSON, DateTime, ForeignKey, Text, Integer, Index, Float, UniqueConstraint, LargeBinary
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import ARRAY
 from database import Base
@@ -14,6 +14,8 @@ class EmbeddingRecord(Base):
         Index("ix_embedding_source_type", "source_type"),
         Index("ix_embedding_user_id", "user_id"),
         Index("ix_embedding_created_at", "created_at"),
+        # One row per passage of a source object; writes upsert on this key
+        UniqueConstraint("source_type", "source_id", "chunk_index", name="uq_embedding_source_chunk"),
     )
 
     id = Column(String, primary_key=True, index=True)
@@ -23,28 +25,75 @@ class EmbeddingRecord(Base):
     # Enhanced fields for better semantic search
     source_type = Column(String(50), nullable=False, default="proposal")  # 'opportunity', 'proposal', 'document'
     source_id = Column(String(255), nullable=True)  # ID of the source object
-    text_content = Column(Text, nullable=True)  # Original text that was embedded
+    text_content = Column(Text, nullable=True)  # Passage text that was embedded
+    chunk_index = Column(Integer, nullable=False, default=0)  # Passage number within the source
+    char_start = Column(Integer, nullable=True)  # Passage offsets in the source text
+    char_end = Column(Integer, nullable=True)
     embedding_model = Column(String(100), nullable=False, default="text-embedding-3-small")
     
-    vector = Column(JSON, nullable=False)  # Vector representation
+    vector = Column(JSON(none_as_null=True), nullable=True)  # Legacy JSON vector; migration 006 moves it to vector_data
+    vector_data = Column(LargeBinary, nullable=True)  # Little-endian vector bytes, see services.vector_codec
+    vector_format = Column(String(16), nullable=True)  # 'float32', 'float16' or 'int8'
+    vector_scale = Column(Float, nullable=True)  # int8 dequantization factor
     meta_data = Column(JSON, nullable=True)  # Additional metadata (renamed from 'metadata' to avoid SQLAlchemy conflict)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    @property
+    def embedding(self):
+        """Decoded float32 vector (numpy array), from vector_data or the legacy JSON column."""
+        from services.vector_codec import decode_vector
+        import numpy as np
+
+        if self.vector_data is not None:
+            return decode_vector(self.vector_data, self.vector_format, self.vector_scale)
+        return np.asarray(self.vector, dtype=np.float32) if self.vector is not None else None
+
+
+class EmbeddingCache(Base):
+    """Content-addressed provider embeddings, keyed by normalized text hash and model"""
+    __tablename__ = "embedding_cache"
+
+    text_hash = Column(String(64), primary_key=True)  # sha256 of the normalized text
+    embedding_model = Column(String(100), primary_key=True)
+    vector = Column(JSON(none_as_null=True), nullable=True)  # Legacy JSON vector; migration 006 moves it to vector_data
+    vector_data = Column(LargeBinary, nullable=True)  # Lossless little-endian float32 bytes
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class EmbeddingRefreshCheckpoint(Base):
+    """Per-source keyset high-water mark of the incremental embedding refresh"""
+    __tablename__ = "embedding_refresh_checkpoints"
+
+    source_type = Column(String(50), primary_key=True)
+    watermark_at = Column(String(64), nullable=True)  # ISO updated_at of the last embedded row
+    watermark_id = Column(String(255), nullable=True)  # id of the last embedded row (tie-breaker)
+    rows_embedded = Column(Integer, default=0, nullable=False)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
 
 class SemanticSearchCache(Base):
     """Cache semantic search results for performance"""
     __tablename__ = "semantic_search_cache"
     __table_args__ = (
-        Index("ix_search_cache_query_hash", "query_hash"),
+        Index("uq_search_cache_query_hash", "query_hash", unique=True),
+        Index("ix_search_cache_last_accessed", "last_accessed"),
+        Index("ix_search_cache_expires_at", "expires_at"),
     )
 
     id = Column(String, primary_key=True, index=True)
     query_text = Column(Text, nullable=False)
-    query_hash = Column(String(64), nullable=False, index=True)
+    query_hash = Column(String(64), nullable=False)  # sha256 of the composite key, see services.search_cache
     results = Column(JSON, nullable=False)
     hit_count = Column(Integer, default=0, nullable=False)
     
+    # Filters the results were computed with; used for invalidation
+    user_id = Column(String, nullable=True)
+    source_type = Column(String(50), nullable=True)
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
     last_accessed = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
\ No newline at end of file
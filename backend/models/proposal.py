@@ -25,6 +25,7 @@ class Proposal(Base):
         Index("ix_proposal_user_id", "user_id"),
         Index("ix_proposal_status", "status"),
         Index("ix_proposal_created_at", "created_at"),
+        Index("ix_proposal_updated_at_id", "updated_at", "id"),  # embedding refresh keyset
     )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
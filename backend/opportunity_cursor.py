@@ -0,0 +1,59 @@
+"""
+Opaque pagination cursors for ``GET /api/opportunities``.
+
+A cursor is base64 JSON: the (posted_date, id) keyset position of the last
+row on a page, or the row offset of a relevance-ranked search page. Cursors
+come back from clients and their values are spliced into PostgREST filter
+strings, so decoding accepts only an ISO-8601 timestamp and a UUID.
+"""
+import json
+import uuid
+import base64
+from datetime import datetime
+
+
+def _encode_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def encode_opportunity_cursor(row: dict) -> str:
+    """Opaque cursor for the (posted_date, id) position just after ``row``."""
+    return _encode_cursor([row.get("posted_date"), row["id"]])
+
+
+def encode_offset_cursor(offset: int) -> str:
+    """Opaque cursor for the row ``offset`` of a relevance-ranked page."""
+    return _encode_cursor(offset)
+
+
+def keyset_position(timestamp, opportunity_id, nullable: bool = False):
+    """
+    A (timestamp, id) keyset position checked before it goes into a filter
+    string: ``timestamp`` ISO-8601 (or None when ``nullable``) and
+    ``opportunity_id`` a UUID. ValueError otherwise.
+    """
+    try:
+        opportunity_id = str(uuid.UUID(opportunity_id))
+        if timestamp is not None or not nullable:
+            datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError, AttributeError):
+        raise ValueError("Invalid keyset position")
+    return timestamp, opportunity_id
+
+
+def decode_opportunity_cursor(cursor: str):
+    """
+    (posted_date, id) from ``encode_opportunity_cursor``, or the row offset
+    of a relevance-ranked search page; ValueError if malformed.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if isinstance(payload, int) and not isinstance(payload, bool) and payload >= 0:
+        return payload
+    try:
+        posted_date, opportunity_id = payload
+        return keyset_position(posted_date, opportunity_id, nullable=True)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor")
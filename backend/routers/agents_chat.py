@@ -6,7 +6,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 from services.auth import get_user, get_optional_user
-from services.db import (
+from services.db_async import (
     create_conversation,
     save_message,
     get_conversation_messages,
@@ -55,7 +55,7 @@ async def chat_with_agent(
     # Get or create session
     session_id = request.session_id
     if not session_id:
-        session = create_conversation(
+        session = await create_conversation(
             user_id=user["id"],
             agent_type=request.agent_type,
             title=request.message[:100],
@@ -64,7 +64,7 @@ async def chat_with_agent(
 
     # Build context from user profile and optional data
     context = request.context or {}
-    company = get_company(user["id"])
+    company = await get_company(user["id"])
     if company:
         context["user_profile"] = {
             "company_name": company.get("company_name", ""),
@@ -75,14 +75,14 @@ async def chat_with_agent(
 
     # If context includes an opportunity_id, fetch it
     if context.get("opportunity_id"):
-        opp = get_opportunity(context["opportunity_id"])
+        opp = await get_opportunity(context["opportunity_id"])
         if opp:
             context["opportunity"] = opp
 
     # Get conversation history for context
     history = []
     if session_id:
-        messages = get_conversation_messages(session_id, limit=10)
+        messages = await get_conversation_messages(session_id, limit=10)
         for msg in messages:
             history.append({
                 "role": msg.get("role", "user"),
@@ -91,7 +91,7 @@ async def chat_with_agent(
 
     # Save user message
     if session_id:
-        save_message(session_id, "user", request.message)
+        await save_message(session_id, "user", request.message)
 
     # Get agent response
     try:
@@ -105,13 +105,13 @@ async def chat_with_agent(
 
     # Save assistant response
     if session_id:
-        save_message(session_id, "assistant", reply, metadata={
+        await save_message(session_id, "assistant", reply, metadata={
             "agent_type": request.agent_type,
             "agent_name": agent.name,
         })
         # Update session title if it's the first message
         if len(history) == 0:
-            update_conversation(session_id, {"title": request.message[:100]})
+            await update_conversation(session_id, {"title": request.message[:100]})
 
     return AgentChatResponse(
         reply=reply,
@@ -133,11 +133,11 @@ async def analyze_opportunity(
     user=Depends(get_user),
 ):
     """Use Research Agent to analyze a specific opportunity."""
-    opp = get_opportunity(opportunity_id)
+    opp = await get_opportunity(opportunity_id)
     if not opp:
         raise HTTPException(status_code=404, detail="Opportunity not found")
 
-    company = get_company(user["id"])
+    company = await get_company(user["id"])
     user_profile = {}
     if company:
         user_profile = {
@@ -166,11 +166,11 @@ async def draft_proposal_section(
     user=Depends(get_user),
 ):
     """Use Proposal Assistant to draft a proposal section."""
-    opp = get_opportunity(opportunity_id)
+    opp = await get_opportunity(opportunity_id)
     if not opp:
         raise HTTPException(status_code=404, detail="Opportunity not found")
 
-    company = get_company(user["id"])
+    company = await get_company(user["id"])
     user_profile = {}
     if company:
         user_profile = {
@@ -196,7 +196,7 @@ async def draft_proposal_section(
 @router.get("/sessions")
 async def list_sessions(user=Depends(get_user)):
     """List user's chat sessions."""
-    sessions = get_user_conversations(user["id"])
+    sessions = await get_user_conversations(user["id"])
     return {"sessions": sessions, "total": len(sessions)}
 
 
@@ -207,7 +207,7 @@ async def get_session_messages(
     user=Depends(get_user),
 ):
     """Get messages for a chat session."""
-    messages = get_conversation_messages(session_id, limit=limit)
+    messages = await get_conversation_messages(session_id, limit=limit)
     return {"messages": messages, "total": len(messages), "session_id": session_id}
 
 
@@ -6,7 +6,7 @@ from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
 from services.auth import get_user
-from services.db import get_certifications, create_certification, update_certification
+from services.db_async import get_certifications, create_certification, update_certification
 
 router = APIRouter(prefix="/api/certifications", tags=["certifications"])
 
@@ -97,7 +97,7 @@ CERTIFICATION_TYPES = {
 @router.get("")
 async def list_certifications(user=Depends(get_user)):
     """List all user certifications."""
-    certs = get_certifications(user["id"])
+    certs = await get_certifications(user["id"])
 
     enriched = []
     for cert in certs:
@@ -127,7 +127,7 @@ async def list_certifications(user=Depends(get_user)):
 @router.get("/{cert_id}")
 async def get_certification(cert_id: str, user=Depends(get_user)):
     """Get certification details."""
-    certs = get_certifications(user["id"])
+    certs = await get_certifications(user["id"])
     cert = next((c for c in certs if c.get("id") == cert_id), None)
     if not cert:
         raise HTTPException(status_code=404, detail="Certification not found")
@@ -151,7 +151,7 @@ async def add_certification(
         "expiration_date": request.expiration_date,
         "notes": request.notes,
     }
-    result = create_certification(data)
+    result = await create_certification(data)
     return {"created": True, "certification": result}
 
 
@@ -166,7 +166,7 @@ async def update_cert(
     if not updates:
         raise HTTPException(status_code=400, detail="No updates provided")
 
-    result = update_certification(cert_id, updates)
+    result = await update_certification(cert_id, updates)
     return {"updated": True, "certification": result}
 
 
@@ -194,10 +194,10 @@ async def get_certification_requirements(cert_type: str):
 @router.post("/{cert_id}/renew")
 async def renew_certification(cert_id: str, user=Depends(get_user)):
     """Initiate certification renewal."""
-    certs = get_certifications(user["id"])
+    certs = await get_certifications(user["id"])
     cert = next((c for c in certs if c.get("id") == cert_id), None)
     if not cert:
         raise HTTPException(status_code=404, detail="Certification not found")
 
-    update_certification(cert_id, {"status": "renewal_pending"})
+    await update_certification(cert_id, {"status": "renewal_pending"})
     return {"cert_id": cert_id, "renewal_initiated": True, "status": "renewal_pending"}
@@ -4,7 +4,7 @@ Market Intelligence Router - Contract history, spending trends, and competitive
 from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import Optional
 from services.auth import get_user
-from services.db import search_contracts, get_company
+from services.db_async import search_contracts, get_company
 from integrations.fpds_client import fpds_client
 from integrations.usaspending_client import usaspending_client
 
@@ -37,7 +37,7 @@ async def search_contract_history(
     if max_amount:
         filters["max_amount"] = max_amount
 
-    contracts = search_contracts(filters, limit=limit, offset=offset)
+    contracts = await search_contracts(filters, limit=limit, offset=offset)
     return {"contracts": contracts, "total": len(contracts), "filters": filters}
 
 
@@ -197,7 +197,7 @@ async def search_naics(
 @router.get("/forecast")
 async def forecast_opportunities(user=Depends(get_user)):
     """AI-powered opportunity forecasting based on user profile."""
-    company = get_company(user["id"])
+    company = await get_company(user["id"])
     if not company:
         return {"forecast": "Complete your company profile to get AI forecasts."}
 
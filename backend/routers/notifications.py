@@ -1,18 +1,19 @@
 """
 Notifications Router - User notification management.
 """
+import asyncio
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Optional, Dict
 from services.auth import get_user
-from services.db import (
+from services.db_async import (
     get_notifications,
     create_notification,
     mark_notification_read,
     mark_all_notifications_read,
     get_unread_notification_count,
-    supabase,
 )
+from services.db import supabase
 
 router = APIRouter(prefix="/api/notifications", tags=["notifications"])
 
@@ -30,8 +31,10 @@ async def list_notifications(
     user=Depends(get_user),
 ):
     """List user notifications."""
-    notifications = get_notifications(user["id"], unread_only=unread_only, limit=limit)
-    unread_count = get_unread_notification_count(user["id"])
+    notifications, unread_count = await asyncio.gather(
+        get_notifications(user["id"], unread_only=unread_only, limit=limit),
+        get_unread_notification_count(user["id"]),
+    )
 
     return {
         "notifications": notifications,
@@ -43,21 +46,21 @@ async def list_notifications(
 @router.get("/unread-count")
 async def get_unread_count(user=Depends(get_user)):
     """Get count of unread notifications."""
-    count = get_unread_notification_count(user["id"])
+    count = await get_unread_notification_count(user["id"])
     return {"unread_count": count}
 
 
 @router.put("/{notification_id}/read")
 async def mark_as_read(notification_id: str, user=Depends(get_user)):
     """Mark a notification as read."""
-    mark_notification_read(notification_id)
+    await mark_notification_read(notification_id)
     return {"notification_id": notification_id, "read": True}
 
 
 @router.put("/read-all")
 async def mark_all_read(user=Depends(get_user)):
     """Mark all notifications as read."""
-    mark_all_notifications_read(user["id"])
+    await mark_all_notifications_read(user["id"])
     return {"marked_read": True}
 
 
@@ -1,25 +1,32 @@
 """
 Opportunity Management Router - Full CRUD + matching + SAM.gov integration.
 """
+import asyncio
+
 from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Literal, Optional
 from services.auth import get_user, get_optional_user
-from services.db import (
+from services.db_async import (
+    OPPORTUNITY_COUNT_MODE,
     search_opportunities,
+    search_opportunities_counted,
     get_opportunity,
     get_opportunity_by_notice_id,
     upsert_opportunity,
-    count_opportunities,
     get_saved_opportunities,
+    get_opportunity_matches,
     save_opportunity,
     update_saved_opportunity,
     delete_saved_opportunity,
     get_ai_analyses,
     save_ai_analysis,
     get_company,
+    get_company_profile,
     track_interaction,
 )
+from match_cache import match_cache
+from match_engine import company_profile
 from services.sam_gov import sam_client
 
 router = APIRouter(prefix="/api/opportunities", tags=["opportunities"])
@@ -45,13 +52,24 @@ class OpportunityUpdateRequest(BaseModel):
 async def list_opportunities(
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
     search: Optional[str] = None,
     agency: Optional[str] = None,
     naics: Optional[str] = None,
     set_aside: Optional[str] = None,
     status: Optional[str] = "active",
+    count: Optional[Literal["exact", "estimated"]] = None,
 ):
-    """List opportunities with filters. Public endpoint."""
+    """
+    List opportunities with filters. Public endpoint.
+
+    ``search`` takes web-search syntax ("quoted phrase", or, -excluded) and
+    orders results by relevance, most relevant first; otherwise newest first.
+    Pass the returned ``next_cursor`` as ``cursor`` to fetch the next page;
+    it is None on the last page. ``offset`` is ignored when a cursor is given.
+    ``count="estimated"`` takes ``total`` from planner statistics for large
+    result sets instead of counting every row.
+    """
     filters = {}
     if search:
         filters["search"] = search
@@ -64,14 +82,21 @@ async def list_opportunities(
     if status:
         filters["status"] = status
 
-    opportunities = search_opportunities(filters, limit=limit, offset=offset)
-    total = count_opportunities(filters)
+    count = count or OPPORTUNITY_COUNT_MODE
+    try:
+        opportunities, next_cursor, total = await search_opportunities_counted(
+            filters, limit=limit, offset=offset, cursor=cursor, count=count,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return {
         "opportunities": opportunities,
         "total": total,
+        "count": count,
         "limit": limit,
         "offset": offset,
+        "next_cursor": next_cursor,
         "filters": filters,
     }
 
@@ -100,7 +125,7 @@ async def search_sam_gov(
 @router.get("/{opportunity_id}")
 async def get_opportunity_detail(opportunity_id: str):
     """Get full opportunity details."""
-    opp = get_opportunity(opportunity_id)
+    opp = await get_opportunity(opportunity_id)
     if not opp:
         raise HTTPException(status_code=404, detail="Opportunity not found")
     return opp
@@ -109,7 +134,7 @@ async def get_opportunity_detail(opportunity_id: str):
 @router.get("/notice/{notice_id}")
 async def get_by_notice_id(notice_id: str):
     """Get opportunity by SAM.gov notice ID."""
-    opp = get_opportunity_by_notice_id(notice_id)
+    opp = await get_opportunity_by_notice_id(notice_id)
     if not opp:
         raise HTTPException(status_code=404, detail="Opportunity not found")
     return opp
@@ -149,7 +174,7 @@ async def import_from_sam(
             "source": "SAM.gov",
             "status": "active",
         }
-        upsert_opportunity(data)
+        await upsert_opportunity(data)
         imported += 1
 
     return {
@@ -167,22 +192,32 @@ async def get_user_saved(
     user=Depends(get_user),
 ):
     """Get user's saved/tracked opportunities."""
-    saved = get_saved_opportunities(user["id"], status=status)
+    saved = await get_saved_opportunities(user["id"], status=status)
     return {"saved_opportunities": saved, "total": len(saved)}
 
 
+@router.get("/user/matches")
+async def get_user_matches(
+    limit: int = Query(25, ge=1, le=100),
+    user=Depends(get_user),
+):
+    """Get user's best matches among newly synced opportunities, from the nightly fan-out."""
+    matches = await get_opportunity_matches(user["id"], limit=limit)
+    return {"matches": matches, "total": len(matches)}
+
+
 @router.post("/user/save")
 async def save_user_opportunity(
     request: OpportunitySaveRequest,
     user=Depends(get_user),
 ):
     """Save an opportunity to user's list."""
-    result = save_opportunity(
+    result = await save_opportunity(
         user_id=user["id"],
         opportunity_id=request.opportunity_id,
         status=request.status,
     )
-    track_interaction(user["id"], request.opportunity_id, "save")
+    await track_interaction(user["id"], request.opportunity_id, "save")
     return {"saved": True, "data": result}
 
 
@@ -203,7 +238,7 @@ async def update_user_saved(
     if request.tags is not None:
         updates["tags"] = request.tags
 
-    result = update_saved_opportunity(user["id"], opportunity_id, updates)
+    result = await update_saved_opportunity(user["id"], opportunity_id, updates)
     return {"updated": True, "data": result}
 
 
@@ -213,7 +248,7 @@ async def unsave_user_opportunity(
     user=Depends(get_user),
 ):
     """Remove opportunity from user's saved list."""
-    delete_saved_opportunity(user["id"], opportunity_id)
+    await delete_saved_opportunity(user["id"], opportunity_id)
     return {"removed": True, "opportunity_id": opportunity_id}
 
 
@@ -225,11 +260,11 @@ async def get_match_score(
     user=Depends(get_user),
 ):
     """Calculate AI match score for opportunity vs user profile."""
-    opp = get_opportunity(opportunity_id)
+    opp = await get_opportunity(opportunity_id)
     if not opp:
         raise HTTPException(status_code=404, detail="Opportunity not found")
 
-    company = get_company(user["id"])
+    company = await get_company(user["id"])
     if not company:
         return {
             "match_score": 0,
@@ -237,7 +272,7 @@ async def get_match_score(
         }
 
     # Check for cached analysis
-    existing = get_ai_analyses(opportunity_id, user["id"], "match_score")
+    existing = await get_ai_analyses(opportunity_id, user["id"], "match_score")
     if existing:
         return existing[0].get("result", {})
 
@@ -253,7 +288,7 @@ async def get_match_score(
 
     result = await analyst.calculate_match_score(opp, user_profile)
 
-    save_ai_analysis({
+    await save_ai_analysis({
         "opportunity_id": opportunity_id,
         "user_id": user["id"],
         "analysis_type": "match_score",
@@ -262,7 +297,7 @@ async def get_match_score(
         "match_score": result.get("total_score", 0),
     })
 
-    track_interaction(user["id"], opportunity_id, "analyze")
+    await track_interaction(user["id"], opportunity_id, "analyze")
     return result
 
 
@@ -272,10 +307,16 @@ async def match_opportunities_to_profile(
     limit: int = 10,
     user=Depends(get_user),
 ):
-    """Find opportunities that match user's profile."""
-    company = get_company(user["id"])
+    """
+    Find opportunities that match user's profile, best match first.
+
+    Candidates share a NAICS code with the profile and are scored through the
+    match cache, so a reload only rescores opportunities that changed.
+    """
+    company = await get_company_profile(user["id"])
+    _, company_codes, certifications = company_profile(company) if company else (None, [], [])
 
-    codes = naics_codes or (company.get("naics_codes", []) if company else [])
+    codes = naics_codes or company_codes
     if not codes:
         return {
             "matches": [],
@@ -284,7 +325,7 @@ async def match_opportunities_to_profile(
 
     all_matches = []
     for code in codes[:5]:
-        opps = search_opportunities({"naics_code": code, "status": "active"}, limit=limit)
+        opps = await search_opportunities({"naics_code": code, "status": "active"}, limit=limit)
         all_matches.extend(opps)
 
     # Deduplicate
@@ -295,8 +336,24 @@ async def match_opportunities_to_profile(
             seen.add(opp["id"])
             unique.append(opp)
 
+    # Only the saved profile is tracked per user, so updating the company drops its entries
+    matches = await asyncio.to_thread(
+        match_cache.match_opportunities, unique, codes, certifications,
+        None if naics_codes else user["id"],
+    )
+    by_id = {str(opp["id"]): opp for opp in unique}
+    ranked = [
+        {
+            **by_id[match["opportunity_id"]],
+            "match_score": match["match_score"],
+            "match_reasons": match["reasons"],
+            "component_scores": match["component_scores"],
+        }
+        for match in matches[:limit]
+    ]
+
     return {
-        "matches": unique[:limit],
+        "matches": ranked,
         "total": len(unique),
         "naics_codes_searched": codes,
     }
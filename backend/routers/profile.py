@@ -1,17 +1,18 @@
 """
 User Profile & Company Management Router.
 """
+import asyncio
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import List, Optional
 from services.auth import get_user
-from services.db import (
+from services.db_async import (
     get_user_profile,
     update_user_profile,
     get_company,
     upsert_company,
-    supabase,
 )
+from services.db import supabase
 
 router = APIRouter(prefix="/api/profile", tags=["profile"])
 
@@ -45,8 +46,7 @@ class CompanyUpdateRequest(BaseModel):
 @router.get("")
 async def get_profile(user=Depends(get_user)):
     """Get user profile and company info."""
-    profile = get_user_profile(user["id"])
-    company = get_company(user["id"])
+    profile, company = await asyncio.gather(get_user_profile(user["id"]), get_company(user["id"]))
 
     return {
         "profile": profile or {
@@ -78,7 +78,7 @@ async def update_profile(
     if not updates:
         raise HTTPException(status_code=400, detail="No updates provided")
 
-    result = update_user_profile(user["id"], updates)
+    result = await update_user_profile(user["id"], updates)
     return {"updated": True, "profile": result}
 
 
@@ -87,7 +87,7 @@ async def update_profile(
 @router.get("/company")
 async def get_company_profile(user=Depends(get_user)):
     """Get company profile."""
-    company = get_company(user["id"])
+    company = await get_company(user["id"])
     if not company:
         return {"company": None, "message": "No company profile yet. Create one to get opportunity matching."}
     return {"company": company}
@@ -100,7 +100,7 @@ async def update_company_profile(
 ):
     """Create or update company profile."""
     data = request.model_dump(exclude_none=True)
-    result = upsert_company(user["id"], data)
+    result = await upsert_company(user["id"], data)
     return {"updated": True, "company": result}
 
 
@@ -109,8 +109,7 @@ async def update_company_profile(
 @router.get("/completeness")
 async def check_profile_completeness(user=Depends(get_user)):
     """Check profile completion percentage."""
-    profile = get_user_profile(user["id"])
-    company = get_company(user["id"])
+    profile, company = await asyncio.gather(get_user_profile(user["id"]), get_company(user["id"]))
 
     checks = {
         "email": bool(user.get("email")),
@@ -144,7 +143,7 @@ async def check_profile_completeness(user=Depends(get_user)):
 @router.get("/past-performance")
 async def get_past_performance(user=Depends(get_user)):
     """Get past performance records."""
-    company = get_company(user["id"])
+    company = await get_company(user["id"])
     cage = company.get("cage_code", "") if company else ""
 
     if cage:
@@ -169,8 +168,8 @@ async def get_past_performance(user=Depends(get_user)):
 @router.get("/saved-searches")
 async def list_saved_searches(user=Depends(get_user)):
     """Get user's saved searches."""
-    from services.db import get_saved_searches
-    return {"saved_searches": get_saved_searches(user["id"])}
+    from services.db_async import get_saved_searches
+    return {"saved_searches": await get_saved_searches(user["id"])}
 
 
 @router.post("/saved-searches")
@@ -181,8 +180,8 @@ async def create_saved_search(
     user=Depends(get_user),
 ):
     """Create a saved search with optional alerts."""
-    from services.db import create_saved_search
-    result = create_saved_search({
+    from services.db_async import create_saved_search
+    result = await create_saved_search({
         "user_id": user["id"],
         "name": name,
         "filters": filters,
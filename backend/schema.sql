@@ -79,7 +79,8 @@ CREATE TABLE opportunities (
     updated_at TIMESTAMPTZ DEFAULT NOW()
 );
 
--- Full-text search index
+-- Full-text search index. Migration 011 replaces it with the weighted
+-- search_vector column and its GIN index, and drops this one.
 CREATE INDEX idx_opportunities_search ON opportunities USING GIN (
     to_tsvector('english', COALESCE(title, '') || ' ' || COALESCE(description, ''))
 );
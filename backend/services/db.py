@@ -3,6 +3,15 @@ Supabase database client - single source of truth for all DB operations.
 """
 import os
 from supabase import create_client, Client
+from match_index import opportunity_index
+from match_cache import match_cache
+from count_cache import opportunity_counts
+from opportunity_cursor import (
+    encode_opportunity_cursor,
+    encode_offset_cursor,
+    decode_opportunity_cursor,
+    keyset_position,
+)
 
 SUPABASE_URL = os.getenv("SUPABASE_URL", "")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY", os.getenv("SUPABASE_KEY", ""))
@@ -46,14 +55,57 @@ def get_company(user_id: str):
 def upsert_company(user_id: str, data: dict):
     data["user_id"] = user_id
     result = supabase.table("companies").upsert(data, on_conflict="user_id").execute()
+    match_cache.invalidate_user(user_id)
     return result.data[0] if result.data else None
 
 
+# Company fields that feed match scoring (match_engine.company_profile)
+COMPANY_PROFILE_COLUMNS = "user_id, naics_codes, sdvosb_certified, certification_documents(document_type, status)"
+
+
+def get_company_profile(user_id: str):
+    """A company's matching fields, or None."""
+    result = supabase.table("companies").select(COMPANY_PROFILE_COLUMNS).eq("user_id", user_id).execute()
+    return result.data[0] if result.data else None
+
+
+def list_company_profiles(page_size: int = 1000):
+    """All companies' matching fields, fetched page by page."""
+    profiles = []
+    offset = 0
+    while True:
+        result = supabase.table("companies") \
+            .select(COMPANY_PROFILE_COLUMNS) \
+            .order("user_id") \
+            .range(offset, offset + page_size - 1) \
+            .execute()
+        rows = result.data or []
+        profiles.extend(rows)
+        if len(rows) < page_size:
+            return profiles
+        offset += page_size
+
+
 # ── Opportunity Operations ────────────────────────────────────────────
 
-def search_opportunities(filters: dict, limit: int = 50, offset: int = 0):
-    query = supabase.table("opportunities").select("*")
+# List pages (search_opportunities) select every opportunity column except
+# search_vector, the generated full-text vector (migration 011), which is
+# several KB per row and never displayed. Keep in step with the table; the
+# single-row reads and opportunities(*) embeds select * and need no update.
+OPPORTUNITY_COLUMNS = (
+    "id, notice_id, title, description, agency, office, naics_code, psc_code, set_aside, "
+    "place_of_performance, posted_date, response_deadline, contract_value_min, contract_value_max, "
+    "contract_type, source, url, attachments, keywords, status, match_score, last_synced_at, "
+    "created_at, updated_at"
+)
+
+# "exact" counts every matching row; "estimated" is exact up to PostgREST's
+# max-rows and a planner statistics estimate beyond it
+OPPORTUNITY_COUNT_MODE = os.getenv("OPPORTUNITY_COUNT_MODE", "exact")
+
 
+def _opportunity_filters(query, filters: dict):
+    """Apply search_opportunities filters to a PostgREST query (sync or async)."""
     if filters.get("naics_code"):
         query = query.eq("naics_code", filters["naics_code"])
     if filters.get("agency"):
@@ -63,13 +115,131 @@ def search_opportunities(filters: dict, limit: int = 50, offset: int = 0):
     if filters.get("status"):
         query = query.eq("status", filters["status"])
     if filters.get("search"):
-        query = query.or_(
-            f"title.ilike.%{filters['search']}%,description.ilike.%{filters['search']}%"
-        )
-
-    query = query.order("posted_date", desc=True).range(offset, offset + limit - 1)
-    result = query.execute()
-    return result.data or []
+        # Websearch syntax against the search_vector GIN index (migration 011)
+        query = query.filter("search_vector", "wfts(english)", filters["search"])
+    return query
+
+
+def _ranked_opportunities_params(filters: dict, limit: int, skip: int, with_total: bool = False) -> dict:
+    """Arguments of the search_opportunities_ranked_page RPC (migration 012)."""
+    return {
+        "query": filters["search"],
+        "naics_code": filters.get("naics_code") or None,
+        "agency": filters.get("agency") or None,
+        "set_aside": filters.get("set_aside") or None,
+        "status": filters.get("status") or None,
+        "max_rows": limit,
+        "skip_rows": skip,
+        "with_total": with_total,
+    }
+
+
+def _ranked_skip(filters: dict, offset: int, position):
+    """
+    Rows to skip when ``filters`` has a keyword search, else None. Ranked
+    results have no keyset order, so their cursors carry an offset.
+    """
+    if not filters.get("search"):
+        if isinstance(position, int):
+            raise ValueError("Invalid cursor")
+        return None
+    if isinstance(position, tuple):
+        raise ValueError("Invalid cursor")
+    return offset if position is None else position
+
+
+def _opportunity_page(query, limit: int, offset: int = 0, position=None):
+    """
+    Newest first by (posted_date desc nulls last, id desc). From a keyset
+    ``position`` (posted_date, id) the page starts just after it, so deep
+    pages cost the same as the first (idx_opportunities_posted_id) and rows
+    upserted meanwhile do not shift it. Otherwise ``offset`` rows are
+    skipped. ``(None, None)`` starts at the first undated row.
+    """
+    query = query.order("posted_date", desc=True, nullsfirst=False).order("id", desc=True)
+    if position is None:
+        return query.range(offset, offset + limit - 1)
+    posted_date, opportunity_id = position
+    if posted_date is None:
+        query = query.is_("posted_date", "null")
+        if opportunity_id:
+            query = query.lt("id", opportunity_id)
+    else:
+        # The plain <= bound is the index range; the or() only trims ties on posted_date
+        query = query.lte("posted_date", posted_date) \
+            .or_(f'posted_date.lt."{posted_date}",id.lt.{opportunity_id}')
+    return query.limit(limit)
+
+
+def _split_page(rows: list, limit: int, ranked_skip: int = None):
+    """Rows of a ``limit + 1`` fetch and the cursor for the next page, if any."""
+    if len(rows) <= limit:
+        return rows, None
+    if ranked_skip is not None:
+        return rows[:limit], encode_offset_cursor(ranked_skip + limit)
+    return rows[:limit], encode_opportunity_cursor(rows[limit - 1])
+
+
+def _fetch_opportunities(filters: dict, limit: int, offset: int, position, skip, count: str = None):
+    """
+    Rows of ``search_opportunities`` and, if ``count`` is given, the total
+    matching ``filters`` from the same request: (rows, total). The total is
+    None from a keyset position, whose bound would narrow the count too.
+    """
+    if skip is not None:
+        params = _ranked_opportunities_params(filters, limit, skip, with_total=count is not None)
+        page = supabase.rpc("search_opportunities_ranked_page", params).execute().data[0]
+        return page["rows"], page["total"]
+    counted = count if position is None else None
+    base = lambda mode=None: _opportunity_filters(
+        supabase.table("opportunities").select(OPPORTUNITY_COLUMNS, count=mode), filters)
+    result = _opportunity_page(base(counted), limit, offset, position).execute()
+    rows = result.data or []
+    if position and position[0] is not None and len(rows) < limit:
+        # Undated rows sort last, outside the keyset range above
+        rows += _opportunity_page(base(), limit - len(rows), position=(None, None)).execute().data or []
+    return rows, result.count if counted else None
+
+
+def search_opportunities(filters: dict, limit: int = 50, offset: int = 0, cursor: str = None):
+    """
+    Filtered opportunities, newest first; ``cursor`` (see encode_opportunity_cursor)
+    replaces ``offset``. With a ``search`` keyword query they are ranked by
+    relevance instead, and each row carries its ``search_rank``.
+    """
+    position = decode_opportunity_cursor(cursor) if cursor else None
+    rows, _ = _fetch_opportunities(filters, limit, offset, position, _ranked_skip(filters, offset, position))
+    return rows
+
+
+def search_opportunities_page(filters: dict, limit: int = 50, offset: int = 0, cursor: str = None):
+    """One page of ``search_opportunities`` and the cursor for the next: (rows, next_cursor or None)."""
+    position = decode_opportunity_cursor(cursor) if cursor else None
+    skip = _ranked_skip(filters, offset, position)
+    rows, _ = _fetch_opportunities(filters, limit + 1, offset, position, skip)
+    return _split_page(rows, limit, skip)
+
+
+def search_opportunities_counted(filters: dict, limit: int = 50, offset: int = 0, cursor: str = None,
+                                 count: str = OPPORTUNITY_COUNT_MODE):
+    """
+    ``search_opportunities_page`` plus the number of opportunities matching
+    ``filters``: (rows, next_cursor or None, total). The total comes from
+    the page request itself, or from ``opportunity_counts`` on later pages;
+    only a cursor page with nothing cached counts separately. ``count`` is
+    "exact" or "estimated" (see OPPORTUNITY_COUNT_MODE); ranked keyword
+    searches are always counted exactly.
+    """
+    position = decode_opportunity_cursor(cursor) if cursor else None
+    skip = _ranked_skip(filters, offset, position)
+    total = opportunity_counts.get(filters, count)
+    rows, fetched = _fetch_opportunities(filters, limit + 1, offset, position, skip,
+                                         count if total is None else None)
+    if total is None:
+        total = fetched if fetched is not None else count_opportunities(filters, count)
+        opportunity_counts.set(filters, count, total)
+    rows, next_cursor = _split_page(rows, limit, skip)
+    return rows, next_cursor, total
 
 
 def get_opportunity(opportunity_id: str):
@@ -86,15 +256,87 @@ def upsert_opportunity(data: dict):
     result = supabase.table("opportunities").upsert(
         data, on_conflict="notice_id"
     ).execute()
-    return result.data[0] if result.data else None
+    row = result.data[0] if result.data else None
+    if row:
+        row.pop("search_vector", None)
+        _opportunity_changed(row)
+    return row
+
+
+def _opportunity_changed(row: dict):
+    """Keep the in-process match cache, index and counts in step with an upserted opportunity."""
+    match_cache.invalidate_opportunity(row["id"])
+    opportunity_counts.clear()
+    if row.get("status", "active") == "active":
+        opportunity_index.add(row)
+    else:
+        opportunity_index.remove(row["id"])
+
+
+def count_opportunities(filters: dict = None, count: str = "exact"):
+    """Opportunities matching ``filters``, counted without fetching any rows."""
+    query = supabase.table("opportunities").select("id", count=count, head=True)
+    result = _opportunity_filters(query, filters or {}).execute()
+    return result.count or 0
 
 
-def count_opportunities(filters: dict = None):
-    query = supabase.table("opportunities").select("id", count="exact")
-    if filters and filters.get("status"):
-        query = query.eq("status", filters["status"])
-    result = query.execute()
-    return result.count or 0
+def load_opportunity_index(page_size: int = 1000) -> int:
+    """Fill the in-process match index with every active opportunity; returns the count."""
+    loaded = 0
+    after = None
+    while True:
+        query = supabase.table("opportunities").select("id, naics_code, keywords").eq("status", "active")
+        if after:
+            query = query.gt("id", after)
+        rows = query.order("id").limit(page_size).execute().data or []
+        opportunity_index.add_many(rows)
+        loaded += len(rows)
+        if len(rows) < page_size:
+            opportunity_index.loaded = True
+            return loaded
+        after = rows[-1]["id"]
+
+
+def list_opportunities_changed_since(after=None, before: str = None, limit: int = 500):
+    """
+    Opportunities ordered by (updated_at, id), strictly after the ``after``
+    (updated_at, id) keyset position and updated before ``before``.
+    """
+    query = supabase.table("opportunities").select("id, title, description, agency, naics_code, updated_at") \
+        .not_.is_("updated_at", "null")
+    if after:
+        updated_at, opportunity_id = keyset_position(*after)
+        query = query.or_(
+            f'updated_at.gt."{updated_at}",and(updated_at.eq."{updated_at}",id.gt.{opportunity_id})'
+        )
+    if before:
+        query = query.lt("updated_at", before)
+    result = query.order("updated_at").order("id").limit(limit).execute()
+    return result.data or []
+
+
+# ── Opportunity Match Operations ──────────────────────────────────────
+
+def upsert_opportunity_matches(rows: list, batch_size: int = 500) -> int:
+    """Bulk upsert precomputed (user, opportunity) matches."""
+    written = 0
+    for i in range(0, len(rows), batch_size):
+        batch = rows[i:i + batch_size]
+        supabase.table("opportunity_matches").upsert(
+            batch, on_conflict="user_id,opportunity_id"
+        ).execute()
+        written += len(batch)
+    return written
+
+
+def get_opportunity_matches(user_id: str, limit: int = 25):
+    result = supabase.table("opportunity_matches") \
+        .select("*, opportunities(*)") \
+        .eq("user_id", user_id) \
+        .order("match_score", desc=True) \
+        .limit(limit) \
+        .execute()
+    return result.data or []
 
 
 # ── Saved Opportunity Operations ──────────────────────────────────────
@@ -300,8 +542,8 @@ def update_certification(cert_id: str, updates: dict):
 
 # ── Contract History Operations ───────────────────────────────────────
 
-def search_contracts(filters: dict, limit: int = 100, offset: int = 0):
-    query = supabase.table("contracts_history").select("*")
+def _contract_filters(query, filters: dict):
+    """Apply search_contracts filters to a PostgREST query (sync or async)."""
     if filters.get("naics_code"):
         query = query.eq("naics_code", filters["naics_code"])
     if filters.get("agency"):
@@ -312,6 +554,11 @@ def search_contracts(filters: dict, limit: int = 100, offset: int = 0):
         query = query.gte("award_amount", filters["min_amount"])
     if filters.get("max_amount"):
         query = query.lte("award_amount", filters["max_amount"])
+    return query
+
+
+def search_contracts(filters: dict, limit: int = 100, offset: int = 0):
+    query = _contract_filters(supabase.table("contracts_history").select("*"), filters)
     query = query.order("award_date", desc=True).range(offset, offset + limit - 1)
     result = query.execute()
     return result.data or []
@@ -0,0 +1,561 @@
+"""
+Async Supabase data access - awaitable twins of the helpers in services.db.
+
+``services.db`` uses the synchronous supabase client, so every call from an
+``async def`` route blocks the event loop for a full PostgREST round trip.
+This module exposes the same function names as coroutines. They run on
+PostgREST's async client over one pooled HTTP/2 session per event loop
+(SUPABASE_POOL_MAX_CONNECTIONS, SUPABASE_POOL_KEEPALIVE), so concurrent
+requests share multiplexed connections instead of queueing behind each
+other.
+
+Query filters and the in-process index/cache side effects are shared with
+``services.db``. Background jobs and threads keep using the sync module.
+"""
+import os
+import asyncio
+import weakref
+
+import httpx
+from postgrest import AsyncPostgrestClient
+
+from services.db import (
+    SUPABASE_URL,
+    SUPABASE_KEY,
+    COMPANY_PROFILE_COLUMNS,
+    OPPORTUNITY_COLUMNS,
+    OPPORTUNITY_COUNT_MODE,
+    decode_opportunity_cursor,
+    _opportunity_filters,
+    _ranked_opportunities_params,
+    _ranked_skip,
+    _opportunity_page,
+    _split_page,
+    _contract_filters,
+    _opportunity_changed,
+)
+from match_cache import match_cache
+from match_index import opportunity_index
+from count_cache import opportunity_counts
+from opportunity_cursor import keyset_position
+
+SUPABASE_POOL_MAX_CONNECTIONS = int(os.getenv("SUPABASE_POOL_MAX_CONNECTIONS", "20"))
+SUPABASE_POOL_KEEPALIVE = int(os.getenv("SUPABASE_POOL_KEEPALIVE", "20"))
+SUPABASE_HTTP_TIMEOUT = float(os.getenv("SUPABASE_HTTP_TIMEOUT", "120"))
+
+
+class PooledPostgrestClient(AsyncPostgrestClient):
+    """AsyncPostgrestClient whose HTTP/2 session has explicit pool limits."""
+
+    def create_session(self, base_url, headers, timeout, verify=True, proxy=None) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            verify=verify,
+            proxy=proxy,
+            follow_redirects=True,
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=SUPABASE_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=SUPABASE_POOL_KEEPALIVE,
+            ),
+        )
+
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, PooledPostgrestClient]" = \
+    weakref.WeakKeyDictionary()
+
+
+def postgrest() -> PooledPostgrestClient:
+    """The PostgREST client for the running event loop (connections cannot cross loops)."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        url = SUPABASE_URL or "https://placeholder.supabase.co"
+        key = SUPABASE_KEY or "placeholder-key"
+        client = _clients[loop] = PooledPostgrestClient(
+            f"{url.rstrip('/')}/rest/v1",
+            headers={"apikey": key, "Authorization": f"Bearer {key}"},
+            timeout=SUPABASE_HTTP_TIMEOUT,
+        )
+    return client
+
+
+async def aclose():
+    """Close the running loop's pooled connections (app shutdown)."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def _table(name: str):
+    return postgrest().table(name)
+
+
+# ── User Profile Operations ──────────────────────────────────────────
+
+async def get_user_profile(user_id: str):
+    result = await _table("user_profiles").select("*").eq("id", user_id).execute()
+    return result.data[0] if result.data else None
+
+
+async def create_user_profile(user_id: str, email: str, full_name: str = ""):
+    result = await _table("user_profiles").upsert({
+        "id": user_id,
+        "full_name": full_name,
+        "subscription_plan": "free",
+    }).execute()
+    return result.data[0] if result.data else None
+
+
+async def update_user_profile(user_id: str, updates: dict):
+    result = await _table("user_profiles").update(updates).eq("id", user_id).execute()
+    return result.data[0] if result.data else None
+
+
+# ── Company Operations ────────────────────────────────────────────────
+
+async def get_company(user_id: str):
+    result = await _table("companies").select("*").eq("user_id", user_id).execute()
+    return result.data[0] if result.data else None
+
+
+async def upsert_company(user_id: str, data: dict):
+    data["user_id"] = user_id
+    result = await _table("companies").upsert(data, on_conflict="user_id").execute()
+    match_cache.invalidate_user(user_id)
+    return result.data[0] if result.data else None
+
+
+async def get_company_profile(user_id: str):
+    """A company's matching fields, or None."""
+    result = await _table("companies").select(COMPANY_PROFILE_COLUMNS).eq("user_id", user_id).execute()
+    return result.data[0] if result.data else None
+
+
+async def list_company_profiles(page_size: int = 1000):
+    """All companies' matching fields, fetched page by page."""
+    profiles = []
+    offset = 0
+    while True:
+        result = await _table("companies") \
+            .select(COMPANY_PROFILE_COLUMNS) \
+            .order("user_id") \
+            .range(offset, offset + page_size - 1) \
+            .execute()
+        rows = result.data or []
+        profiles.extend(rows)
+        if len(rows) < page_size:
+            return profiles
+        offset += page_size
+
+
+# ── Opportunity Operations ────────────────────────────────────────────
+
+async def _fetch_opportunities(filters: dict, limit: int, offset: int, position, skip, count: str = None):
+    """
+    Rows of ``search_opportunities`` and, if ``count`` is given, the total
+    matching ``filters`` from the same request: (rows, total). The total is
+    None from a keyset position, whose bound would narrow the count too.
+    """
+    if skip is not None:
+        params = _ranked_opportunities_params(filters, limit, skip, with_total=count is not None)
+        page = (await postgrest().rpc("search_opportunities_ranked_page", params).execute()).data[0]
+        return page["rows"], page["total"]
+    counted = count if position is None else None
+    base = lambda mode=None: _opportunity_filters(
+        _table("opportunities").select(OPPORTUNITY_COLUMNS, count=mode), filters)
+    result = await _opportunity_page(base(counted), limit, offset, position).execute()
+    rows = result.data or []
+    if position and position[0] is not None and len(rows) < limit:
+        # Undated rows sort last, outside the keyset range above
+        rows += (await _opportunity_page(base(), limit - len(rows), position=(None, None)).execute()).data or []
+    return rows, result.count if counted else None
+
+
+async def search_opportunities(filters: dict, limit: int = 50, offset: int = 0, cursor: str = None):
+    """
+    Filtered opportunities, newest first; ``cursor`` (see encode_opportunity_cursor)
+    replaces ``offset``. With a ``search`` keyword query they are ranked by
+    relevance instead, and each row carries its ``search_rank``.
+    """
+    position = decode_opportunity_cursor(cursor) if cursor else None
+    rows, _ = await _fetch_opportunities(filters, limit, offset, position, _ranked_skip(filters, offset, position))
+    return rows
+
+
+async def search_opportunities_page(filters: dict, limit: int = 50, offset: int = 0, cursor: str = None):
+    """One page of ``search_opportunities`` and the cursor for the next: (rows, next_cursor or None)."""
+    position = decode_opportunity_cursor(cursor) if cursor else None
+    skip = _ranked_skip(filters, offset, position)
+    rows, _ = await _fetch_opportunities(filters, limit + 1, offset, position, skip)
+    return _split_page(rows, limit, skip)
+
+
+async def search_opportunities_counted(filters: dict, limit: int = 50, offset: int = 0, cursor: str = None,
+                                       count: str = OPPORTUNITY_COUNT_MODE):
+    """
+    ``search_opportunities_page`` plus the number of opportunities matching
+    ``filters``: (rows, next_cursor or None, total). The total comes from
+    the page request itself, or from ``opportunity_counts`` on later pages;
+    only a cursor page with nothing cached counts separately, concurrently
+    with the page. ``count`` is "exact" or "estimated" (see
+    OPPORTUNITY_COUNT_MODE); ranked keyword searches are always counted exactly.
+    """
+    position = decode_opportunity_cursor(cursor) if cursor else None
+    skip = _ranked_skip(filters, offset, position)
+    total = opportunity_counts.get(filters, count)
+    if total is None and skip is None and position is not None:
+        (rows, _), total = await asyncio.gather(
+            _fetch_opportunities(filters, limit + 1, offset, position, skip),
+            count_opportunities(filters, count),
+        )
+        opportunity_counts.set(filters, count, total)
+    else:
+        rows, fetched = await _fetch_opportunities(filters, limit + 1, offset, position, skip,
+                                                   count if total is None else None)
+        if total is None:
+            total = fetched or 0
+            opportunity_counts.set(filters, count, total)
+    rows, next_cursor = _split_page(rows, limit, skip)
+    return rows, next_cursor, total
+
+
+async def get_opportunity(opportunity_id: str):
+    result = await _table("opportunities").select("*").eq("id", opportunity_id).execute()
+    return result.data[0] if result.data else None
+
+
+async def get_opportunity_by_notice_id(notice_id: str):
+    result = await _table("opportunities").select("*").eq("notice_id", notice_id).execute()
+    return result.data[0] if result.data else None
+
+
+async def upsert_opportunity(data: dict):
+    result = await _table("opportunities").upsert(
+        data, on_conflict="notice_id"
+    ).execute()
+    row = result.data[0] if result.data else None
+    if row:
+        row.pop("search_vector", None)
+        _opportunity_changed(row)
+    return row
+
+
+async def count_opportunities(filters: dict = None, count: str = "exact"):
+    """Opportunities matching ``filters``, counted without fetching any rows."""
+    query = _table("opportunities").select("id", count=count, head=True)
+    result = await _opportunity_filters(query, filters or {}).execute()
+    return result.count or 0
+
+
+async def load_opportunity_index(page_size: int = 1000) -> int:
+    """Fill the in-process match index with every active opportunity; returns the count."""
+    loaded = 0
+    after = None
+    while True:
+        query = _table("opportunities").select("id, naics_code, keywords").eq("status", "active")
+        if after:
+            query = query.gt("id", after)
+        rows = (await query.order("id").limit(page_size).execute()).data or []
+        opportunity_index.add_many(rows)
+        loaded += len(rows)
+        if len(rows) < page_size:
+            opportunity_index.loaded = True
+            return loaded
+        after = rows[-1]["id"]
+
+
+async def list_opportunities_changed_since(after=None, before: str = None, limit: int = 500):
+    """
+    Opportunities ordered by (updated_at, id), strictly after the ``after``
+    (updated_at, id) keyset position and updated before ``before``.
+    """
+    query = _table("opportunities").select("id, title, description, agency, naics_code, updated_at") \
+        .not_.is_("updated_at", "null")
+    if after:
+        updated_at, opportunity_id = keyset_position(*after)
+        query = query.or_(
+            f'updated_at.gt."{updated_at}",and(updated_at.eq."{updated_at}",id.gt.{opportunity_id})'
+        )
+    if before:
+        query = query.lt("updated_at", before)
+    result = await query.order("updated_at").order("id").limit(limit).execute()
+    return result.data or []
+
+
+# ── Opportunity Match Operations ──────────────────────────────────────
+
+async def upsert_opportunity_matches(rows: list, batch_size: int = 500) -> int:
+    """Bulk upsert precomputed (user, opportunity) matches."""
+    written = 0
+    for i in range(0, len(rows), batch_size):
+        batch = rows[i:i + batch_size]
+        await _table("opportunity_matches").upsert(
+            batch, on_conflict="user_id,opportunity_id"
+        ).execute()
+        written += len(batch)
+    return written
+
+
+async def get_opportunity_matches(user_id: str, limit: int = 25):
+    result = await _table("opportunity_matches") \
+        .select("*, opportunities(*)") \
+        .eq("user_id", user_id) \
+        .order("match_score", desc=True) \
+        .limit(limit) \
+        .execute()
+    return result.data or []
+
+
+# ── Saved Opportunity Operations ──────────────────────────────────────
+
+async def get_saved_opportunities(user_id: str, status: str = None):
+    query = _table("saved_opportunities") \
+        .select("*, opportunities(*)") \
+        .eq("user_id", user_id)
+    if status:
+        query = query.eq("status", status)
+    query = query.order("created_at", desc=True)
+    result = await query.execute()
+    return result.data or []
+
+
+async def save_opportunity(user_id: str, opportunity_id: str, status: str = "reviewing"):
+    result = await _table("saved_opportunities").upsert({
+        "user_id": user_id,
+        "opportunity_id": opportunity_id,
+        "status": status,
+    }, on_conflict="user_id,opportunity_id").execute()
+    return result.data[0] if result.data else None
+
+
+async def update_saved_opportunity(user_id: str, opportunity_id: str, updates: dict):
+    result = await _table("saved_opportunities") \
+        .update(updates) \
+        .eq("user_id", user_id) \
+        .eq("opportunity_id", opportunity_id) \
+        .execute()
+    return result.data[0] if result.data else None
+
+
+async def delete_saved_opportunity(user_id: str, opportunity_id: str):
+    await _table("saved_opportunities") \
+        .delete() \
+        .eq("user_id", user_id) \
+        .eq("opportunity_id", opportunity_id) \
+        .execute()
+
+
+# ── Proposal Operations ──────────────────────────────────────────────
+
+async def get_proposals(user_id: str, status: str = None):
+    query = _table("proposals") \
+        .select("*, opportunities(title, agency, naics_code)") \
+        .eq("user_id", user_id)
+    if status:
+        query = query.eq("status", status)
+    query = query.order("created_at", desc=True)
+    result = await query.execute()
+    return result.data or []
+
+
+async def get_proposal(proposal_id: str, user_id: str = None):
+    query = _table("proposals") \
+        .select("*, opportunities(*)") \
+        .eq("id", proposal_id)
+    if user_id:
+        query = query.eq("user_id", user_id)
+    result = await query.execute()
+    return result.data[0] if result.data else None
+
+
+async def create_proposal(data: dict):
+    result = await _table("proposals").insert(data).execute()
+    return result.data[0] if result.data else None
+
+
+async def update_proposal(proposal_id: str, updates: dict):
+    result = await _table("proposals").update(updates).eq("id", proposal_id).execute()
+    return result.data[0] if result.data else None
+
+
+# ── AI Analysis Operations ────────────────────────────────────────────
+
+async def save_ai_analysis(data: dict):
+    result = await _table("ai_analyses").insert(data).execute()
+    return result.data[0] if result.data else None
+
+
+async def get_ai_analyses(opportunity_id: str, user_id: str, analysis_type: str = None):
+    query = _table("ai_analyses") \
+        .select("*") \
+        .eq("opportunity_id", opportunity_id) \
+        .eq("user_id", user_id)
+    if analysis_type:
+        query = query.eq("analysis_type", analysis_type)
+    query = query.order("created_at", desc=True)
+    result = await query.execute()
+    return result.data or []
+
+
+# ── Chat / Conversation Operations ────────────────────────────────────
+
+async def get_user_conversations(user_id: str):
+    result = await _table("chat_sessions") \
+        .select("*") \
+        .eq("user_id", user_id) \
+        .order("updated_at", desc=True) \
+        .execute()
+    return result.data or []
+
+
+async def create_conversation(user_id: str, agent_type: str, title: str = "New conversation"):
+    result = await _table("chat_sessions").insert({
+        "user_id": user_id,
+        "agent_type": agent_type,
+        "title": title,
+    }).execute()
+    return result.data[0] if result.data else None
+
+
+async def save_message(session_id: str, role: str, content: str, metadata: dict = None):
+    result = await _table("chat_messages").insert({
+        "session_id": session_id,
+        "role": role,
+        "content": content,
+        "metadata": metadata,
+    }).execute()
+    return result.data[0] if result.data else None
+
+
+async def get_conversation_messages(session_id: str, limit: int = 50):
+    result = await _table("chat_messages") \
+        .select("*") \
+        .eq("session_id", session_id) \
+        .order("created_at") \
+        .limit(limit) \
+        .execute()
+    return result.data or []
+
+
+async def update_conversation(session_id: str, updates: dict):
+    await _table("chat_sessions").update(updates).eq("id", session_id).execute()
+
+
+# ── Notification Operations ───────────────────────────────────────────
+
+async def get_notifications(user_id: str, unread_only: bool = False, limit: int = 50):
+    query = _table("notifications") \
+        .select("*") \
+        .eq("user_id", user_id)
+    if unread_only:
+        query = query.eq("is_read", False)
+    query = query.order("created_at", desc=True).limit(limit)
+    result = await query.execute()
+    return result.data or []
+
+
+async def create_notification(data: dict):
+    result = await _table("notifications").insert(data).execute()
+    return result.data[0] if result.data else None
+
+
+async def mark_notification_read(notification_id: str):
+    await _table("notifications") \
+        .update({"is_read": True}) \
+        .eq("id", notification_id) \
+        .execute()
+
+
+async def mark_all_notifications_read(user_id: str):
+    await _table("notifications") \
+        .update({"is_read": True}) \
+        .eq("user_id", user_id) \
+        .eq("is_read", False) \
+        .execute()
+
+
+async def get_unread_notification_count(user_id: str) -> int:
+    result = await _table("notifications") \
+        .select("id", count="exact") \
+        .eq("user_id", user_id) \
+        .eq("is_read", False) \
+        .execute()
+    return result.count or 0
+
+
+# ── Certification Operations ─────────────────────────────────────────
+
+async def get_certifications(user_id: str):
+    result = await _table("certification_documents") \
+        .select("*") \
+        .eq("user_id", user_id) \
+        .order("created_at", desc=True) \
+        .execute()
+    return result.data or []
+
+
+async def create_certification(data: dict):
+    result = await _table("certification_documents").insert(data).execute()
+    return result.data[0] if result.data else None
+
+
+async def update_certification(cert_id: str, updates: dict):
+    result = await _table("certification_documents") \
+        .update(updates) \
+        .eq("id", cert_id) \
+        .execute()
+    return result.data[0] if result.data else None
+
+
+# ── Contract History Operations ───────────────────────────────────────
+
+async def search_contracts(filters: dict, limit: int = 100, offset: int = 0):
+    query = _contract_filters(_table("contracts_history").select("*"), filters)
+    query = query.order("award_date", desc=True).range(offset, offset + limit - 1)
+    result = await query.execute()
+    return result.data or []
+
+
+async def upsert_contract(data: dict):
+    result = await _table("contracts_history").upsert(
+        data, on_conflict="contract_id"
+    ).execute()
+    return result.data[0] if result.data else None
+
+
+# ── Saved Searches ────────────────────────────────────────────────────
+
+async def get_saved_searches(user_id: str):
+    result = await _table("saved_searches") \
+        .select("*") \
+        .eq("user_id", user_id) \
+        .order("created_at", desc=True) \
+        .execute()
+    return result.data or []
+
+
+async def create_saved_search(data: dict):
+    result = await _table("saved_searches").insert(data).execute()
+    return result.data[0] if result.data else None
+
+
+# ── Analytics ─────────────────────────────────────────────────────────
+
+async def track_interaction(user_id: str, opportunity_id: str, interaction_type: str, metadata: dict = None):
+    await _table("opportunity_interactions").insert({
+        "user_id": user_id,
+        "opportunity_id": opportunity_id,
+        "interaction_type": interaction_type,
+        "metadata": metadata or {},
+    }).execute()
+
+
+async def track_analytics_event(user_id: str, event_type: str, event_data: dict = None):
+    await _table("analytics_events").insert({
+        "user_id": user_id,
+        "event_type": event_type,
+        "event_data": event_data or {},
+    }).execute()
@@ -0,0 +1,106 @@
+"""
+Embedding providers.
+
+A provider is an OpenAI-style client: ``provider.embeddings.create(model=,
+input=[...])`` returns an object whose ``data`` items carry ``index`` and
+``embedding``. ``services.embeddings_ai`` sends every request through the
+provider picked by EMBEDDING_PROVIDER:
+
+- ``openai`` (default): the ``openai`` module.
+- ``hashing``: ``HashingEmbeddingProvider``, a deterministic local
+  feature-hashing embedder. It needs no network or API key, so tests,
+  benchmarks and load tests can drive the whole embeddings pipeline.
+  Texts that share words get similar vectors, but it captures no semantics
+  beyond that.
+
+Other providers can be added with ``register_embedding_provider``.
+"""
+import os
+import hashlib
+from types import SimpleNamespace
+from functools import lru_cache
+from typing import List, Dict, Callable, Tuple, Any
+
+import numpy as np
+
+from services.hybrid_search import tokenize
+
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "openai").lower()
+EMBEDDING_HASH_DIM = int(os.getenv("EMBEDDING_HASH_DIM", "1536"))
+
+
+@lru_cache(maxsize=262144)
+def _feature(token: str, dim: int) -> Tuple[int, float]:
+    """Bucket and sign of a token: stable across processes, unlike ``hash()``."""
+    digest = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+    return digest % dim, 1.0 if digest >> 63 else -1.0
+
+
+class HashingEmbeddingProvider:
+    """
+    Signed feature hashing of unigrams and bigrams into a unit-length
+    ``dim``-vector. Each term is weighted by ``1 + log(tf)``. The same text
+    always maps to the same vector, and the ``model`` argument is ignored.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_HASH_DIM):
+        self.dim = dim
+        # Cached vectors are keyed by model name, so never mix them with a real model's
+        self.default_model = f"local-hashing-{dim}"
+        self.requests = 0
+        self.embeddings = self  # OpenAI-style ``client.embeddings.create``
+
+    def embed_text(self, text: str) -> np.ndarray:
+        tokens = tokenize(text)
+        counts: Dict[str, int] = {}
+        for term in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+            counts[term] = counts.get(term, 0) + 1
+        if not counts:
+            return np.zeros(self.dim, dtype=np.float32)
+        features = [_feature(term, self.dim) for term in counts]
+        buckets = np.fromiter((bucket for bucket, _ in features), dtype=np.int64, count=len(features))
+        weights = np.fromiter((sign for _, sign in features), dtype=np.float64, count=len(features))
+        weights *= 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float64, count=len(counts)))
+        vector = np.bincount(buckets, weights=weights, minlength=self.dim).astype(np.float32)
+        norm = float(np.linalg.norm(vector))
+        if norm:
+            vector /= norm
+        return vector
+
+    def create(self, model: str = None, input: Any = None, **_) -> SimpleNamespace:
+        texts = [input] if isinstance(input, str) else list(input)
+        self.requests += 1
+        return SimpleNamespace(model=model, data=[
+            SimpleNamespace(index=i, embedding=self.embed_text(text).tolist())
+            for i, text in enumerate(texts)
+        ])
+
+
+def _openai_provider():
+    import openai
+
+    return openai
+
+
+_factories: Dict[str, Callable[[], Any]] = {
+    "openai": _openai_provider,
+    "hashing": HashingEmbeddingProvider,
+}
+
+
+def register_embedding_provider(name: str, factory: Callable[[], Any]) -> None:
+    """Make ``factory()`` selectable as EMBEDDING_PROVIDER=``name``."""
+    _factories[name.lower()] = factory
+
+
+def get_embedding_provider(name: str = EMBEDDING_PROVIDER):
+    """Instantiate the provider registered as ``name``."""
+    factory = _factories.get(name.lower())
+    if factory is None:
+        raise ValueError(f"Unknown embedding provider {name!r}; expected one of {sorted(_factories)}.")
+    return factory()
+
+
+def provider_model(provider) -> str:
+    """The model name to request (and cache vectors under) for ``provider``."""
+    return getattr(provider, "default_model", "text-embedding-3-small")
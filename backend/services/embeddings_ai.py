@@ -3,26 +3,376 @@ Embeddings AI Service - Generate and manage vector embeddings
 """
 import openai
 import os
+import asyncio
 import uuid
+import unicodedata
+import weakref
 import hashlib
-import json
-from typing import List, Dict, Any, Optional
-from sqlalchemy.orm import Session
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, NamedTuple
+from sqlalchemy.orm import Session, defer
 from database import SessionLocal
-from models.embeddings import EmbeddingRecord, SemanticSearchCache
+from models.embeddings import EmbeddingRecord, EmbeddingCache
+from services import pgvector_store
+from services.vector_store import vector_store
+from services.hybrid_search import keyword_index, reciprocal_rank_fusion
+from services.search_cache import cache_key, search_cache
+from services.embedding_providers import get_embedding_provider, provider_model
+from services.vector_codec import EMBEDDING_VECTOR_FORMAT, decode_vector, encode_vector
 
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
+# OpenAI-style client every request goes through (EMBEDDING_PROVIDER, see services.embedding_providers)
+embedding_provider = get_embedding_provider()
+DEFAULT_EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL") or provider_model(embedding_provider)
+# Inputs per provider request, estimated tokens per request and concurrent requests
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "256"))
+EMBED_BATCH_TOKENS = int(os.getenv("EMBED_BATCH_TOKENS", "200000"))
+EMBED_MAX_CONCURRENCY = int(os.getenv("EMBED_MAX_CONCURRENCY", "4"))
+# How long the async micro-batcher waits for more store_embedding calls
+EMBED_COALESCE_MS = float(os.getenv("EMBED_COALESCE_MS", "5"))
+# Passage window and overlap (estimated tokens) for long documents
+EMBED_CHUNK_TOKENS = int(os.getenv("EMBED_CHUNK_TOKENS", "512"))
+EMBED_CHUNK_OVERLAP = int(os.getenv("EMBED_CHUNK_OVERLAP", "64"))
+# Passages fetched per requested result before pooling them per source
+SEARCH_PASSAGE_OVERSAMPLE = int(os.getenv("SEARCH_PASSAGE_OVERSAMPLE", "4"))
+# semantic_search ranking: "vector", "keyword" (BM25) or "hybrid" (both, rank-fused)
+SEMANTIC_SEARCH_MODE = os.getenv("SEMANTIC_SEARCH_MODE", "vector").lower()
 
-def embed(text: str, model: str = "text-embedding-3-small") -> List[float]:
+
+def embed(text: str, model: str = DEFAULT_EMBEDDING_MODEL) -> List[float]:
     """Generate embedding vector for text"""
-    response = openai.embeddings.create(
+    response = embedding_provider.embeddings.create(
         model=model,
         input=text
     )
     return response.data[0].embedding
 
 
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), good enough for request budgeting."""
+    return len(text) // 4 + 1
+
+
+def plan_batches(texts: List[str], batch_size: int = EMBED_BATCH_SIZE,
+                 max_batch_tokens: int = EMBED_BATCH_TOKENS) -> List[List[int]]:
+    """
+    Split texts (by index, order preserved) into request batches of at most
+    ``batch_size`` inputs and ``max_batch_tokens`` estimated tokens. A single
+    text over the token budget gets a batch of its own.
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    tokens = 0
+    for i, text in enumerate(texts):
+        cost = estimate_tokens(text)
+        if current and (len(current) >= batch_size or tokens + cost > max_batch_tokens):
+            batches.append(current)
+            current, tokens = [], 0
+        current.append(i)
+        tokens += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def embed_many(
+    texts: List[str],
+    model: str = DEFAULT_EMBEDDING_MODEL,
+    batch_size: int = EMBED_BATCH_SIZE,
+    max_batch_tokens: int = EMBED_BATCH_TOKENS,
+    max_concurrency: int = EMBED_MAX_CONCURRENCY,
+    client=None
+) -> List[List[float]]:
+    """
+    Embed many texts with as few provider requests as possible.
+
+    Texts are packed into batches (see ``plan_batches``) and up to
+    ``max_concurrency`` batches are in flight at once. ``client`` is anything
+    with an OpenAI-style ``embeddings.create(model=, input=[...])``; it
+    defaults to ``embedding_provider``. Returns one vector per text, in order.
+    """
+    if not texts:
+        return []
+    client = client or embedding_provider
+    batches = plan_batches(texts, batch_size, max_batch_tokens)
+
+    def run(batch: List[int]) -> List[List[float]]:
+        response = client.embeddings.create(model=model, input=[texts[i] for i in batch])
+        data = sorted(response.data, key=lambda d: getattr(d, "index", 0))
+        return [d.embedding for d in data]
+
+    vectors: List[Optional[List[float]]] = [None] * len(texts)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(batches)))) as pool:
+        for batch, batch_vectors in zip(batches, pool.map(run, batches)):
+            for i, vector in zip(batch, batch_vectors):
+                vectors[i] = vector
+    return vectors
+
+
+class EmbeddingBatcher:
+    """
+    Async micro-batcher: concurrent ``embed`` calls made within
+    ``max_delay_ms`` of each other are sent as one provider request
+    (split further only by ``embed_many``'s batch limits).
+    """
+
+    def __init__(self, model: str = DEFAULT_EMBEDDING_MODEL, max_delay_ms: float = EMBED_COALESCE_MS,
+                 max_batch: int = EMBED_BATCH_SIZE, client=None):
+        self.model = model
+        self.max_delay = max_delay_ms / 1000.0
+        self.max_batch = max_batch
+        self.client = client
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.requests = 0
+
+    async def embed(self, text: str) -> List[float]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if pending:
+            asyncio.ensure_future(self._run(pending))
+
+    async def _run(self, pending: List[Tuple[str, asyncio.Future]]) -> None:
+        texts = [text for text, _ in pending]
+        try:
+            self.requests += len(plan_batches(texts, self.max_batch))
+            vectors = await asyncio.to_thread(embed_many, texts, self.model, self.max_batch,
+                                              client=self.client)
+        except Exception as exc:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), vector in zip(pending, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+
+_batchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, EmbeddingBatcher]" = weakref.WeakKeyDictionary()
+
+
+def embedding_batcher() -> EmbeddingBatcher:
+    """The micro-batcher for the running event loop."""
+    loop = asyncio.get_running_loop()
+    batcher = _batchers.get(loop)
+    if batcher is None:
+        batcher = _batchers[loop] = EmbeddingBatcher()
+    return batcher
+
+
+# ── Content-addressed embedding cache ──────────────────────────────────
+
+CACHE_LOOKUP_CHUNK = 500
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for cache keys: NFC, whitespace collapsed, trimmed."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def _insert_ignore_conflicts(db: Session, table, rows: List[Dict[str, Any]]) -> None:
+    """INSERT ... ON CONFLICT DO NOTHING (another worker may cache the same text)."""
+    if not rows:
+        return
+    if db.get_bind().dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    db.execute(insert(table).values(rows).on_conflict_do_nothing())
+
+
+def cached_embed_many(
+    texts: List[str],
+    db: Session,
+    model: str = DEFAULT_EMBEDDING_MODEL,
+    client=None,
+    max_concurrency: int = EMBED_MAX_CONCURRENCY
+) -> List[List[float]]:
+    """
+    ``embed_many`` behind the embedding_cache table: texts whose normalized
+    form was embedded before with ``model`` cost no provider call, and
+    duplicate texts in one call are embedded once. New vectors are added to
+    the cache (flushed with the caller's transaction). Cached vectors are
+    stored as lossless float32 bytes and returned as numpy arrays.
+    """
+    hashes = [text_hash(text) for text in texts]
+    found: Dict[str, List[float]] = {}
+    unique_hashes = list(dict.fromkeys(hashes))
+    for start in range(0, len(unique_hashes), CACHE_LOOKUP_CHUNK):
+        chunk = unique_hashes[start:start + CACHE_LOOKUP_CHUNK]
+        rows = db.query(EmbeddingCache.text_hash, EmbeddingCache.vector_data).filter(
+            EmbeddingCache.embedding_model == model,
+            EmbeddingCache.text_hash.in_(chunk),
+            EmbeddingCache.vector_data.isnot(None)
+        )
+        found.update((h, decode_vector(data)) for h, data in rows)
+
+    missing = {h: text for h, text in zip(hashes, texts) if h not in found}
+    if missing:
+        miss_hashes = list(missing)
+        miss_texts = [missing[h] for h in miss_hashes]
+        if len(miss_texts) == 1 and client is None:
+            vectors = [embed(miss_texts[0], model)]
+        else:
+            vectors = embed_many(miss_texts, model, max_concurrency=max_concurrency, client=client)
+        found.update(zip(miss_hashes, vectors))
+        _insert_ignore_conflicts(db, EmbeddingCache.__table__, [
+            {"text_hash": h, "embedding_model": model, "vector_data": encode_vector(v, "float32")[0]}
+            for h, v in zip(miss_hashes, vectors)
+        ])
+    return [found[h] for h in hashes]
+
+
+# ── Embedding rows ─────────────────────────────────────────────────────
+
+class Passage(NamedTuple):
+    """A window of a source text; ``start``/``end`` are character offsets into it."""
+    index: int
+    start: int
+    end: int
+    text: str
+
+
+def chunk_text(text: str, max_tokens: int = EMBED_CHUNK_TOKENS,
+               overlap_tokens: int = EMBED_CHUNK_OVERLAP) -> List[Passage]:
+    """
+    Split ``text`` into passages of at most ``max_tokens`` estimated tokens,
+    breaking on whitespace, with about ``overlap_tokens`` of each passage
+    repeated at the start of the next. A word longer than the window gets a
+    passage of its own. Short texts give a single passage.
+    """
+    words = [(m.start(), m.end()) for m in re.finditer(r"\S+", text)]
+    if not words:
+        return [Passage(0, 0, len(text), text)]
+    costs = [estimate_tokens(text[a:b]) for a, b in words]
+
+    passages: List[Passage] = []
+    i = 0
+    while True:
+        j, tokens = i, 0
+        while j < len(words) and (j == i or tokens + costs[j] <= max_tokens):
+            tokens += costs[j]
+            j += 1
+        start, end = words[i][0], words[j - 1][1]
+        passages.append(Passage(len(passages), start, end, text[start:end]))
+        if j == len(words):
+            return passages
+        # Step back over up to overlap_tokens words, always moving forward
+        k, overlap = j, 0
+        while k - 1 > i and overlap + costs[k - 1] <= overlap_tokens:
+            k -= 1
+            overlap += costs[k]
+        i = k
+
+
+def _new_record(
+    user_id: str,
+    passage: Passage,
+    vector: List[float],
+    source_type: str,
+    source_id: str,
+    proposal_id: Optional[str],
+    metadata: Optional[Dict[str, Any]]
+) -> EmbeddingRecord:
+    vector_data, vector_scale = encode_vector(vector, EMBEDDING_VECTOR_FORMAT)
+    return EmbeddingRecord(
+        id=str(uuid.uuid4()),
+        user_id=user_id,
+        proposal_id=proposal_id,
+        source_type=source_type,
+        source_id=source_id,
+        chunk_index=passage.index,
+        char_start=passage.start,
+        char_end=passage.end,
+        text_content=passage.text[:5000],  # Passages are far shorter; guards oversized single words
+        embedding_model=DEFAULT_EMBEDDING_MODEL,
+        vector_data=vector_data,
+        vector_format=EMBEDDING_VECTOR_FORMAT,
+        vector_scale=vector_scale,
+        meta_data=metadata
+    )
+
+
+def _save_records(db: Session, records: List[EmbeddingRecord]) -> List[EmbeddingRecord]:
+    """
+    Replace the passages of every source in ``records`` in one transaction
+    and publish them to the search backends.
+
+    Rows are upserted on (source_type, source_id, chunk_index): existing rows
+    keep their id and are updated in place, and passages a source no longer
+    has are deleted. Returns the persisted rows in input order.
+    """
+    existing: Dict[Tuple[str, str, int], EmbeddingRecord] = {}
+    by_type: Dict[str, List[str]] = {}
+    for record in records:
+        by_type.setdefault(record.source_type, []).append(record.source_id)
+    for source_type, source_ids in by_type.items():
+        source_ids = list(dict.fromkeys(source_ids))
+        for start in range(0, len(source_ids), CACHE_LOOKUP_CHUNK):
+            rows = db.query(EmbeddingRecord).filter(
+                EmbeddingRecord.source_type == source_type,
+                EmbeddingRecord.source_id.in_(source_ids[start:start + CACHE_LOOKUP_CHUNK])
+            )
+            existing.update(((row.source_type, row.source_id, row.chunk_index or 0), row) for row in rows)
+
+    saved = []
+    kept = set()
+    for record in records:
+        key = (record.source_type, record.source_id, record.chunk_index)
+        row = existing.get(key)
+        if row is None:
+            db.add(record)
+            existing[key] = row = record
+        else:
+            # Copying the None ``vector`` also clears a legacy JSON vector
+            for field in ("user_id", "proposal_id", "char_start", "char_end", "text_content",
+                          "embedding_model", "vector", "vector_data", "vector_format", "vector_scale",
+                          "meta_data"):
+                setattr(row, field, getattr(record, field))
+        kept.add(key)
+        saved.append(row)
+
+    stale = [row for key, row in existing.items() if key not in kept]
+    for row in stale:
+        db.delete(row)
+    # Cached search results that these rows could appear in are dropped in the same commit
+    for user_id, source_type in {(r.user_id, r.source_type) for r in saved + stale}:
+        search_cache.invalidate(db, user_id, source_type)
+
+    if pgvector_store.PGVECTOR_ENABLED:
+        db.flush()
+        for row in saved:
+            pgvector_store.write_vector(db, row.id, row.embedding)
+    db.commit()
+    if vector_store.loaded:
+        for row in stale:
+            vector_store.remove(row.id)
+        vector_store.add_many((r.id, r.embedding, r.source_type, r.user_id) for r in saved)
+    if keyword_index.loaded:
+        for row in stale:
+            keyword_index.remove(row.id)
+        keyword_index.add_many((r.id, r.text_content or "", r.source_type, r.user_id) for r in saved)
+    return saved
+
+
 def store_embedding(
     user_id: str,
     text: str,
@@ -30,43 +380,96 @@ def store_embedding(
     source_id: Optional[str] = None,
     proposal_id: Optional[str] = None,
     metadata: Optional[Dict[str, Any]] = None,
-    db: Optional[Session] = None
+    db: Optional[Session] = None,
+    vectors: Optional[List[List[float]]] = None
 ) -> EmbeddingRecord:
-    """Store embedding in database"""
+    """
+    Store embeddings for ``text`` in database, one row per ``chunk_text``
+    passage, replacing any previous passages of the same (source_type,
+    source_id). ``vectors`` (one per passage) skips the provider call if
+    already computed; otherwise the embedding cache is consulted first.
+    Returns the first passage's row.
+    """
     should_close = db is None
     if db is None:
         db = SessionLocal()
     
     try:
-        vector = embed(text)
-        
-        embedding_record = EmbeddingRecord(
-            id=str(uuid.uuid4()),
-            user_id=user_id,
-            proposal_id=proposal_id,
-            source_type=source_type,
-            source_id=source_id or str(uuid.uuid4()),
-            text_content=text[:5000],  # Store first 5000 chars
-            embedding_model="text-embedding-3-small",
-            vector=vector,
-            metadata=metadata
-        )
-        
-        db.add(embedding_record)
-        db.commit()
+        item = {"user_id": user_id, "text": text, "source_type": source_type, "source_id": source_id,
+                "proposal_id": proposal_id, "metadata": metadata}
+        embedding_record = store_embeddings(db, [item], vectors=vectors)[0]
         db.refresh(embedding_record)
         
-        print(f"✅ Embedding generated for {source_type} {source_id}")
+        print(f"✅ Embedding generated for {source_type} {embedding_record.source_id}")
         return embedding_record
     finally:
         if should_close:
             db.close()
 
 
+async def astore_embedding(
+    user_id: str,
+    text: str,
+    source_type: str = "proposal",
+    source_id: Optional[str] = None,
+    proposal_id: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+    db: Optional[Session] = None,
+    batcher: Optional[EmbeddingBatcher] = None
+) -> EmbeddingRecord:
+    """
+    Async ``store_embedding``: the provider calls go through the
+    micro-batcher, so concurrent calls share one embeddings request.
+
+    Without ``db`` the rows are written from a worker thread with its own
+    session; a caller-supplied session is used on the calling thread, since
+    sessions must not be shared across threads.
+    """
+    batcher = batcher or embedding_batcher()
+    vectors = list(await asyncio.gather(*(batcher.embed(p.text) for p in chunk_text(text))))
+    args = (user_id, text, source_type, source_id, proposal_id, metadata, db, vectors)
+    if db is not None:
+        return store_embedding(*args)
+    return await asyncio.to_thread(store_embedding, *args)
+
+
+def store_embeddings(
+    db: Session,
+    items: List[Dict[str, Any]],
+    max_concurrency: int = EMBED_MAX_CONCURRENCY,
+    vectors: Optional[List[List[float]]] = None
+) -> List[EmbeddingRecord]:
+    """
+    Bulk ``store_embedding``: chunks ``items`` (dicts with ``user_id``,
+    ``text``, ``source_type`` and optional ``source_id`` / ``proposal_id`` /
+    ``metadata``) into passages, embeds them through the embedding cache
+    unless ``vectors`` are given, and replaces every source's passages in one
+    commit. Pending changes already on ``db`` are committed with them.
+    Returns the passage rows in order.
+    """
+    passages = []
+    for item in items:
+        source_id = item.get("source_id") or str(uuid.uuid4())
+        passages.extend((item, source_id, passage) for passage in chunk_text(item["text"]))
+    if vectors is None:
+        vectors = cached_embed_many([p.text for _, _, p in passages], db, max_concurrency=max_concurrency)
+    elif len(vectors) != len(passages):
+        raise ValueError(f"Expected {len(passages)} passage vectors, got {len(vectors)}.")
+    records = [
+        _new_record(item["user_id"], passage, vector, item["source_type"], source_id,
+                    item.get("proposal_id"), item.get("metadata"))
+        for (item, source_id, passage), vector in zip(passages, vectors)
+    ]
+    return _save_records(db, records)
+
+
 def rebuild_all_embeddings(user_id: Optional[str] = None, db: Optional[Session] = None):
     """
     Rebuild all embeddings for proposals and opportunities
     Used for maintenance and after model updates
+
+    Idempotent: each proposal's embedding row is upserted, and unchanged text
+    is served from the embedding cache without a provider call.
     """
     should_close = db is None
     if db is None:
@@ -80,22 +483,17 @@ def rebuild_all_embeddings(user_id: Optional[str] = None, db: Optional[Session]
         if user_id:
             query = query.filter(Proposal.user_id == user_id)
         
-        proposals = query.all()
+        proposals = [p for p in query.all() if p.generated_text or p.raw_text]
+        texts = [p.generated_text or p.raw_text for p in proposals]
         
-        rebuilt_count = 0
-        for proposal in proposals:
-            if proposal.generated_text or proposal.raw_text:
-                text = proposal.generated_text or proposal.raw_text
-                store_embedding(
-                    user_id=proposal.user_id,
-                    text=text,
-                    source_type="proposal",
-                    source_id=proposal.id,
-                    proposal_id=proposal.id,
-                    db=db
-                )
-                rebuilt_count += 1
+        # Cached lookups, batched provider requests for the misses, one commit
+        store_embeddings(db, [
+            {"user_id": p.user_id, "text": text, "source_type": "proposal", "source_id": p.id,
+             "proposal_id": p.id}
+            for p, text in zip(proposals, texts)
+        ])
         
+        rebuilt_count = len(proposals)
         print(f"✅ Rebuilt {rebuilt_count} embeddings")
         return rebuilt_count
     finally:
@@ -109,69 +507,102 @@ def semantic_search(
     user_id: Optional[str] = None,
     top_k: int = 10,
     use_cache: bool = True,
-    db: Optional[Session] = None
+    db: Optional[Session] = None,
+    pooling: str = "max",
+    mode: Optional[str] = None
 ) -> List[Dict[str, Any]]:
     """
     Perform semantic search using embeddings
+
+    Passages are ranked individually, then pooled per source: ``pooling``
+    "max" scores a source by its best passage, "sum" adds up the similarity
+    of its matching passages. Each result carries the best passage as the
+    snippet. At most ``top_k * SEARCH_PASSAGE_OVERSAMPLE`` passages are
+    ranked and fetched per query.
+
+    ``mode`` (default SEMANTIC_SEARCH_MODE) picks the passage ranking:
+    "vector" (cosine similarity), "keyword" (BM25 over the passage text) or
+    "hybrid" (both, merged by reciprocal rank fusion). Outside "vector" mode
+    ``similarity`` is the BM25 or fused score.
     """
+    # Searched exactly as it is keyed in the cache
+    query = normalize_text(query)
+    mode = (mode or SEMANTIC_SEARCH_MODE).lower()
+    if pooling not in ("max", "sum"):
+        raise ValueError(f"Unknown pooling {pooling!r}; expected 'max' or 'sum'.")
+    if mode not in ("vector", "keyword", "hybrid"):
+        raise ValueError(f"Unknown search mode {mode!r}; expected 'vector', 'keyword' or 'hybrid'.")
     should_close = db is None
     if db is None:
         db = SessionLocal()
     
     try:
-        # Check cache first
-        query_hash = hashlib.md5(query.encode()).hexdigest()
+        # Check cache first (in-process tier, then the semantic_search_cache table)
+        key = cache_key(query, source_type, user_id, top_k, mode, pooling)
         
         if use_cache:
-            cached = db.query(SemanticSearchCache).filter(
-                SemanticSearchCache.query_hash == query_hash
-            ).first()
-            
-            if cached:
-                cached.hit_count += 1
-                db.commit()
-                return json.loads(cached.results)
+            cached = search_cache.get(db, key)
+            if cached is not None:
+                return cached
         
-        # Generate query embedding
-        query_vector = embed(query)
+        # Rank passages by vector (pgvector or the in-process store) and/or BM25, then fetch only those rows
+        n_passages = top_k * SEARCH_PASSAGE_OVERSAMPLE
+        vector_hits = keyword_hits = []
+        if mode != "keyword":
+            query_vector = embed(query)
+            if pgvector_store.PGVECTOR_ENABLED:
+                vector_hits = pgvector_store.search(db, query_vector, n_passages, source_type=source_type,
+                                                    user_id=user_id)
+            else:
+                vector_store.ensure_loaded(db)
+                vector_hits = vector_store.search(query_vector, n_passages, source_type=source_type,
+                                                  user_id=user_id)
+        if mode != "vector":
+            keyword_index.ensure_loaded(db)
+            keyword_hits = keyword_index.search(query, n_passages, source_type=source_type, user_id=user_id)
+        if mode == "hybrid":
+            # Keyword hits first: on a fused-score tie the exact term match wins
+            hits = reciprocal_rank_fusion([keyword_hits, vector_hits])[:n_passages]
+        else:
+            hits = vector_hits or keyword_hits
+        records = {
+            emb.id: emb
+            for emb in db.query(EmbeddingRecord).options(
+                defer(EmbeddingRecord.vector), defer(EmbeddingRecord.vector_data)
+            ).filter(EmbeddingRecord.id.in_([h[0] for h in hits]))
+        } if hits else {}
         
-        # Get all embeddings (in production, use vector similarity search)
-        query_obj = db.query(EmbeddingRecord)
-        if source_type:
-            query_obj = query_obj.filter(EmbeddingRecord.source_type == source_type)
-        if user_id:
-            query_obj = query_obj.filter(EmbeddingRecord.user_id == user_id)
-        
-        all_embeddings = query_obj.all()
-        
-        # Calculate cosine similarity (simplified - use pgvector in production)
-        results = []
-        for emb in all_embeddings:
-            # Simple dot product for similarity
-            similarity = sum(a * b for a, b in zip(query_vector, emb.vector))
-            results.append({
-                "id": emb.id,
-                "source_type": emb.source_type,
-                "source_id": emb.source_id,
-                "text": emb.text_content,
-                "similarity": similarity,
-                "metadata": emb.metadata
-            })
-        
-        # Sort by similarity and get top k
-        results = sorted(results, key=lambda x: x["similarity"], reverse=True)[:top_k]
+        # Pool passage hits per source; hits arrive best first, so the first one is the snippet
+        sources: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for record_id, similarity in hits:
+            emb = records.get(record_id)
+            if emb is None:  # deleted since the in-process indexes loaded it
+                vector_store.remove(record_id)
+                keyword_index.remove(record_id)
+                continue
+            result = sources.get((emb.source_type, emb.source_id))
+            if result is None:
+                sources[(emb.source_type, emb.source_id)] = {
+                    "id": emb.id,
+                    "source_type": emb.source_type,
+                    "source_id": emb.source_id,
+                    "text": emb.text_content,
+                    "similarity": similarity,
+                    "metadata": emb.meta_data,
+                    "chunk_index": emb.chunk_index,
+                    "char_start": emb.char_start,
+                    "char_end": emb.char_end,
+                    "passages": 1
+                }
+            else:
+                result["passages"] += 1
+                if pooling == "sum":
+                    result["similarity"] += similarity
+        results = sorted(sources.values(), key=lambda r: r["similarity"], reverse=True)[:top_k]
         
         # Cache results
         if use_cache and results:
-            cache_entry = SemanticSearchCache(
-                id=str(uuid.uuid4()),
-                query_text=query,
-                query_hash=query_hash,
-                results=json.dumps(results),
-                hit_count=1
-            )
-            db.add(cache_entry)
-            db.commit()
+            search_cache.set(db, key, query, results, user_id=user_id, source_type=source_type)
         
         return results
     finally:
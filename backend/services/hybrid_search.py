@@ -0,0 +1,265 @@
+"""
+Keyword (BM25) retrieval over embedding passages and rank fusion with vector search.
+
+Solicitation numbers, NAICS codes and agency acronyms carry little signal in
+an embedding but are exact, rare tokens, which BM25 ranks well. ``BM25Index``
+is an in-process inverted index over ``EmbeddingRecord.text_content``; it is
+loaded, refreshed and updated the same way as ``services.vector_store``, so
+its document ids are the same passage ids, and it drops passages deleted by
+other workers on the same periodic id reconcile. ``semantic_search`` runs it next
+to the vector search and merges the two rankings with
+``reciprocal_rank_fusion``.
+"""
+import os
+import re
+import math
+import time
+import threading
+from typing import List, Dict, Optional, Tuple, Iterable, Sequence
+
+import numpy as np
+
+from services.vector_store import _Codes, _COMPACT_MIN_DEAD, stored_record_ids
+
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+KEYWORD_INDEX_REFRESH_SECONDS = float(os.getenv("KEYWORD_INDEX_REFRESH_SECONDS", "30"))
+KEYWORD_INDEX_RECONCILE_SECONDS = float(os.getenv("KEYWORD_INDEX_RECONCILE_SECONDS", "300"))
+KEYWORD_INDEX_LOAD_BATCH = int(os.getenv("KEYWORD_INDEX_LOAD_BATCH", "2000"))
+
+# Words joined by - . / _ stay one token (W912DY-24-R-0001, 541511, N00024.1)
+_TOKEN = re.compile(r"[a-z0-9]+(?:[-./_][a-z0-9]+)*")
+_PART = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased tokens; compound identifiers also yield their parts."""
+    tokens = []
+    for match in _TOKEN.finditer((text or "").lower()):
+        token = match.group()
+        tokens.append(token)
+        if not token.isalnum():
+            tokens.extend(_PART.findall(token))
+    return tokens
+
+
+class BM25Index:
+    """Incrementally updated inverted index with Okapi BM25 scoring."""
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.ids: List[str] = []
+        self._row: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._terms: List[Optional[Dict[str, int]]] = []
+        self._lengths = np.zeros(1024, dtype=np.float32)
+        self._source_type_codes = np.zeros(1024, dtype=np.int32)
+        self._user_codes = np.zeros(1024, dtype=np.int32)
+        self._source_types = _Codes()
+        self._users = _Codes()
+        self._total_length = 0
+
+        self.loaded = False
+        self._watermark = None
+        self._last_refresh = 0.0
+        self._last_reconcile = 0.0
+
+    def __len__(self) -> int:
+        return len(self._row)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return str(doc_id) in self._row
+
+    # ── Writes ────────────────────────────────────────────────────────
+
+    def _unlink(self, row: int) -> None:
+        for term in self._terms[row]:
+            postings = self._postings[term]
+            del postings[row]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= int(self._lengths[row])
+        self._terms[row] = None
+
+    def add_many(self, docs: Iterable[Tuple[str, str, Optional[str], Optional[str]]]) -> int:
+        """Insert or replace ``(doc_id, text, source_type, user_id)`` documents."""
+        count = 0
+        with self._lock:
+            for doc_id, text, source_type, user_id in docs:
+                doc_id = str(doc_id)
+                row = self._row.get(doc_id)
+                if row is None:
+                    row = self._row[doc_id] = len(self.ids)
+                    self.ids.append(doc_id)
+                    self._terms.append(None)
+                    if row >= self._lengths.size:
+                        for name in ("_lengths", "_source_type_codes", "_user_codes"):
+                            array = getattr(self, name)
+                            setattr(self, name, np.concatenate([array, np.zeros_like(array)]))
+                elif self._terms[row] is not None:
+                    self._unlink(row)
+
+                counts: Dict[str, int] = {}
+                tokens = tokenize(text)
+                for token in tokens:
+                    counts[token] = counts.get(token, 0) + 1
+                for term, tf in counts.items():
+                    self._postings.setdefault(term, {})[row] = tf
+                self._terms[row] = counts
+                self._lengths[row] = len(tokens)
+                self._total_length += len(tokens)
+                self._source_type_codes[row] = self._source_types.encode(source_type)
+                self._user_codes[row] = self._users.encode(user_id)
+                count += 1
+        return count
+
+    def add(self, doc_id: str, text: str, source_type: Optional[str] = None,
+            user_id: Optional[str] = None) -> None:
+        self.add_many([(doc_id, text, source_type, user_id)])
+
+    def remove(self, doc_id: str) -> bool:
+        """Drop a document from search results. Returns False if it is not indexed."""
+        with self._lock:
+            row = self._row.pop(str(doc_id), None)
+            if row is None:
+                return False
+            self._unlink(row)
+            dead = len(self.ids) - len(self._row)
+            if dead >= _COMPACT_MIN_DEAD and dead > len(self._row):
+                self._compact()
+            return True
+
+    def _compact(self) -> None:
+        """Renumber live documents into fresh structures (searches in flight keep the old ones)."""
+        rows = sorted(self._row.values())
+        renumber = {old: new for new, old in enumerate(rows)}
+        capacity = max(1024, len(rows) * 2)
+        for name in ("_lengths", "_source_type_codes", "_user_codes"):
+            array = getattr(self, name)
+            compacted = np.zeros(capacity, dtype=array.dtype)
+            compacted[:len(rows)] = array[rows]
+            setattr(self, name, compacted)
+        self.ids = [self.ids[row] for row in rows]
+        self._terms = [self._terms[row] for row in rows]
+        self._row = {doc_id: row for row, doc_id in enumerate(self.ids)}
+        self._postings = {term: {renumber[row]: tf for row, tf in postings.items()}
+                          for term, postings in self._postings.items()}
+
+    # ── Queries ───────────────────────────────────────────────────────
+
+    def search(self, query: str, top_k: int = 10, source_type: Optional[str] = None,
+               user_id: Optional[str] = None) -> List[Tuple[str, float]]:
+        """Top-k ``(doc_id, bm25_score)`` pairs with a positive score, best first."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            n_docs = len(self._row)
+            if not n_docs or not terms or top_k <= 0:
+                return []
+            size = len(self.ids)
+            avg_length = self._total_length / n_docs or 1.0
+            scores = np.zeros(size, dtype=np.float32)
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1.0 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                rows = np.fromiter(postings.keys(), dtype=np.int64, count=len(postings))
+                tf = np.fromiter(postings.values(), dtype=np.float32, count=len(postings))
+                norm = self.k1 * (1.0 - self.b + self.b * self._lengths[rows] / avg_length)
+                scores[rows] += idf * tf * (self.k1 + 1.0) / (tf + norm)
+
+            mask = scores > 0
+            if source_type:
+                mask &= self._source_type_codes[:size] == self._source_types.get(source_type)
+            if user_id:
+                mask &= self._user_codes[:size] == self._users.get(user_id)
+            candidates = np.flatnonzero(mask)
+            ids = self.ids
+
+        candidate_scores = scores[candidates]
+        if candidates.size > top_k:
+            top = np.argpartition(-candidate_scores, top_k - 1)[:top_k]
+        else:
+            top = np.arange(candidates.size)
+        top = top[np.argsort(-candidate_scores[top], kind="stable")]
+        return [(ids[candidates[i]], float(candidate_scores[i])) for i in top.tolist()]
+
+    # ── Database sync ─────────────────────────────────────────────────
+
+    def _load_since(self, db, since=None) -> int:
+        from models.embeddings import EmbeddingRecord
+
+        columns = (EmbeddingRecord.id, EmbeddingRecord.text_content, EmbeddingRecord.source_type,
+                   EmbeddingRecord.user_id, EmbeddingRecord.updated_at)
+        query = db.query(*columns)
+        if since is not None:
+            query = query.filter(EmbeddingRecord.updated_at >= since)
+
+        loaded = 0
+        batch = []
+        for record_id, text, source_type, user_id, updated_at in query.yield_per(KEYWORD_INDEX_LOAD_BATCH):
+            if updated_at is not None and (self._watermark is None or updated_at > self._watermark):
+                self._watermark = updated_at
+            batch.append((record_id, text or "", source_type, user_id))
+            if len(batch) >= KEYWORD_INDEX_LOAD_BATCH:
+                loaded += self.add_many(batch)
+                batch = []
+        return loaded + self.add_many(batch)
+
+    def _reconcile(self, db) -> int:
+        """Drop indexed passages whose records no longer exist. Returns how many were dropped."""
+        stale = list(set(self._row) - stored_record_ids(db))
+        for doc_id in stale:
+            self.remove(doc_id)
+        return len(stale)
+
+    def ensure_loaded(self, db) -> None:
+        """
+        Index every passage on first use, then pick up rows written by other
+        workers and, less often, drop rows they deleted.
+        """
+        with self._lock:
+            if not self.loaded:
+                started = time.perf_counter()
+                count = self._load_since(db)
+                self.loaded = True
+                self._last_refresh = self._last_reconcile = time.monotonic()
+                print(f"[KeywordIndex] Indexed {count} passages in {time.perf_counter() - started:.2f}s")
+            elif time.monotonic() - self._last_refresh >= KEYWORD_INDEX_REFRESH_SECONDS:
+                self._load_since(db, self._watermark)
+                if time.monotonic() - self._last_reconcile >= KEYWORD_INDEX_RECONCILE_SECONDS:
+                    removed = self._reconcile(db)
+                    if removed:
+                        print(f"[KeywordIndex] Dropped {removed} passages deleted by other workers")
+                    self._last_reconcile = time.monotonic()
+                self._last_refresh = time.monotonic()
+
+    def clear(self) -> None:
+        """Drop everything; the next ``ensure_loaded`` reloads from the database."""
+        with self._lock:
+            self._reset()
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Tuple[str, float]]], k: int = RRF_K,
+                           weights: Optional[Sequence[float]] = None) -> List[Tuple[str, float]]:
+    """
+    Fuse best-first rankings: each id scores ``sum(weight / (k + rank))`` over
+    the rankings it appears in (rank starting at 1). Only ranks matter, so
+    BM25 scores and cosine similarities need no calibration.
+    """
+    weights = weights or [1.0] * len(rankings)
+    fused: Dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, (doc_id, _) in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + weight / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+# Process-wide index used by services.embeddings_ai
+keyword_index = BM25Index()
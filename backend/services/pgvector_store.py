@@ -0,0 +1,93 @@
+"""
+pgvector storage backend for embedding search.
+
+Enabled with EMBEDDINGS_BACKEND=pgvector once migration
+002_pgvector_embeddings has added the ``embeddings.embedding_vec``
+vector(1536) column and its HNSW index. ``store_embedding`` then writes the
+vector column alongside the binary ``vector_data`` one, and
+``semantic_search`` pushes the user_id / source_type filter and
+``ORDER BY distance LIMIT k`` into SQL instead of ranking in the in-process
+vector store. On servers without the extension the migration adds neither,
+and search stays on the in-process store.
+
+The column is not mapped on EmbeddingRecord, so the ORM model (and SQLite
+test databases) do not need the pgvector Python package.
+"""
+import os
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+
+PGVECTOR_ENABLED = os.getenv("EMBEDDINGS_BACKEND", "memory").lower() == "pgvector"
+# HNSW candidate list size per query; higher trades latency for recall
+PGVECTOR_EF_SEARCH = int(os.getenv("PGVECTOR_EF_SEARCH", "100"))
+
+_ITERATIVE_SCAN: Optional[bool] = None
+
+
+def vector_literal(vector: List[float]) -> str:
+    """pgvector text representation, e.g. ``[0.1,0.2]``."""
+    return "[" + ",".join(repr(float(x)) for x in vector) + "]"
+
+
+def write_vector(db, record_id: str, vector: List[float]) -> None:
+    """Set the vector column of an embeddings row (flushed, not committed)."""
+    db.execute(
+        text("UPDATE embeddings SET embedding_vec = CAST(:vec AS vector) WHERE id = :id"),
+        {"vec": vector_literal(vector), "id": record_id},
+    )
+
+
+def _iterative_scan_supported(db) -> bool:
+    """Whether the server's pgvector (0.8+) can resume an HNSW scan past ef_search."""
+    global _ITERATIVE_SCAN
+    if _ITERATIVE_SCAN is None:
+        version = db.execute(text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")).scalar()
+        _ITERATIVE_SCAN = tuple(int(part) for part in (version or "0").split(".")[:2]) >= (0, 8)
+    return _ITERATIVE_SCAN
+
+
+def _nearest(db, where: str, params: dict, exact: bool = False):
+    # "+ 0" keeps the planner off the HNSW index, so every row passing WHERE is ranked
+    distance = "(embedding_vec <=> CAST(:query AS vector))" + (" + 0" if exact else "")
+    return db.execute(
+        text(
+            "SELECT id, 1 - (embedding_vec <=> CAST(:query AS vector)) AS similarity "
+            "FROM embeddings "
+            f"WHERE {where} "
+            f"ORDER BY {distance} "
+            "LIMIT :k"
+        ),
+        params,
+    ).all()
+
+
+def search(db, query_vector: List[float], top_k: int = 10, source_type: Optional[str] = None,
+           user_id: Optional[str] = None) -> List[Tuple[str, float]]:
+    """
+    Top-k ``(record_id, cosine_similarity)`` pairs via the HNSW index, best first.
+
+    The index applies the user_id / source_type filters to the ef_search
+    nearest rows only, so a selective filter can leave fewer than ``top_k``.
+    pgvector 0.8+ keeps scanning (``hnsw.iterative_scan``); if the result is
+    still short, the filtered rows are ranked exactly instead.
+    """
+    filters = ["embedding_vec IS NOT NULL"]
+    params = {"query": vector_literal(query_vector), "k": top_k}
+    if source_type:
+        filters.append("source_type = :source_type")
+        params["source_type"] = source_type
+    if user_id:
+        filters.append("user_id = :user_id")
+        params["user_id"] = user_id
+    where = " AND ".join(filters)
+    filtered = len(filters) > 1
+
+    # SET LOCAL only lasts for the current transaction
+    db.execute(text(f"SET LOCAL hnsw.ef_search = {max(PGVECTOR_EF_SEARCH, top_k)}"))
+    if filtered and _iterative_scan_supported(db):
+        db.execute(text("SET LOCAL hnsw.iterative_scan = strict_order"))
+    rows = _nearest(db, where, params)
+    if filtered and len(rows) < top_k:
+        rows = _nearest(db, where, params, exact=True)
+    return [(row[0], float(row[1])) for row in rows]
@@ -0,0 +1,257 @@
+"""
+Two-tier cache for ``semantic_search`` results.
+
+Entries are keyed by a hash of everything that shapes a result list: the
+normalized query, source_type, user_id, top_k, ranking mode and pooling. A
+cached list can therefore only be served to a request that would produce it.
+
+- L1: a per-process LRU (SEARCH_CACHE_L1_MAX_ENTRIES) with a short TTL, so a
+  write in another worker goes stale here for at most
+  SEARCH_CACHE_L1_TTL_SECONDS.
+- L2: the ``semantic_search_cache`` table. It has an ``expires_at`` TTL and
+  is capped at SEARCH_CACHE_MAX_ENTRIES rows. Over the cap, the least
+  recently accessed rows are evicted.
+
+A new embedding for (user_id, source_type) invalidates every entry whose
+filters could include it: same user or no user filter, and same source type
+or no source filter. Hits only bump in-memory counters. These are written
+back in one batched UPDATE from a background thread every
+SEARCH_CACHE_FLUSH_SECONDS, never on the request path.
+"""
+import os
+import json
+import time
+import uuid
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Tuple
+
+from sqlalchemy import or_, update, bindparam, func
+from sqlalchemy.exc import IntegrityError
+
+from models.embeddings import SemanticSearchCache
+
+SEARCH_CACHE_TTL_SECONDS = int(os.getenv("SEARCH_CACHE_TTL_SECONDS", str(24 * 3600)))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "10000"))
+SEARCH_CACHE_L1_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_L1_MAX_ENTRIES", "1024"))
+SEARCH_CACHE_L1_TTL_SECONDS = float(os.getenv("SEARCH_CACHE_L1_TTL_SECONDS", "60"))
+SEARCH_CACHE_FLUSH_SECONDS = float(os.getenv("SEARCH_CACHE_FLUSH_SECONDS", "10"))
+# The L2 size cap is enforced once every this many inserts
+SEARCH_CACHE_EVICT_EVERY = int(os.getenv("SEARCH_CACHE_EVICT_EVERY", "100"))
+
+Scope = Tuple[Optional[str], Optional[str]]  # (user_id, source_type) filters of an entry
+
+
+def cache_key(query: str, source_type: Optional[str], user_id: Optional[str], top_k: int,
+              mode: str, pooling: str) -> str:
+    """
+    sha256 of every parameter that affects a semantic_search result list.
+    ``query`` is normalized with ``normalize_text``, as semantic_search does
+    before it embeds the query. Case is kept, because embeddings are case
+    sensitive.
+    """
+    from services.embeddings_ai import normalize_text
+
+    payload = json.dumps([normalize_text(query), source_type or "", user_id or "", top_k, mode, pooling])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _affected(scope: Scope, user_id: Optional[str], source_type: Optional[str]) -> bool:
+    """Could an embedding for (user_id, source_type) appear in results cached under ``scope``?"""
+    entry_user, entry_source = scope
+    return (entry_user is None or entry_user == user_id) and \
+        (entry_source is None or entry_source == source_type)
+
+
+class SearchCache:
+    """In-process LRU tier in front of the semantic_search_cache table."""
+
+    def __init__(self, ttl_seconds: int = SEARCH_CACHE_TTL_SECONDS, max_entries: int = SEARCH_CACHE_MAX_ENTRIES,
+                 l1_max_entries: int = SEARCH_CACHE_L1_MAX_ENTRIES,
+                 l1_ttl_seconds: float = SEARCH_CACHE_L1_TTL_SECONDS,
+                 flush_seconds: float = SEARCH_CACHE_FLUSH_SECONDS, session_factory=None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.l1_max_entries = l1_max_entries
+        self.l1_ttl_seconds = min(l1_ttl_seconds, ttl_seconds)
+        self.flush_seconds = flush_seconds
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._l1: "OrderedDict[str, Tuple[List[Dict[str, Any]], float, Scope]]" = OrderedDict()
+        self._by_scope: Dict[Scope, set] = {}
+        self._pending_hits: Dict[str, int] = {}
+        self._last_flush = time.monotonic()
+        self._flusher: Optional[ThreadPoolExecutor] = None
+        self._inserts = 0
+
+    def __len__(self) -> int:
+        return len(self._l1)
+
+    # ── L1 ────────────────────────────────────────────────────────────
+
+    def _l1_get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            entry = self._l1.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                self._l1_drop(key)
+                return None
+            self._l1.move_to_end(key)
+            return entry[0]
+
+    def _l1_set(self, key: str, results: List[Dict[str, Any]], scope: Scope, ttl: float) -> None:
+        with self._lock:
+            if key in self._l1:
+                self._l1_drop(key)
+            self._l1[key] = (results, time.monotonic() + ttl, scope)
+            self._by_scope.setdefault(scope, set()).add(key)
+            while len(self._l1) > self.l1_max_entries:
+                self._l1_drop(next(iter(self._l1)))
+
+    def _l1_drop(self, key: str) -> None:
+        _, _, scope = self._l1.pop(key)
+        keys = self._by_scope.get(scope)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_scope[scope]
+
+    # ── Lookups and writes ────────────────────────────────────────────
+
+    def get(self, db, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Cached results for ``key`` from L1, else from an unexpired L2 row (promoted to L1)."""
+        results = self._l1_get(key)
+        if results is None:
+            row = db.query(
+                SemanticSearchCache.results, SemanticSearchCache.user_id,
+                SemanticSearchCache.source_type, SemanticSearchCache.expires_at
+            ).filter(
+                SemanticSearchCache.query_hash == key,
+                SemanticSearchCache.expires_at > _utcnow()
+            ).first()
+            if row is None:
+                return None
+            results, user_id, source_type, expires_at = row
+            if isinstance(results, str):
+                results = json.loads(results)
+            remaining = (_as_utc(expires_at) - _utcnow()).total_seconds()
+            self._l1_set(key, results, (user_id, source_type), min(self.l1_ttl_seconds, remaining))
+        self._record_hit(key)
+        return results
+
+    def set(self, db, key: str, query: str, results: List[Dict[str, Any]],
+            user_id: Optional[str] = None, source_type: Optional[str] = None) -> None:
+        """Store ``results`` in both tiers (committing ``db``)."""
+        scope = (user_id, source_type)
+        expires_at = _utcnow() + timedelta(seconds=self.ttl_seconds)
+        db.query(SemanticSearchCache).filter(SemanticSearchCache.query_hash == key).delete(
+            synchronize_session=False
+        )
+        db.add(SemanticSearchCache(
+            id=str(uuid.uuid4()), query_text=query, query_hash=key, results=results, hit_count=0,
+            user_id=user_id, source_type=source_type, expires_at=expires_at
+        ))
+        try:
+            db.commit()
+        except IntegrityError:  # another worker cached the same key first
+            db.rollback()
+        self._l1_set(key, results, scope, self.l1_ttl_seconds)
+
+        self._inserts += 1
+        if self._inserts % SEARCH_CACHE_EVICT_EVERY == 0:
+            self.evict(db)
+
+    def invalidate(self, db, user_id: Optional[str], source_type: Optional[str]) -> int:
+        """
+        Drop entries that a new embedding for (user_id, source_type) could
+        change. L2 rows are deleted on ``db`` without committing, so the
+        deletion lands in the same transaction as the embedding write.
+        """
+        with self._lock:
+            scopes = [scope for scope in self._by_scope if _affected(scope, user_id, source_type)]
+            for scope in scopes:
+                for key in list(self._by_scope.get(scope, ())):
+                    self._l1_drop(key)
+        return db.query(SemanticSearchCache).filter(
+            or_(SemanticSearchCache.user_id.is_(None), SemanticSearchCache.user_id == user_id),
+            or_(SemanticSearchCache.source_type.is_(None), SemanticSearchCache.source_type == source_type)
+        ).delete(synchronize_session=False)
+
+    def evict(self, db) -> int:
+        """Delete expired rows, then the least recently accessed rows over ``max_entries``."""
+        deleted = db.query(SemanticSearchCache).filter(
+            SemanticSearchCache.expires_at <= _utcnow()
+        ).delete(synchronize_session=False)
+        excess = db.query(func.count(SemanticSearchCache.id)).scalar() - self.max_entries
+        if excess > 0:
+            oldest = db.query(SemanticSearchCache.id).order_by(
+                SemanticSearchCache.last_accessed.asc(), SemanticSearchCache.id
+            ).limit(excess).subquery()
+            deleted += db.query(SemanticSearchCache).filter(
+                SemanticSearchCache.id.in_(db.query(oldest.c.id))
+            ).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._l1.clear()
+            self._by_scope.clear()
+            self._pending_hits.clear()
+
+    # ── Hit counters ──────────────────────────────────────────────────
+
+    def _record_hit(self, key: str) -> None:
+        with self._lock:
+            self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+            due = time.monotonic() - self._last_flush >= self.flush_seconds
+            if due:
+                self._last_flush = time.monotonic()
+        if due:
+            if self._flusher is None:
+                self._flusher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search-cache-flush")
+            self._flusher.submit(self._flush_in_new_session)
+
+    def flush_hits(self, db) -> int:
+        """Add pending hit counts and refresh last_accessed in one batched UPDATE."""
+        with self._lock:
+            pending, self._pending_hits = self._pending_hits, {}
+        if not pending:
+            return 0
+        table = SemanticSearchCache.__table__
+        statement = update(table).where(table.c.query_hash == bindparam("key")).values(
+            hit_count=table.c.hit_count + bindparam("hits"), last_accessed=func.now()
+        )
+        db.execute(statement, [{"key": key, "hits": hits} for key, hits in pending.items()])
+        db.commit()
+        return len(pending)
+
+    def _flush_in_new_session(self) -> None:
+        session_factory = self._session_factory
+        if session_factory is None:
+            from database import SessionLocal as session_factory
+        db = session_factory()
+        try:
+            self.flush_hits(db)
+        except Exception as e:
+            db.rollback()
+            print(f"[SearchCache] Hit count flush failed: {e}")
+        finally:
+            db.close()
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite returns naive datetimes for timezone-aware columns
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+# Process-wide cache used by services.embeddings_ai
+search_cache = SearchCache()
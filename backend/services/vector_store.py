@@ -0,0 +1,284 @@
+"""
+In-process vector store for embedding search.
+
+Holds every EmbeddingRecord vector as one contiguous float32 matrix with
+L2-normalized rows, plus per-row source_type / user_id codes used as filter
+arrays. A query is a single matrix-vector product followed by
+``argpartition``; the matching rows are then fetched from the database by id.
+
+The store is loaded lazily from the database on first use, updated in place
+by ``store_embedding`` and topped up from other workers' writes by polling
+``EmbeddingRecord.updated_at`` at most every VECTOR_STORE_REFRESH_SECONDS.
+Deleted rows leave no ``updated_at`` to poll, so every
+VECTOR_STORE_RECONCILE_SECONDS the stored ids are also checked against the
+table and rows deleted by other workers are dropped.
+"""
+import os
+import time
+import threading
+from typing import List, Dict, Set, Any, Optional, Tuple, Iterable, Sequence
+
+import numpy as np
+
+VECTOR_STORE_REFRESH_SECONDS = float(os.getenv("VECTOR_STORE_REFRESH_SECONDS", "30"))
+VECTOR_STORE_RECONCILE_SECONDS = float(os.getenv("VECTOR_STORE_RECONCILE_SECONDS", "300"))
+VECTOR_STORE_LOAD_BATCH = int(os.getenv("VECTOR_STORE_LOAD_BATCH", "2000"))
+
+# Below this fraction of live rows a filtered query multiplies only the matching rows
+_SUBSET_FRACTION = 0.25
+# Removed rows are compacted away once there are this many and more than live rows
+_COMPACT_MIN_DEAD = 1024
+
+
+class _Codes:
+    """Interns filter values (source_type, user_id) as small integers."""
+
+    def __init__(self):
+        self.codes: Dict[Optional[str], int] = {}
+
+    def encode(self, value: Optional[str]) -> int:
+        return self.codes.setdefault(value, len(self.codes))
+
+    def get(self, value: Optional[str]) -> int:
+        return self.codes.get(value, -1)
+
+
+def stored_record_ids(db) -> Set[str]:
+    """Ids of every EmbeddingRecord row, for reconciling an in-process index."""
+    from models.embeddings import EmbeddingRecord
+
+    query = db.query(EmbeddingRecord.id).yield_per(VECTOR_STORE_LOAD_BATCH)
+    return {str(record_id) for (record_id,) in query}
+
+
+class VectorStore:
+    """Contiguous float32 matrix of normalized embeddings with id and filter arrays."""
+
+    def __init__(self, dim: Optional[int] = None, capacity: int = 1024):
+        self._lock = threading.RLock()
+        self._reset(dim, capacity)
+
+    def _reset(self, dim: Optional[int], capacity: int) -> None:
+        self.dim = dim
+        self.ids: List[str] = []
+        self._row: Dict[str, int] = {}
+        self._capacity = capacity
+        self._size = 0
+        self._matrix: Optional[np.ndarray] = None
+        self._source_types = _Codes()
+        self._users = _Codes()
+        self._source_type_codes = np.zeros(capacity, dtype=np.int32)
+        self._user_codes = np.zeros(capacity, dtype=np.int32)
+        self._live = np.zeros(capacity, dtype=bool)
+
+        self.loaded = False
+        self._watermark = None
+        self._last_refresh = 0.0
+        self._last_reconcile = 0.0
+
+    def __len__(self) -> int:
+        return len(self._row)
+
+    def __contains__(self, record_id: str) -> bool:
+        return str(record_id) in self._row
+
+    # ── Writes ────────────────────────────────────────────────────────
+
+    def _grow(self, needed: int) -> None:
+        if self._matrix is None:
+            self._capacity = max(self._capacity, needed)
+            self._matrix = np.zeros((self._capacity, self.dim), dtype=np.float32)
+        elif needed > self._capacity:
+            capacity = max(needed, self._capacity * 2)
+            matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+            matrix[:self._size] = self._matrix[:self._size]
+            self._matrix = matrix
+            self._capacity = capacity
+        else:
+            return
+        for name in ("_source_type_codes", "_user_codes", "_live"):
+            array = getattr(self, name)
+            grown = np.zeros(self._capacity, dtype=array.dtype)
+            grown[:self._size] = array[:self._size]
+            setattr(self, name, grown)
+
+    def add_many(self, rows: Iterable[Tuple[str, Sequence[float], Optional[str], Optional[str]]]) -> int:
+        """
+        Insert or replace ``(record_id, vector, source_type, user_id)`` rows;
+        vectors may be lists or numpy arrays.
+
+        Returns the number of rows stored. Raises ValueError for a vector
+        whose dimension differs from the store's.
+        """
+        rows = list(rows)
+        if not rows:
+            return 0
+        vectors = np.asarray([row[1] for row in rows], dtype=np.float32)
+        if vectors.ndim != 2:
+            raise ValueError("All vectors must have the same dimension.")
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms > 0, norms, 1.0)
+
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+            if vectors.shape[1] != self.dim:
+                raise ValueError(f"Expected {self.dim}-dim vectors, got {vectors.shape[1]}.")
+            new_ids = [str(row[0]) for row in rows if str(row[0]) not in self._row]
+            self._grow(self._size + len(set(new_ids)))
+            for (record_id, _, source_type, user_id), vector in zip(rows, vectors):
+                record_id = str(record_id)
+                row = self._row.get(record_id)
+                if row is None:
+                    row = self._size
+                    self._size += 1
+                    self._row[record_id] = row
+                    self.ids.append(record_id)
+                self._matrix[row] = vector
+                self._source_type_codes[row] = self._source_types.encode(source_type)
+                self._user_codes[row] = self._users.encode(user_id)
+                self._live[row] = True
+        return len(rows)
+
+    def add(self, record_id: str, vector: List[float], source_type: Optional[str] = None,
+            user_id: Optional[str] = None) -> None:
+        self.add_many([(record_id, vector, source_type, user_id)])
+
+    def remove(self, record_id: str) -> bool:
+        """Drop a record from search results. Returns False if it is not stored."""
+        with self._lock:
+            row = self._row.pop(str(record_id), None)
+            if row is None:
+                return False
+            self._live[row] = False
+            dead = self._size - len(self._row)
+            if dead >= _COMPACT_MIN_DEAD and dead > len(self._row):
+                self._compact()
+            return True
+
+    def _compact(self) -> None:
+        """Renumber live rows into fresh arrays (searches in flight keep the old ones)."""
+        rows = np.flatnonzero(self._live[:self._size])
+        capacity = max(1024, rows.size * 2)
+        matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+        matrix[:rows.size] = self._matrix[rows]
+        self._matrix = matrix
+        for name in ("_source_type_codes", "_user_codes", "_live"):
+            array = getattr(self, name)
+            compacted = np.zeros(capacity, dtype=array.dtype)
+            compacted[:rows.size] = array[rows]
+            setattr(self, name, compacted)
+        self.ids = [self.ids[row] for row in rows.tolist()]
+        self._row = {record_id: row for row, record_id in enumerate(self.ids)}
+        self._size = rows.size
+        self._capacity = capacity
+
+    # ── Queries ───────────────────────────────────────────────────────
+
+    def search(self, query_vector: List[float], top_k: int = 10, source_type: Optional[str] = None,
+               user_id: Optional[str] = None) -> List[Tuple[str, float]]:
+        """Top-k ``(record_id, cosine_similarity)`` pairs, best first."""
+        with self._lock:
+            if self._matrix is None or top_k <= 0:
+                return []
+            size = self._size
+            matrix = self._matrix[:size]
+            mask = self._live[:size].copy()
+            if source_type:
+                mask &= self._source_type_codes[:size] == self._source_types.get(source_type)
+            if user_id:
+                mask &= self._user_codes[:size] == self._users.get(user_id)
+            ids = self.ids
+
+            query = np.asarray(query_vector, dtype=np.float32)
+            if query.shape != (self.dim,):
+                raise ValueError(f"Expected a {self.dim}-dim query vector, got {query.shape}.")
+            norm = np.linalg.norm(query)
+            if norm > 0:
+                query = query / norm
+
+            candidates = np.flatnonzero(mask)
+            if candidates.size == 0:
+                return []
+            if candidates.size < size * _SUBSET_FRACTION:
+                scores = matrix[candidates] @ query
+            else:
+                scores = (matrix @ query)[candidates]
+
+        if candidates.size > top_k:
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            top = np.arange(candidates.size)
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(ids[candidates[i]], float(scores[i])) for i in top.tolist()]
+
+    # ── Database sync ─────────────────────────────────────────────────
+
+    def _load_since(self, db, since=None) -> int:
+        from models.embeddings import EmbeddingRecord
+        from services.vector_codec import decode_vector
+
+        columns = (EmbeddingRecord.id, EmbeddingRecord.vector_data, EmbeddingRecord.vector_format,
+                   EmbeddingRecord.vector_scale, EmbeddingRecord.source_type,
+                   EmbeddingRecord.user_id, EmbeddingRecord.updated_at)
+        query = db.query(*columns)
+        if since is not None:
+            query = query.filter(EmbeddingRecord.updated_at >= since)
+
+        loaded = skipped = 0
+        batch = []
+        rows = query.yield_per(VECTOR_STORE_LOAD_BATCH)
+        for record_id, data, fmt, scale, source_type, user_id, updated_at in rows:
+            if updated_at is not None and (self._watermark is None or updated_at > self._watermark):
+                self._watermark = updated_at
+            vector = decode_vector(data, fmt, scale) if data else None
+            if vector is None or not len(vector) or (self.dim is not None and len(vector) != self.dim):
+                skipped += 1
+                continue
+            if self.dim is None:
+                self.dim = len(vector)
+            batch.append((record_id, vector, source_type, user_id))
+            if len(batch) >= VECTOR_STORE_LOAD_BATCH:
+                loaded += self.add_many(batch)
+                batch = []
+        loaded += self.add_many(batch)
+        if skipped:
+            print(f"[VectorStore] Skipped {skipped} embeddings without a {self.dim}-dim vector")
+        return loaded
+
+    def _reconcile(self, db) -> int:
+        """Drop stored rows whose records no longer exist. Returns how many were dropped."""
+        stale = list(set(self._row) - stored_record_ids(db))
+        for record_id in stale:
+            self.remove(record_id)
+        return len(stale)
+
+    def ensure_loaded(self, db) -> None:
+        """
+        Load every embedding on first use, then pick up rows written by other
+        workers and, less often, drop rows they deleted.
+        """
+        with self._lock:
+            if not self.loaded:
+                started = time.perf_counter()
+                count = self._load_since(db)
+                self.loaded = True
+                self._last_refresh = self._last_reconcile = time.monotonic()
+                print(f"[VectorStore] Loaded {count} embeddings in {time.perf_counter() - started:.2f}s")
+            elif time.monotonic() - self._last_refresh >= VECTOR_STORE_REFRESH_SECONDS:
+                self._load_since(db, self._watermark)
+                if time.monotonic() - self._last_reconcile >= VECTOR_STORE_RECONCILE_SECONDS:
+                    removed = self._reconcile(db)
+                    if removed:
+                        print(f"[VectorStore] Dropped {removed} embeddings deleted by other workers")
+                    self._last_reconcile = time.monotonic()
+                self._last_refresh = time.monotonic()
+
+    def clear(self) -> None:
+        """Drop everything; the next ``ensure_loaded`` reloads from the database."""
+        with self._lock:
+            self._reset(None, 1024)
+
+
+# Process-wide store used by services.embeddings_ai
+vector_store = VectorStore()
@@ -0,0 +1,265 @@
+"""
+Tests for the TF-IDF opportunity matcher and recommendation engine.
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Ensure backend directory is in path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from ai_engine import (
+    IncrementalOpportunityMatcher,
+    OpportunityMatcher,
+    RecommendationEngine,
+    _load_example_data,
+)
+
+NUMERIC = ["years_experience", "location_score"]
+
+
+def _dense_reference(opportunities, candidates, candidate_id):
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    matcher = OpportunityMatcher(numeric_columns=NUMERIC)
+    matcher.fit(opportunities, candidates)
+    opp = matcher._prepare_features(opportunities).toarray()
+    cand = matcher._prepare_features(candidates[candidates["id"] == candidate_id]).toarray()
+    return cosine_similarity(cand, opp).ravel()
+
+
+def test_matcher_keeps_features_sparse():
+    opportunities, candidates = _load_example_data()
+    matcher = OpportunityMatcher(numeric_columns=NUMERIC)
+    matcher.fit(opportunities, candidates)
+
+    assert matcher.opportunity_vectors.format == "csr"
+    assert matcher.opportunity_vectors.shape[0] == len(opportunities)
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_sparse_similarity_matches_dense_cosine(dtype):
+    opportunities, candidates = _load_example_data()
+    matcher = OpportunityMatcher(numeric_columns=NUMERIC, dtype=dtype)
+    matcher.fit(opportunities, candidates)
+
+    for candidate_id in candidates["id"]:
+        expected = _dense_reference(opportunities, candidates, candidate_id)
+        matches = matcher.match(candidate_id, candidates, top_k=len(opportunities))
+        by_id = dict(matches)
+        for opp_id, sim in zip(opportunities["id"], expected):
+            assert by_id[opp_id] == pytest.approx(sim, abs=1e-5)
+
+    assert matcher.opportunity_vectors.dtype == dtype
+
+
+def test_recommendation_engine_excludes_query_item():
+    opportunities, _ = _load_example_data()
+    engine = RecommendationEngine(n_neighbors=3, dtype=np.float32)
+    engine.fit(opportunities, numeric_columns=NUMERIC)
+
+    recs = engine.recommend("opp_1")
+    assert recs and all(item_id != "opp_1" for item_id, _ in recs)
+    with pytest.raises(ValueError):
+        engine.recommend("missing")
+
+
+def test_lsh_index_insert_delete_and_compact():
+    import scipy.sparse as sp
+    from ai_engine import LSHIndex
+
+    rng = np.random.default_rng(0)
+    vectors = sp.csr_matrix(rng.random((50, 16)))
+    # One table with a single bit and full probing degenerates to an exact scan
+    index = LSHIndex(16, n_tables=1, n_bits=1, n_probes=1)
+    index.add([f"id{i}" for i in range(50)], vectors)
+
+    hits = index.query(vectors[3], k=1)
+    assert hits[0][0] == "id3" and hits[0][1] == pytest.approx(1.0, abs=1e-5)
+
+    assert index.remove("id3") is True
+    assert index.remove("id3") is False
+    assert "id3" not in [item_id for item_id, _ in index.query(vectors[3], k=5)]
+    assert len(index) == 49
+
+    index.add(["id3"], vectors[3])
+    assert index.query(vectors[3], k=1)[0][0] == "id3"
+
+    index.compact()
+    assert len(index.ids) == len(index) == 50
+    assert index.query(vectors[7], k=1)[0][0] == "id7"
+
+
+def test_recommendation_engine_lsh_backend():
+    opportunities, _ = _load_example_data()
+    engine = RecommendationEngine(n_neighbors=3, backend="lsh",
+                                  lsh_params={"n_tables": 4, "n_bits": 1, "n_probes": 1})
+    engine.fit(opportunities)
+
+    exact = RecommendationEngine(n_neighbors=3)
+    exact.fit(opportunities)
+    lsh_recs = engine.recommend("opp_1")
+    assert [item_id for item_id, _ in lsh_recs] == [item_id for item_id, _ in exact.recommend("opp_1")]
+
+    engine.remove_item("opp_4")
+    assert "opp_4" not in [item_id for item_id, _ in engine.recommend("opp_1")]
+
+
+def _is_memory_mapped(array):
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+
+def test_matcher_save_and_memory_mapped_load(tmp_path):
+    opportunities, candidates = _load_example_data()
+    matcher = OpportunityMatcher(numeric_columns=NUMERIC, dtype=np.float32)
+    matcher.fit(opportunities, candidates)
+    matcher.save(str(tmp_path))
+
+    loaded = OpportunityMatcher.load(str(tmp_path))
+    assert loaded.dtype is np.float32 and loaded.numeric_columns == NUMERIC
+    assert _is_memory_mapped(loaded._normalized_vectors.data)
+    for candidate_id in candidates["id"]:
+        assert loaded.match(candidate_id, candidates, top_k=3) == matcher.match(candidate_id, candidates, top_k=3)
+
+    with pytest.raises(ValueError):
+        RecommendationEngine.load(str(tmp_path))
+
+
+@pytest.mark.parametrize("backend", ["exact", "lsh"])
+def test_recommendation_engine_save_and_load(tmp_path, backend):
+    opportunities, _ = _load_example_data()
+    engine = RecommendationEngine(n_neighbors=3, backend=backend, lsh_params={"n_bits": 1, "n_probes": 1})
+    engine.fit(opportunities)
+    engine.save(str(tmp_path))
+
+    loaded = RecommendationEngine.load(str(tmp_path))
+    for item_id in opportunities["id"]:
+        assert loaded.recommend(item_id) == engine.recommend(item_id)
+
+    # Loaded engines still accept new items with the saved vocabulary
+    loaded.add_items(opportunities.assign(id=["new_1", "new_2", "new_3", "new_4", "new_5"]))
+    assert loaded.recommend("new_1", top_k=1)[0][0] == "opp_1"
+
+
+def _assert_same_matches(actual, expected):
+    assert [opp_id for opp_id, _ in actual] == [opp_id for opp_id, _ in expected]
+    np.testing.assert_allclose([s for _, s in actual], [s for _, s in expected], atol=1e-9)
+
+
+@pytest.mark.parametrize("numeric_columns", [[], NUMERIC])
+def test_incremental_matcher_matches_refit_scores(numeric_columns):
+    opportunities, candidates = _load_example_data()
+    matcher = OpportunityMatcher(numeric_columns=numeric_columns)
+    matcher.fit(opportunities, candidates)
+    incremental = IncrementalOpportunityMatcher(numeric_columns=numeric_columns)
+    incremental.fit(opportunities, candidates)
+
+    for candidate_id in candidates["id"]:
+        _assert_same_matches(incremental.match(candidate_id, candidates, top_k=5),
+                             matcher.match(candidate_id, candidates, top_k=5))
+
+
+def test_incremental_numeric_features_match_batch_fit_when_added_one_at_a_time(tmp_path):
+    opportunities, candidates = _load_example_data()
+    batch = OpportunityMatcher(numeric_columns=NUMERIC)
+    batch.fit(opportunities, candidates)
+
+    incremental = IncrementalOpportunityMatcher(numeric_columns=NUMERIC)
+    incremental.fit(opportunities.iloc[:0], candidates)
+    for i in range(len(opportunities)):
+        incremental.add_opportunities(opportunities.iloc[i:i + 1])
+    # Replacing and removing a row keeps the running statistics exact
+    incremental.add_opportunities(opportunities.iloc[[1]].assign(years_experience=99))
+    incremental.add_opportunities(opportunities.iloc[[1]])
+    incremental.remove_opportunity("opp_5")
+    incremental.add_opportunities(opportunities.iloc[[4]])
+
+    for candidate_id in candidates["id"]:
+        actual = incremental.match(candidate_id, candidates, top_k=5)
+        expected = batch.match(candidate_id, candidates, top_k=5)
+        # Re-added rows move to the end, so zero-similarity ties may reorder
+        np.testing.assert_allclose([s for _, s in actual], [s for _, s in expected], atol=1e-9)
+        assert [o for o, s in actual if s > 0] == [o for o, s in expected if s > 0]
+
+    incremental.save(str(tmp_path))
+    loaded = IncrementalOpportunityMatcher.load(str(tmp_path))
+    _assert_same_matches(loaded.match("cand_2", candidates), batch.match("cand_2", candidates))
+
+
+def test_incremental_matcher_ingest_replace_and_compact(tmp_path):
+    opportunities, candidates = _load_example_data()
+    full = IncrementalOpportunityMatcher()
+    full.fit(opportunities, candidates)
+
+    incremental = IncrementalOpportunityMatcher(compact_every=1)
+    incremental.fit(opportunities.iloc[:2], candidates)
+    for i in range(2, len(opportunities)):
+        incremental.add_opportunities(opportunities.iloc[i:i + 1])
+    incremental.compact()
+    assert len(incremental._blocks) == 1 and incremental.counts.shape[0] == 5
+    _assert_same_matches(incremental.match("cand_3", candidates), full.match("cand_3", candidates))
+
+    # Re-adding an id replaces the old row; document frequencies follow
+    updated = opportunities.iloc[[2]].assign(description="Data science and NLP modeling.")
+    incremental.add_opportunities(updated)
+    assert len(incremental) == 5 and len(incremental.opportunity_ids) == 6
+    assert incremental.match("cand_3", candidates, top_k=1)[0][0] != "opp_3"
+    assert "opp_3" in [opp_id for opp_id, _ in incremental.match("cand_1", candidates, top_k=2)]
+
+    assert incremental.remove_opportunity("opp_5") is True
+    assert incremental.remove_opportunity("opp_5") is False
+    incremental.compact(drop_deleted=True)
+    assert len(incremental.opportunity_ids) == len(incremental) == 4
+
+    incremental.save(str(tmp_path))
+    loaded = IncrementalOpportunityMatcher.load(str(tmp_path))
+    _assert_same_matches(loaded.match("cand_2", candidates), incremental.match("cand_2", candidates))
+    loaded.add_opportunities(opportunities.iloc[[4]])
+    assert "opp_5" in loaded.opportunity_ids
+
+
+@pytest.mark.parametrize("matcher_cls", [OpportunityMatcher, IncrementalOpportunityMatcher])
+@pytest.mark.parametrize("chunk_size", [1, 2, 256])
+def test_match_many_equals_per_candidate_match(matcher_cls, chunk_size):
+    opportunities, candidates = _load_example_data()
+    matcher = matcher_cls(numeric_columns=NUMERIC)
+    matcher.fit(opportunities, candidates)
+
+    candidate_ids = ["cand_3", "cand_1", "cand_2"]
+    batch = matcher.match_many(candidate_ids, candidates, top_k=3, chunk_size=chunk_size)
+    assert list(batch) == candidate_ids
+    for candidate_id in candidate_ids:
+        single = matcher.match(candidate_id, candidates, top_k=3)
+        assert [s for _, s in batch[candidate_id]] == pytest.approx([s for _, s in single])
+        assert [o for o, _ in batch[candidate_id]] == [o for o, _ in single]
+
+    with pytest.raises(ValueError):
+        matcher.match_many(["cand_1", "nope"], candidates)
+
+
+@pytest.mark.parametrize("matcher_cls", [OpportunityMatcher, IncrementalOpportunityMatcher])
+def test_match_and_match_many_break_ties_in_fit_order(matcher_cls):
+    import pandas as pd
+
+    opportunities, candidates = _load_example_data()
+    # Interleaved copies score exactly like their originals
+    copies = opportunities.assign(id=opportunities["id"] + "_copy")
+    tied = pd.concat([opportunities, copies]).sort_index(kind="stable").reset_index(drop=True)
+    matcher = matcher_cls(numeric_columns=NUMERIC)
+    matcher.fit(tied, candidates)
+
+    candidate_ids = candidates["id"].tolist()
+    for top_k in (1, 3, 4, len(tied)):
+        batch = matcher.match_many(candidate_ids, candidates, top_k=top_k, chunk_size=2)
+        for candidate_id in candidate_ids:
+            single = matcher.match(candidate_id, candidates, top_k=top_k)
+            assert [o for o, _ in batch[candidate_id]] == [o for o, _ in single]
+            # A copy never ranks ahead of, or makes the cut without, its original
+            ranked = [o for o, _ in single]
+            assert all(ranked.index(o[:-len("_copy")]) < i for i, o in enumerate(ranked) if o.endswith("_copy"))
@@ -0,0 +1,42 @@
+"""
+Tests for the per-filter-set opportunity count cache.
+"""
+import os
+import sys
+
+# Ensure backend directory is in path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from count_cache import CountCache, count_key
+
+
+def test_count_key_ignores_order_and_empty_filters():
+    assert count_key({"status": "active", "naics_code": "541511"}, "exact") == \
+        count_key({"naics_code": "541511", "agency": None, "status": "active"}, "exact")
+    assert count_key({"status": "active"}, "exact") != count_key({"status": "active"}, "estimated")
+    assert count_key({"status": "active"}, "exact") != count_key({"status": "archived"}, "exact")
+
+
+def test_exact_total_answers_estimated_lookup_but_not_the_reverse():
+    cache = CountCache(ttl_seconds=60)
+    cache.set({"status": "active"}, "estimated", 1000)
+    assert cache.get({"status": "active"}, "estimated") == 1000
+    assert cache.get({"status": "active"}, "exact") is None
+    cache.set({"status": "archived"}, "exact", 7)
+    assert cache.get({"status": "archived"}, "estimated") == 7
+
+
+def test_entries_expire_and_are_bounded():
+    cache = CountCache(ttl_seconds=0)
+    cache.set({"status": "active"}, "exact", 5)
+    assert cache.get({"status": "active"}) is None
+    assert len(cache) == 0
+
+    cache = CountCache(ttl_seconds=60, max_entries=2)
+    for naics in ("1", "2", "3"):
+        cache.set({"naics_code": naics}, "exact", int(naics))
+    assert len(cache) == 2
+    assert cache.get({"naics_code": "1"}) is None
+    assert cache.get({"naics_code": "3"}) == 3
+    cache.clear()
+    assert cache.get({"naics_code": "3"}) is None
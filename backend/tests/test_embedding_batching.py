@@ -0,0 +1,233 @@
+"""
+Tests for batched and coalesced embedding generation against a stub provider.
+"""
+import os
+import sys
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+# Ensure backend directory is in path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import services.embeddings_ai as embeddings_ai
+from services.embeddings_ai import EmbeddingBatcher, embed_many, plan_batches
+
+
+class StubProvider:
+    """OpenAI-style embeddings client; vectors encode the input text length."""
+
+    def __init__(self):
+        self.embeddings = self
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def create(self, model, input):
+        with self._lock:
+            self.calls.append(list(input))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            data = [SimpleNamespace(index=i, embedding=[float(len(text)), 1.0]) for i, text in enumerate(input)]
+            return SimpleNamespace(data=data[::-1])  # providers may return data out of order
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def sqlite_db():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from database import Base
+    from models.embeddings import EmbeddingCache, EmbeddingRecord, EmbeddingRefreshCheckpoint, SemanticSearchCache
+    from models.proposal import Proposal
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Proposal.__table__, EmbeddingRecord.__table__,
+                                             EmbeddingCache.__table__, EmbeddingRefreshCheckpoint.__table__,
+                                             SemanticSearchCache.__table__])
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_plan_batches_respects_size_and_token_budget():
+    texts = ["x" * 39] * 10 + ["y" * 400] + ["z"] * 3  # 10 tokens each, one 101-token text
+    batches = plan_batches(texts, batch_size=4, max_batch_tokens=30)
+
+    assert [i for batch in batches for i in batch] == list(range(len(texts)))
+    assert all(len(b) <= 4 for b in batches)
+    assert [10] in batches  # over budget on its own
+    assert all(sum(len(texts[i]) // 4 + 1 for i in b) <= 30 for b in batches if b != [10])
+
+
+def test_embed_many_keeps_order_and_bounds_concurrency():
+    provider = StubProvider()
+    texts = [f"text {'a' * i}" for i in range(100)]
+    vectors = embed_many(texts, batch_size=8, max_concurrency=3, client=provider)
+
+    assert vectors == [[float(len(t)), 1.0] for t in texts]
+    assert len(provider.calls) == 13
+    assert provider.max_in_flight <= 3
+    assert embed_many([], client=provider) == []
+
+
+@pytest.mark.asyncio
+async def test_batcher_coalesces_concurrent_calls():
+    provider = StubProvider()
+    batcher = EmbeddingBatcher(max_delay_ms=20, max_batch=8, client=provider)
+
+    texts = [f"notice {'n' * i}" for i in range(20)]
+    vectors = await asyncio.gather(*(batcher.embed(t) for t in texts))
+
+    assert vectors == [[float(len(t)), 1.0] for t in texts]
+    assert sorted(len(call) for call in provider.calls) == [4, 8, 8]
+    assert batcher.requests == 3
+
+
+@pytest.mark.asyncio
+async def test_astore_embedding_shares_one_request(sqlite_db, monkeypatch):
+    from services.vector_store import VectorStore
+
+    provider = StubProvider()
+    monkeypatch.setattr(embeddings_ai, "vector_store", VectorStore())
+    batcher = EmbeddingBatcher(max_delay_ms=20, client=provider)
+
+    records = await asyncio.gather(*(
+        embeddings_ai.astore_embedding("u1", f"text {i}", source_type="opportunity", db=sqlite_db,
+                                       batcher=batcher)
+        for i in range(5)
+    ))
+    assert len(provider.calls) == 1 and len(provider.calls[0]) == 5
+    assert [r.embedding.tolist() for r in records] == [[6.0, 1.0]] * 5
+
+
+def test_rebuild_batches_provider_requests(sqlite_db, monkeypatch):
+    from models.embeddings import EmbeddingRecord
+    from models.proposal import Proposal
+
+    provider = StubProvider()
+    monkeypatch.setattr(embeddings_ai, "embedding_provider", provider)
+    sqlite_db.add_all([Proposal(name=f"p{i}", user_id="u1", raw_text=f"proposal {i}") for i in range(30)]
+                      + [Proposal(name="empty", user_id="u1")])
+    sqlite_db.commit()
+
+    assert embeddings_ai.rebuild_all_embeddings(db=sqlite_db) == 30
+    assert len(provider.calls) == 1
+    assert sqlite_db.query(EmbeddingRecord).count() == 30
+
+
+def test_rebuild_is_idempotent_and_served_from_cache(sqlite_db, monkeypatch):
+    from models.embeddings import EmbeddingCache, EmbeddingRecord
+    from models.proposal import Proposal
+
+    provider = StubProvider()
+    monkeypatch.setattr(embeddings_ai, "embedding_provider", provider)
+    # Two proposals differ only in whitespace and share one cache entry
+    texts = [f"proposal {i}" for i in range(20)] + ["proposal  0 "]
+    sqlite_db.add_all([Proposal(name=f"p{i}", user_id="u1", raw_text=text) for i, text in enumerate(texts)])
+    sqlite_db.commit()
+
+    assert embeddings_ai.rebuild_all_embeddings(db=sqlite_db) == 21
+    assert sum(len(call) for call in provider.calls) == 20
+    ids = sorted(r.id for r in sqlite_db.query(EmbeddingRecord))
+
+    provider.calls.clear()
+    assert embeddings_ai.rebuild_all_embeddings(db=sqlite_db) == 21
+    assert provider.calls == []
+    assert sorted(r.id for r in sqlite_db.query(EmbeddingRecord)) == ids
+    assert sqlite_db.query(EmbeddingCache).count() == 20
+
+
+def test_store_embedding_upserts_by_source(sqlite_db, monkeypatch):
+    from models.embeddings import EmbeddingRecord
+    from services.vector_store import VectorStore
+
+    provider = StubProvider()
+    monkeypatch.setattr(embeddings_ai, "embedding_provider", provider)
+    monkeypatch.setattr(embeddings_ai, "vector_store", VectorStore())
+
+    first = embeddings_ai.store_embedding("u1", "old text", "opportunity", "opp-1", db=sqlite_db)
+    second = embeddings_ai.store_embedding("u1", "a newer text", "opportunity", "opp-1", db=sqlite_db)
+    assert second.id == first.id
+    assert sqlite_db.query(EmbeddingRecord).count() == 1
+    assert sqlite_db.query(EmbeddingRecord).one().text_content == "a newer text"
+
+    embeddings_ai.store_embedding("u1", " old   text", "opportunity", "opp-2", db=sqlite_db)
+    assert len(provider.calls) == 2
+
+
+def test_incremental_refresh_resumes_from_checkpoint(sqlite_db, monkeypatch):
+    from datetime import datetime, timedelta
+
+    from jobs.embedding_refresh import ProposalSource, refresh_embeddings, refresh_source
+    from models.embeddings import EmbeddingRecord
+    from models.proposal import Proposal
+
+    class FailingProvider(StubProvider):
+        def create(self, model, input):
+            if self.calls:
+                raise RuntimeError("provider down")
+            return super().create(model, input)
+
+    base = datetime(2026, 1, 1)
+    # Pairs of proposals share an updated_at so pages split on the id tie-breaker
+    sqlite_db.add_all([
+        Proposal(id=f"p{i:02d}", name=f"p{i}", user_id="u1", raw_text=f"proposal {i}",
+                 updated_at=base + timedelta(minutes=i // 2))
+        for i in range(25)
+    ])
+    sqlite_db.commit()
+    monkeypatch.setattr(embeddings_ai, "embedding_provider", FailingProvider())
+
+    with pytest.raises(RuntimeError):
+        refresh_source(sqlite_db, ProposalSource(sqlite_db), page_size=7)
+    assert sqlite_db.query(EmbeddingRecord).count() == 7
+
+    provider = StubProvider()
+    monkeypatch.setattr(embeddings_ai, "embedding_provider", provider)
+    assert refresh_embeddings(sqlite_db, [ProposalSource(sqlite_db)], page_size=7) == {"proposal": 18}
+    assert sorted(text for call in provider.calls for text in call) == \
+        sorted(f"proposal {i}" for i in range(7, 25))
+
+    provider.calls.clear()
+    assert refresh_source(sqlite_db, ProposalSource(sqlite_db), page_size=7) == 0
+    sqlite_db.get(Proposal, "p03").raw_text = "revised"
+    sqlite_db.get(Proposal, "p03").updated_at = base + timedelta(days=1)
+    sqlite_db.commit()
+    assert refresh_source(sqlite_db, ProposalSource(sqlite_db), page_size=7) == 1
+    assert len(provider.calls) == 1
+    assert sqlite_db.query(EmbeddingRecord).count() == 25
+
+
+def test_hashing_provider_is_deterministic_and_offline(sqlite_db, monkeypatch):
+    import numpy as np
+
+    from services.embedding_providers import HashingEmbeddingProvider, get_embedding_provider
+    from services.vector_store import VectorStore
+
+    provider = get_embedding_provider("hashing")
+    assert isinstance(provider, HashingEmbeddingProvider) and provider.default_model == "local-hashing-1536"
+    with pytest.raises(ValueError):
+        get_embedding_provider("nope")
+
+    texts = ["cloud migration for the army", "army cloud migration services", "janitorial services"]
+    vectors = np.array(embed_many(texts, client=provider))
+    assert vectors.shape == (3, 1536)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+    assert np.array_equal(vectors, embed_many(texts, client=HashingEmbeddingProvider()))
+    assert vectors[0] @ vectors[1] > vectors[0] @ vectors[2]
+
+    # The full store/search path runs against it with no network access
+    monkeypatch.setattr(embeddings_ai, "embedding_provider", provider)
+    monkeypatch.setattr(embeddings_ai, "vector_store", VectorStore())
+    for i, text in enumerate(texts):
+        embeddings_ai.store_embedding("u1", text, "proposal", f"p{i}", db=sqlite_db)
+    results = embeddings_ai.semantic_search("cloud migration", use_cache=False, db=sqlite_db)
+    assert {r["source_id"] for r in results[:2]} == {"p0", "p1"}
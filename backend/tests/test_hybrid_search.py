@@ -0,0 +1,137 @@
+"""
+Tests for BM25 keyword retrieval and hybrid (rank-fused) semantic search.
+"""
+import os
+import sys
+
+import pytest
+
+# Ensure backend directory is in path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.hybrid_search import BM25Index, reciprocal_rank_fusion, tokenize
+
+
+def test_tokenize_keeps_identifiers_and_their_parts():
+    assert tokenize("Solicitation W912DY-24-R-0001, NAICS 541511 (DISA)") == [
+        "solicitation", "w912dy-24-r-0001", "w912dy", "24", "r", "0001", "naics", "541511", "disa"
+    ]
+
+
+def test_bm25_ranks_rare_terms_and_updates_incrementally():
+    index = BM25Index()
+    index.add_many([
+        ("a", "cloud migration services for the army", "opportunity", None),
+        ("b", "cloud hosting cloud support", "opportunity", None),
+        ("c", "janitorial services W912DY-24-R-0001", "opportunity", None),
+        ("d", "cloud proposal draft", "proposal", "u1"),
+    ])
+
+    assert index.search("W912DY-24-R-0001")[0][0] == "c"
+    assert [doc for doc, _ in index.search("cloud", top_k=2)] == ["b", "d"]
+    assert [doc for doc, _ in index.search("cloud", source_type="proposal")] == ["d"]
+    assert index.search("nothing matches") == []
+
+    # Re-adding replaces the old postings; removal drops the document
+    index.add("c", "cloud cloud cloud", "opportunity", None)
+    assert index.search("janitorial") == []
+    assert index.search("cloud")[0][0] == "c"
+    assert index.remove("c") is True and index.remove("c") is False
+    assert "c" not in index and len(index) == 3
+    assert index._total_length == sum(len(tokenize(t)) for t in (
+        "cloud migration services for the army", "cloud hosting cloud support", "cloud proposal draft"))
+
+
+def test_bm25_compaction_keeps_scores_and_statistics(monkeypatch):
+    import services.hybrid_search as hybrid_search
+
+    monkeypatch.setattr(hybrid_search, "_COMPACT_MIN_DEAD", 5)
+    docs = [(f"d{i}", f"cloud {'army ' * (i % 3)}notice{i}", "opportunity", None) for i in range(20)]
+    index, reference = BM25Index(), BM25Index()
+    index.add_many(docs)
+    reference.add_many(docs[12:])
+    for doc_id, *_ in docs[:12]:
+        index.remove(doc_id)
+
+    assert len(index.ids) < 20 and index._total_length == reference._total_length
+    assert {term: len(rows) for term, rows in index._postings.items()} == \
+        {term: len(rows) for term, rows in reference._postings.items()}
+    assert index.search("cloud army", top_k=5) == reference.search("cloud army", top_k=5)
+    assert index.search("notice3") == []
+
+
+def test_bm25_refresh_drops_passages_deleted_by_other_workers(monkeypatch):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    import services.hybrid_search as hybrid_search
+    from database import Base
+    from models.embeddings import EmbeddingRecord
+    from models.proposal import Proposal
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Proposal.__table__, EmbeddingRecord.__table__])
+    db = sessionmaker(bind=engine)()
+    for i, text in enumerate(("cloud migration", "cloud hosting")):
+        db.add(EmbeddingRecord(id=f"e{i}", text_content=text, source_type="opportunity"))
+    db.commit()
+
+    index = BM25Index()
+    index.ensure_loaded(db)
+    db.query(EmbeddingRecord).filter(EmbeddingRecord.id == "e0").delete()
+    db.commit()
+
+    monkeypatch.setattr(hybrid_search, "KEYWORD_INDEX_REFRESH_SECONDS", 0)
+    monkeypatch.setattr(hybrid_search, "KEYWORD_INDEX_RECONCILE_SECONDS", 0)
+    index.ensure_loaded(db)
+    assert "e0" not in index and index.search("migration") == []
+    assert index._total_length == 2 and len(index._postings["cloud"]) == 1
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([[("a", 0.9), ("b", 0.8), ("c", 0.1)], [("b", 12.0), ("c", 3.0)]], k=60)
+    assert [doc for doc, _ in fused] == ["b", "c", "a"]
+    assert fused[0][1] == pytest.approx(1 / 62 + 1 / 61)
+
+
+def test_hybrid_search_finds_exact_identifiers(monkeypatch):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    import services.embeddings_ai as embeddings_ai
+    from database import Base
+    from models.embeddings import EmbeddingCache, EmbeddingRecord, SemanticSearchCache
+    from models.proposal import Proposal
+    from services.vector_store import VectorStore
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Proposal.__table__, EmbeddingRecord.__table__,
+                                             EmbeddingCache.__table__, SemanticSearchCache.__table__])
+    db = sessionmaker(bind=engine)()
+
+    # The identifier query embeds close to the IT notices, not the janitorial one that cites it
+    vectors = {"IT modernization support": [1.0, 0.0], "Cloud services for DISA": [0.9, 0.1],
+               "Janitorial services, solicitation W912DY-24-R-0001": [0.0, 1.0],
+               "W912DY-24-R-0001": [0.95, 0.05]}
+    monkeypatch.setattr(embeddings_ai, "embed", lambda text, model=None: vectors[text])
+    monkeypatch.setattr(embeddings_ai, "vector_store", VectorStore())
+    monkeypatch.setattr(embeddings_ai, "keyword_index", BM25Index())
+    for i, text in enumerate(list(vectors)[:3]):
+        embeddings_ai.store_embedding(None, text, source_type="opportunity", source_id=f"opp{i}", db=db)
+
+    vector_only = embeddings_ai.semantic_search("W912DY-24-R-0001", top_k=1, use_cache=False, db=db)
+    assert vector_only[0]["source_id"] == "opp0"
+
+    keyword = embeddings_ai.semantic_search("W912DY-24-R-0001", top_k=1, use_cache=False, db=db, mode="keyword")
+    assert keyword[0]["source_id"] == "opp2"
+
+    hybrid = embeddings_ai.semantic_search("W912DY-24-R-0001", top_k=3, use_cache=False, db=db, mode="hybrid")
+    assert hybrid[0]["source_id"] == "opp2"
+    assert {r["source_id"] for r in hybrid} == {"opp0", "opp1", "opp2"}
+
+    # Writes after the index is loaded are searchable right away
+    vectors["DISA W912DY-24-R-0001 amendment"] = [0.0, 1.0]
+    embeddings_ai.store_embedding(None, "DISA W912DY-24-R-0001 amendment", source_type="opportunity",
+                                  source_id="opp3", db=db)
+    keyword = embeddings_ai.semantic_search("DISA amendment", top_k=1, use_cache=False, db=db, mode="keyword")
+    assert keyword[0]["source_id"] == "opp3"
@@ -0,0 +1,370 @@
+"""
+Tests for the opportunity match engine.
+"""
+import os
+import sys
+import random
+
+import pytest
+
+# Ensure backend directory is in path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from match_engine import (
+    NAICS_KEYWORDS,
+    TECH_KEYWORDS,
+    CompiledProfile,
+    KeywordMatcher,
+    OpportunityBlock,
+    amatch_top_k,
+    calculate_keyword_relevance,
+    calculate_naics_match,
+    match_opportunity,
+    match_opportunities,
+    match_top_k,
+)
+
+TAG_POOL = [
+    "Software Development", "IT Services", "Facilities Management", "R&D",
+    "Cloud Migration", "Engineering Design", "Janitorial", "Business Consulting",
+    "Scientific Research", "Logistics", "Computer Systems", "Custom Application",
+]
+NAICS_POOL = ["541511", "541512", "541519", "541330", "561210", "236220", "", None]
+CERT_POOL = ["SDVOSB", "8(a)", "HUBZone", "WOSB", "SBA", "none"]
+
+
+def _synthetic_opportunities(n, seed=7):
+    rng = random.Random(seed)
+    words = TECH_KEYWORDS + ["janitorial", "hvac", "support", "logistics", "training"]
+    opportunities = []
+    for i in range(n):
+        opportunities.append({
+            "id": i,
+            "title": " ".join(rng.sample(words, 3)).title(),
+            "description": " ".join(rng.choice(words) for _ in range(rng.randint(0, 12))),
+            "tags": rng.sample(TAG_POOL, rng.randint(0, 4)),
+            "naics_code": rng.choice(NAICS_POOL),
+        })
+    return opportunities
+
+
+def _naive_naics_match(tags, company_naics):
+    if not company_naics:
+        return 0.0
+    keywords = [kw for naics in company_naics for kw in NAICS_KEYWORDS.get(naics, [])]
+    if not keywords:
+        return 30.0
+    matches = sum(1 for kw in keywords for tag in tags if kw.lower() in tag.lower())
+    return min(100.0, 40.0 + matches * 15.0) if matches else 30.0
+
+
+def _reference_match(opportunities, naics_codes, certifications, naics_alignment=False):
+    matches = [match_opportunity(opp, naics_codes, certifications, naics_alignment) for opp in opportunities]
+    matches.sort(key=lambda x: x["match_score"], reverse=True)
+    return matches
+
+
+def test_batch_engine_parity_with_scalar_scoring():
+    """Batch engine returns identical results to per-opportunity scoring."""
+    opportunities = _synthetic_opportunities(500)
+    rng = random.Random(11)
+    profiles = [([], []), (["999999"], ["SDVOSB"])]
+    for _ in range(20):
+        profiles.append((
+            rng.sample(list(NAICS_KEYWORDS) + ["236220"], rng.randint(1, 4)),
+            rng.sample(CERT_POOL, rng.randint(0, 3)),
+        ))
+
+    for naics_codes, certifications in profiles:
+        expected = _reference_match(opportunities, naics_codes, certifications)
+        assert match_opportunities(opportunities, naics_codes, certifications) == expected
+
+
+def test_naics_alignment_is_opt_in():
+    """Scoring the opportunity's own NAICS code changes scores only when asked for."""
+    row = {"id": 1, "title": "Services", "description": "", "naics_code": "541511", "tags": []}
+    assert match_opportunity(row, ["541511"], [])["component_scores"]["naics"] == 30.0
+    assert match_opportunity(row, ["541511"], [], naics_alignment=True)["component_scores"]["naics"] == 100.0
+    assert calculate_naics_match([], ["541511"]) == 30.0
+    assert calculate_naics_match([], ["541511"], "541519") == 70.0
+
+    opportunities = _synthetic_opportunities(300)
+    block = OpportunityBlock(opportunities)
+    for naics_codes in (["541511"], ["541330", "236220"], ["999999"]):
+        aligned = CompiledProfile(naics_codes, ["8(a)"], naics_alignment=True).match(block)
+        assert aligned == _reference_match(opportunities, naics_codes, ["8(a)"], naics_alignment=True)
+        # No opportunity shares a prefix with 999999, so only the others change
+        assert (aligned == CompiledProfile(naics_codes, ["8(a)"]).match(block)) == (naics_codes == ["999999"])
+
+
+def test_block_reused_across_profiles():
+    """A compiled block can be scored against several profiles."""
+    block = OpportunityBlock(_synthetic_opportunities(50))
+    first = CompiledProfile(["541511"], ["8(a)"]).score(block)
+    second = CompiledProfile(["561210"], []).score(block)
+
+    assert first.total.shape == second.total.shape == (50,)
+    assert (first.certifications == 10.0).all()
+    assert (second.certifications == 0.0).all()
+
+
+def test_empty_opportunity_list():
+    assert match_opportunities([], ["541511"], ["SDVOSB"]) == []
+
+
+@pytest.mark.parametrize("top_k,block_size", [(1, 7), (10, 64), (25, 1000), (600, 50)])
+def test_top_k_matches_full_sort(top_k, block_size):
+    """Streaming top-k equals the head of the fully sorted result."""
+    opportunities = _synthetic_opportunities(500)
+    naics_codes, certifications = ["541511", "541519"], ["SDVOSB"]
+    expected = match_opportunities(opportunities, naics_codes, certifications)[:top_k]
+
+    result = match_top_k(iter(opportunities), naics_codes, certifications,
+                         top_k=top_k, block_size=block_size)
+    assert result == expected
+
+
+@pytest.mark.asyncio
+async def test_async_top_k_accepts_async_iterator():
+    opportunities = _synthetic_opportunities(200)
+
+    async def stream():
+        for opp in opportunities:
+            yield opp
+
+    expected = match_opportunities(opportunities, ["541330"], [])[:5]
+    assert await amatch_top_k(stream(), ["541330"], [], top_k=5, block_size=32) == expected
+    assert await amatch_top_k(opportunities, ["541330"], [], top_k=5) == expected
+
+
+def test_keyword_matcher_finds_overlapping_keywords():
+    """Every keyword is found, including ones nested in or prefixing others."""
+    matcher = KeywordMatcher({"a": ["system", "systems", "IT", "facilities"], "b": ["sys", "ties"]})
+    found = {matcher.keywords[i] for i in matcher.find("Facilities SYSTEMS")}
+    assert found == {"facilities", "it", "ties", "sys", "system", "systems"}
+    assert matcher.scan("facilities systems") == {"a": 4, "b": 2}
+    assert matcher.scan("") == {"a": 0, "b": 0}
+
+
+def test_keyword_matcher_matches_naive_scan_on_overlapping_keywords():
+    rng = random.Random(5)
+    # A two-letter alphabet makes keywords nest, overlap and share prefixes
+    words = lambda n, lo, hi: ["".join(rng.choice("ab") for _ in range(rng.randint(lo, hi))) for _ in range(n)]
+    for _ in range(50):
+        groups = {"x": words(4, 1, 5), "y": words(3, 1, 5)}
+        matcher = KeywordMatcher(groups)
+        segments = [s.upper() if rng.random() < 0.3 else s for s in words(6, 0, 12)]
+        for text in segments:
+            assert [matcher.keywords[i] for i in matcher.find(text)] == \
+                [kw for kw in matcher.keywords if kw in text.lower()]
+        expected = [[sum(kw.lower() in seg.lower() for kw in kws) for kws in groups.values()] for seg in segments]
+        assert matcher.segment_hits(segments).tolist() == expected
+
+
+def test_compiled_scoring_matches_naive_substring_scan():
+    rng = random.Random(3)
+    for opp in _synthetic_opportunities(300):
+        naics_codes = rng.sample(list(NAICS_KEYWORDS), rng.randint(1, 3)) * rng.randint(1, 2)
+        assert calculate_naics_match(opp["tags"], naics_codes) == \
+            _naive_naics_match(opp["tags"], naics_codes)
+
+        text = f"{opp['title']} {opp['description']}".lower()
+        expected = min(20.0, sum(1 for kw in TECH_KEYWORDS if kw in text) * 4.0)
+        assert calculate_keyword_relevance(opp["description"], opp["title"], []) == expected
+
+
+def test_index_add_remove_keeps_postings_current():
+    from match_index import OpportunityIndex
+
+    index = OpportunityIndex()
+    # Opportunities-table rows carry keywords rather than tags
+    index.add({"id": 1, "naics_code": "541511", "keywords": ["Custom  Software"]})
+    index.add({"id": 2, "naics_code": "561210", "tags": ["Janitorial"]})
+
+    assert index.lookup("naics3:541") == {"1"}
+    assert index.lookup("tag:custom software") == {"1"}
+    # 2-digit sectors are too broad to prune with
+    assert index.lookup("naics2:54") == set()
+    assert index.candidates(["549999"]) == set()
+    assert index.candidates(["541512"]) == {"1"}
+
+    # Re-indexing replaces the old keys
+    index.add({"id": 1, "naics_code": "236220", "keywords": ["Construction"]})
+    assert index.lookup("naics3:541") == set()
+    assert index.candidates(["541511"]) == set()
+    assert index.candidates(["561210"]) == {"2"}
+
+    assert index.remove(2) is True
+    assert index.remove(2) is False
+    assert 2 not in index and len(index) == 1
+
+
+def test_index_forgets_tag_tokens_of_removed_opportunities():
+    from match_index import OpportunityIndex
+
+    index = OpportunityIndex()
+    index.add_many({"id": i, "naics_code": "", "keywords": [f"software {i}"]} for i in range(100))
+    index.add({"id": "keep", "naics_code": "", "keywords": ["Custom Application"]})
+    assert index.tag_candidates(["541511"]) == {str(i) for i in range(100)} | {"keep"}
+
+    for i in range(100):
+        index.remove(i)
+    assert len(index._tag_tokens) < 50 and "custom application" in index._tag_rows
+    assert index.tag_candidates(["541511"]) == {"keep"}
+
+    # Tokens come back when an opportunity uses them again
+    index.add({"id": 3, "naics_code": "", "keywords": ["software 3"]})
+    assert index.tag_candidates(["541511"]) == {"3", "keep"}
+
+
+def test_index_match_agrees_with_full_scan_for_tag_hits():
+    from match_index import OpportunityIndex
+
+    opportunities = _synthetic_opportunities(500)
+    index = OpportunityIndex()
+    index.add_many(opportunities)
+
+    naics_codes, certifications = ["541511", "541715"], ["HUBZone"]
+    assert len(index.tag_candidates(naics_codes)) >= 20
+    by_id = {str(opp["id"]): opp for opp in opportunities}
+    fetched = []
+
+    def fetch(ids):
+        fetched.extend(ids)
+        return [by_id[opp_id] for opp_id in reversed(ids)]
+
+    expected = match_opportunities(opportunities, naics_codes, certifications, top_k=20)
+    assert index.match(naics_codes, certifications, fetch, top_k=20) == expected
+    # Only candidates are fetched for exact scoring
+    assert set(fetched) == index.candidates(naics_codes) and len(fetched) < len(opportunities)
+
+    # Few candidates: the tail is filled with the constant floor score
+    sparse = OpportunityIndex()
+    sparse.add_many(opportunities[:3])
+    results = sparse.match(["999999"], [], fetch, top_k=3)
+    assert [r["match_score"] for r in results] == [18.0, 18.0, 18.0]
+
+
+@pytest.mark.asyncio
+async def test_fan_out_matches_equals_per_user_matching(monkeypatch):
+    import jobs.match_fanout as fanout
+
+    monkeypatch.setattr(fanout, "USERS_PER_TILE", 2)
+    monkeypatch.setattr(fanout, "OPPORTUNITIES_PER_TILE", 70)
+    opportunities = _synthetic_opportunities(300)
+    profiles = [
+        fanout.company_profile({"user_id": f"u{i}", "naics_codes": codes, "sdvosb_certified": i % 2})
+        for i, codes in enumerate([["541511"], ["541330", "561210"], [], ["541715"], ["111111"]])
+    ]
+
+    result = await fanout.fan_out_matches(profiles, opportunities, top_k=5, max_workers=2)
+
+    for user_id, naics_codes, certifications in profiles:
+        expected = _reference_match(opportunities, naics_codes, certifications, naics_alignment=True)[:5]
+        assert result[user_id] == expected
+
+
+def _opportunity_row(i, naics_code, keywords, title="Enterprise services support"):
+    """A row shaped like the opportunities table in schema.sql (no ``tags`` column)."""
+    return {
+        "id": f"00000000-0000-0000-0000-{i:012d}",
+        "notice_id": f"W912DY-24-R-{i:04d}",
+        "title": title,
+        "description": "Provide services to the program office.",
+        "agency": "Department of the Army",
+        "office": "ACC",
+        "naics_code": naics_code,
+        "psc_code": "D302",
+        "set_aside": None,
+        "posted_date": "2026-01-01T00:00:00+00:00",
+        "response_deadline": "2026-02-01T00:00:00+00:00",
+        "keywords": keywords,
+        "status": "active",
+        "updated_at": "2026-01-01T00:00:00+00:00",
+    }
+
+
+@pytest.mark.asyncio
+async def test_opportunity_table_rows_score_naics_code_and_keywords():
+    import jobs.match_fanout as fanout
+
+    rows = [
+        _opportunity_row(1, "236220", None),
+        _opportunity_row(2, "541519", None),                       # same 4-digit group
+        _opportunity_row(3, "541511", None),                       # same code
+        _opportunity_row(4, "562111", ["Custom Software", "Application hosting"]),
+        _opportunity_row(5, None, []),
+    ]
+    profile = fanout.company_profile({
+        "user_id": "u1",
+        "naics_codes": ["541511"],
+        "sdvosb_certified": False,
+        "certification_documents": [
+            {"document_type": "HUBZone", "status": "active"},
+            {"document_type": "8(a)", "status": "expired"},
+        ],
+    })
+    assert profile == ("u1", ["541511"], ["HUBZone"])
+
+    scalar = {row["id"]: match_opportunity(row, profile[1], profile[2], naics_alignment=True) for row in rows}
+    naics = {opp_id[-1]: m["component_scores"]["naics"] for opp_id, m in scalar.items()}
+    assert naics == {"1": 30.0, "2": 70.0, "3": 100.0, "4": 85.0, "5": 30.0}
+
+    result = await fanout.fan_out_matches([profile], rows, top_k=5, max_workers=1)
+    assert result["u1"] == _reference_match(rows, profile[1], profile[2], naics_alignment=True)
+    assert [m["opportunity_id"][-1] for m in result["u1"][:3]] == ["3", "4", "2"]
+
+
+def test_match_cache_hits_and_precise_invalidation():
+    from match_cache import MatchCache, MemoryMatchCache, profile_hash
+
+    opportunities = _synthetic_opportunities(100)
+    for opp in opportunities:
+        opp["updated_at"] = "2026-01-01T00:00:00"
+    cache = MatchCache(MemoryMatchCache())
+    naics_codes, certifications = ["541512", "541511"], ["8(a)"]
+
+    expected = match_opportunities(opportunities, naics_codes, certifications)
+    assert cache.match_opportunities(opportunities, naics_codes, certifications, user_id="a") == expected
+    assert cache.match_opportunities(opportunities, naics_codes[::-1], certifications, user_id="b") == expected
+    assert len(cache.backend) == 100
+
+    # A new opportunity version misses; the old version is dropped on upsert
+    cache.invalidate_opportunity("7")
+    assert len(cache.backend) == 99
+    opportunities[7]["updated_at"] = "2026-02-01T00:00:00"
+    cache.match_opportunities(opportunities, naics_codes, certifications, user_id="a")
+    assert len(cache.backend) == 100
+
+    # Entries survive while another user still has the same profile
+    cache.invalidate_user("a")
+    assert len(cache.backend) == 100
+    cache.invalidate_user("b")
+    assert len(cache.backend) == 0
+    assert profile_hash(["1", "2"], []) == profile_hash(["2", "1"], [])
+
+
+def test_match_cache_keys_change_with_scoring_version(monkeypatch):
+    import match_cache
+    from match_cache import MatchCache, MemoryMatchCache
+
+    opportunities = _synthetic_opportunities(20)
+    cache = MatchCache(MemoryMatchCache())
+    before = match_cache.profile_hash(["541511"], [])
+    cache.match_opportunities(opportunities, ["541511"], [], user_id="a")
+
+    monkeypatch.setattr(match_cache, "MATCH_SCORING_VERSION", match_cache.MATCH_SCORING_VERSION + 1)
+    assert match_cache.profile_hash(["541511"], []) != before
+    # Results scored under the old version are not reused
+    cache.match_opportunities(opportunities, ["541511"], [], user_id="a")
+    assert len(cache.backend) == 20
+
+
+def test_memory_match_cache_respects_byte_budget():
+    from match_cache import MemoryMatchCache
+
+    cache = MemoryMatchCache(max_bytes=4000)
+    cache.set_many([(("p", str(i), ""), {"match_score": i}) for i in range(100)])
+    assert 0 < cache.size_bytes <= 4000
+    assert cache.get_many([("p", "99", ""), ("p", "0", "")])[0] == {"match_score": 99}
+    assert cache.get_many([("p", "0", "")]) == [None]
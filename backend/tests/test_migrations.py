@@ -0,0 +1,171 @@
+"""
+Tests for the Alembic migrations on SQLite.
+
+The app creates its tables with ``Base.metadata.create_all`` at startup, so
+migrations have to apply both to an older schema and to one that is already
+current.
+"""
+import os
+import sys
+import importlib.util
+
+import numpy as np
+import sqlalchemy as sa
+
+# Ensure backend directory is in path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _run_migration(connection, name, direction="upgrade"):
+    from alembic.migration import MigrationContext
+    from alembic.operations import Operations
+
+    path = os.path.join(os.path.dirname(__file__), "..", "migrations", "versions", f"{name}.py")
+    spec = importlib.util.spec_from_file_location(name, path)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    with Operations.context(MigrationContext.configure(connection)):
+        getattr(migration, direction)()
+
+
+def _booted_engine():
+    """An in-memory database with the tables create_all builds at startup."""
+    from database import Base
+    from models.embeddings import EmbeddingCache, EmbeddingRecord, EmbeddingRefreshCheckpoint, SemanticSearchCache
+    from models.proposal import Proposal
+
+    engine = sa.create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Proposal.__table__, EmbeddingRecord.__table__,
+                                             EmbeddingCache.__table__, EmbeddingRefreshCheckpoint.__table__,
+                                             SemanticSearchCache.__table__])
+    return engine
+
+
+def _insert_passages(connection):
+    for chunk in (0, 1):
+        connection.execute(sa.text(
+            "INSERT INTO embeddings (id, source_type, source_id, text_content, chunk_index, embedding_model) "
+            f"VALUES ('p{chunk}', 'opportunity', 'opp1', 'passage {chunk}', {chunk}, 'm')"
+        ))
+
+
+def test_embedding_cache_migration_applies_to_a_booted_database():
+    engine = _booted_engine()
+    with engine.begin() as connection:
+        _insert_passages(connection)
+        _run_migration(connection, "003_embedding_cache")
+        ids = connection.execute(sa.text("SELECT id FROM embeddings ORDER BY id")).scalars().all()
+    assert ids == ["p0", "p1"]
+
+
+def test_embedding_cache_migration_keeps_newest_row_per_source():
+    engine = sa.create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(sa.text(
+            "CREATE TABLE embeddings (id VARCHAR PRIMARY KEY, source_type VARCHAR, source_id VARCHAR, "
+            "created_at TIMESTAMP)"
+        ))
+        connection.execute(sa.text(
+            "INSERT INTO embeddings VALUES "
+            "('a1', 'opportunity', 'opp1', '2024-01-01'), ('a2', 'opportunity', 'opp1', '2024-02-01'), "
+            "('b1', 'opportunity', 'opp2', NULL), ('b2', 'opportunity', 'opp2', NULL), "
+            "('c1', 'proposal', 'opp1', NULL), ('c2', 'proposal', 'opp1', '2023-01-01')"
+        ))
+        _run_migration(connection, "003_embedding_cache")
+
+        ids = connection.execute(sa.text("SELECT id FROM embeddings ORDER BY id")).scalars().all()
+        inspector = sa.inspect(connection)
+        assert ids == ["a2", "b2", "c2"]
+        assert "embedding_cache" in inspector.get_table_names()
+        assert "uq_embedding_source" in {c["name"] for c in inspector.get_unique_constraints("embeddings")}
+
+
+def test_refresh_checkpoint_migration_applies_to_a_booted_database():
+    engine = _booted_engine()
+    with engine.begin() as connection:
+        _run_migration(connection, "004_embedding_refresh")
+        _run_migration(connection, "004_embedding_refresh", "downgrade")
+        _run_migration(connection, "004_embedding_refresh")
+        inspector = sa.inspect(connection)
+        assert "embedding_refresh_checkpoints" in inspector.get_table_names()
+        assert "ix_proposal_updated_at_id" in {index["name"] for index in inspector.get_indexes("proposals")}
+
+
+def test_passage_migration_applies_to_a_booted_database():
+    engine = _booted_engine()
+    with engine.begin() as connection:
+        _insert_passages(connection)
+        _run_migration(connection, "005_embedding_passages")
+        ids = connection.execute(sa.text("SELECT id FROM embeddings ORDER BY id")).scalars().all()
+        constraints = {c["name"] for c in sa.inspect(connection).get_unique_constraints("embeddings")}
+    assert ids == ["p0", "p1"]
+    assert constraints == {"uq_embedding_source_chunk"}
+
+
+def test_passage_migration_upgrades_a_per_source_schema():
+    engine = sa.create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(sa.text(
+            "CREATE TABLE embeddings (id VARCHAR PRIMARY KEY, source_type VARCHAR, source_id VARCHAR, "
+            "created_at TIMESTAMP)"
+        ))
+        connection.execute(sa.text("INSERT INTO embeddings VALUES ('a1', 'opportunity', 'opp1', NULL)"))
+        _run_migration(connection, "003_embedding_cache")
+        _run_migration(connection, "005_embedding_passages")
+
+        inspector = sa.inspect(connection)
+        assert {"chunk_index", "char_start", "char_end"} <= {c["name"] for c in inspector.get_columns("embeddings")}
+        assert {c["name"] for c in inspector.get_unique_constraints("embeddings")} == {"uq_embedding_source_chunk"}
+        assert connection.execute(sa.text("SELECT chunk_index FROM embeddings")).scalar() == 0
+
+
+def test_binary_vector_migration_applies_to_a_booted_database():
+    engine = _booted_engine()
+    with engine.begin() as connection:
+        _insert_passages(connection)
+        connection.execute(sa.text(
+            "INSERT INTO embedding_cache (text_hash, embedding_model, vector) VALUES ('h', 'm', '[0.5, -1.0]')"
+        ))
+        _run_migration(connection, "006_binary_vectors")
+        data = connection.execute(sa.text("SELECT vector_data, vector FROM embedding_cache")).one()
+    assert bytes(data[0]) == np.asarray([0.5, -1.0], dtype="<f4").tobytes() and data[1] is None
+
+
+def test_binary_vector_migration_upgrades_a_json_schema():
+    engine = sa.create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(sa.text("CREATE TABLE embeddings (id VARCHAR PRIMARY KEY, vector JSON NOT NULL)"))
+        connection.execute(sa.text("INSERT INTO embeddings VALUES ('a1', '[1.0, 2.0]')"))
+        _run_migration(connection, "006_binary_vectors")
+
+        columns = {c["name"]: c for c in sa.inspect(connection).get_columns("embeddings")}
+        row = connection.execute(sa.text("SELECT vector_data, vector_format, vector FROM embeddings")).one()
+    assert {"vector_data", "vector_format", "vector_scale"} <= set(columns) and columns["vector"]["nullable"]
+    assert bytes(row[0]) == np.asarray([1.0, 2.0], dtype="<f4").tobytes() and row[1:] == ("float32", None)
+
+
+def test_search_cache_migration_applies_to_a_booted_database():
+    engine = _booted_engine()
+    with engine.begin() as connection:
+        _run_migration(connection, "007_search_cache_scope")
+        indexes = {index["name"] for index in sa.inspect(connection).get_indexes("semantic_search_cache")}
+    assert {"uq_search_cache_query_hash", "ix_search_cache_expires_at"} <= indexes
+
+
+def test_search_cache_migration_scopes_an_unscoped_table():
+    engine = sa.create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(sa.text(
+            "CREATE TABLE semantic_search_cache (id VARCHAR PRIMARY KEY, query_hash VARCHAR(64), "
+            "results JSON, last_accessed TIMESTAMP)"
+        ))
+        connection.execute(sa.text("CREATE INDEX ix_search_cache_query_hash ON semantic_search_cache (query_hash)"))
+        connection.execute(sa.text("INSERT INTO semantic_search_cache VALUES ('c1', 'h', '[]', NULL)"))
+        _run_migration(connection, "007_search_cache_scope")
+
+        inspector = sa.inspect(connection)
+        columns = {c["name"] for c in inspector.get_columns("semantic_search_cache")}
+        indexes = {index["name"] for index in inspector.get_indexes("semantic_search_cache")}
+        assert {"user_id", "source_type", "expires_at"} <= columns
+        assert "ix_search_cache_query_hash" not in indexes and "uq_search_cache_query_hash" in indexes
+        assert connection.execute(sa.text("SELECT count(*) FROM semantic_search_cache")).scalar() == 0
@@ -0,0 +1,65 @@
+"""
+Tests for opportunity pagination cursors.
+"""
+import os
+import sys
+import json
+import base64
+
+import pytest
+
+# Ensure backend directory is in path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from opportunity_cursor import (
+    encode_opportunity_cursor,
+    encode_offset_cursor,
+    decode_opportunity_cursor,
+    keyset_position,
+)
+
+OPPORTUNITY_ID = "3f2b8c1e-6d4a-4b7e-9a1c-2e5f7d9b0a13"
+
+
+def _raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trips_keyset_and_offset_positions():
+    row = {"id": OPPORTUNITY_ID, "posted_date": "2024-03-01T12:30:00.123456+00:00"}
+    assert decode_opportunity_cursor(encode_opportunity_cursor(row)) == (row["posted_date"], OPPORTUNITY_ID)
+    assert decode_opportunity_cursor(encode_opportunity_cursor({"id": OPPORTUNITY_ID})) == (None, OPPORTUNITY_ID)
+    assert decode_opportunity_cursor(encode_offset_cursor(150)) == 150
+
+
+@pytest.mark.parametrize("payload", [
+    # Values that would escape the quoted or() filter they are spliced into
+    ['2024-01-01",status.eq.archived,posted_date.lt."2100-01-01', OPPORTUNITY_ID],
+    ["2024-01-01", f"{OPPORTUNITY_ID},status.neq.active"],
+    ["2024-01-01", "0),or(id.gt.0"],
+    [None, "*"],
+    ["yesterday", OPPORTUNITY_ID],
+    [20240101, OPPORTUNITY_ID],
+    ["2024-01-01", None],
+    ["2024-01-01"],
+    -5,
+    True,
+    {"posted_date": "2024-01-01", "id": OPPORTUNITY_ID},
+])
+def test_malicious_or_malformed_cursor_is_rejected(payload):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_opportunity_cursor(_raw_cursor(payload))
+
+
+def test_undecodable_cursor_is_rejected():
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_opportunity_cursor("not base64 json!")
+
+
+def test_keyset_position_requires_a_timestamp_unless_nullable():
+    assert keyset_position("2024-03-01T00:00:00+00:00", OPPORTUNITY_ID.upper()) == \
+        ("2024-03-01T00:00:00+00:00", OPPORTUNITY_ID)
+    with pytest.raises(ValueError):
+        keyset_position(None, OPPORTUNITY_ID)
+    with pytest.raises(ValueError):
+        keyset_position('2024-03-01",id.gt.0', OPPORTUNITY_ID)
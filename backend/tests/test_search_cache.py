@@ -0,0 +1,152 @@
+"""
+Tests for the two-tier semantic search result cache.
+"""
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+# Ensure backend directory is in path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.search_cache import SearchCache, cache_key
+
+
+@pytest.fixture
+def db():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from database import Base
+    from models.embeddings import EmbeddingCache, EmbeddingRecord, SemanticSearchCache
+    from models.proposal import Proposal
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Proposal.__table__, EmbeddingRecord.__table__,
+                                             EmbeddingCache.__table__, SemanticSearchCache.__table__])
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_cache_key_covers_every_result_parameter():
+    base = cache_key("cloud  migration", "opportunity", "u1", 10, "vector", "max")
+    assert base == cache_key(" cloud migration\n", "opportunity", "u1", 10, "vector", "max")
+    variants = [
+        # Embeddings are case sensitive, so the key is too
+        cache_key("Cloud migration", "opportunity", "u1", 10, "vector", "max"),
+        cache_key("cloud migration", None, "u1", 10, "vector", "max"),
+        cache_key("cloud migration", "opportunity", "u2", 10, "vector", "max"),
+        cache_key("cloud migration", "opportunity", "u1", 5, "vector", "max"),
+        cache_key("cloud migration", "opportunity", "u1", 10, "hybrid", "max"),
+        cache_key("cloud migration", "opportunity", "u1", 10, "vector", "sum"),
+    ]
+    assert base not in variants and len(set(variants)) == len(variants)
+
+
+def test_l1_and_l2_tiers_with_ttl(db):
+    from models.embeddings import SemanticSearchCache
+
+    cache = SearchCache(flush_seconds=3600)
+    cache.set(db, "k1", "query", [{"id": "a"}], user_id="u1", source_type="proposal")
+    assert cache.get(db, "k1") == [{"id": "a"}]
+    assert cache.get(db, "missing") is None
+
+    # A fresh process (empty L1) reads the row back and promotes it
+    other = SearchCache(flush_seconds=3600)
+    assert other.get(db, "k1") == [{"id": "a"}] and len(other) == 1
+
+    # L1 answers without the database
+    db.query(SemanticSearchCache).delete()
+    db.commit()
+    assert other.get(db, "k1") == [{"id": "a"}]
+
+    # Expired rows are not served
+    expired = SearchCache(ttl_seconds=-1, flush_seconds=3600)
+    expired.set(db, "k2", "query", [{"id": "b"}])
+    assert SearchCache().get(db, "k2") is None
+
+
+def test_hits_are_counted_in_memory_and_flushed_in_one_batch(db):
+    from models.embeddings import SemanticSearchCache
+
+    cache = SearchCache(flush_seconds=3600)
+    cache.set(db, "k1", "q1", [{"id": "a"}])
+    cache.set(db, "k2", "q2", [{"id": "b"}])
+    for key in ("k1", "k1", "k2", "k1"):
+        cache.get(db, key)
+    counts = lambda: dict(db.query(SemanticSearchCache.query_hash, SemanticSearchCache.hit_count))
+    assert counts() == {"k1": 0, "k2": 0}
+
+    assert cache.flush_hits(db) == 2
+    db.expire_all()
+    assert counts() == {"k1": 3, "k2": 1}
+    assert cache.flush_hits(db) == 0
+
+
+def test_evict_drops_expired_then_least_recently_accessed(db):
+    from models.embeddings import SemanticSearchCache
+
+    cache = SearchCache(max_entries=2, flush_seconds=3600)
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for i in range(4):
+        cache.set(db, f"k{i}", f"q{i}", [{"id": i}])
+        db.query(SemanticSearchCache).filter_by(query_hash=f"k{i}").update(
+            {"last_accessed": base + timedelta(minutes=[3, 0, 2, 1][i])})
+    db.query(SemanticSearchCache).filter_by(query_hash="k0").update({"expires_at": base})
+    db.commit()
+
+    assert cache.evict(db) == 2
+    assert sorted(h for (h,) in db.query(SemanticSearchCache.query_hash)) == ["k2", "k3"]
+
+
+def test_new_embeddings_invalidate_matching_scopes(db, monkeypatch):
+    import services.embeddings_ai as embeddings_ai
+    from services.vector_store import VectorStore
+
+    cache = SearchCache(flush_seconds=3600)
+    monkeypatch.setattr(embeddings_ai, "search_cache", cache)
+    monkeypatch.setattr(embeddings_ai, "vector_store", VectorStore())
+    monkeypatch.setattr(embeddings_ai, "embed", lambda text, model=None: [1.0, float(len(text))])
+
+    embeddings_ai.store_embedding("u1", "first proposal", "proposal", "p1", db=db)
+    embeddings_ai.store_embedding("u2", "other proposal", "proposal", "p2", db=db)
+    embeddings_ai.store_embedding("u1", "saved opportunity", "opportunity", "o1", db=db)
+    searches = {
+        "all": dict(),
+        "u1": dict(user_id="u1"),
+        "u2": dict(user_id="u2"),
+        "u1_opps": dict(user_id="u1", source_type="opportunity"),
+    }
+    first = {name: embeddings_ai.semantic_search("proposal", db=db, **kw) for name, kw in searches.items()}
+    assert [r["source_id"] for r in first["u1_opps"]] == ["o1"]
+
+    calls = []
+    monkeypatch.setattr(embeddings_ai, "embed", lambda text, model=None: calls.append(text) or [1.0, 9.0])
+    embeddings_ai.store_embedding("u1", "second proposal", "proposal", "p3", db=db)
+    calls.clear()
+
+    for kw in searches.values():
+        embeddings_ai.semantic_search("proposal", db=db, **kw)
+    # Unfiltered and u1 searches were recomputed; u2 and u1's opportunity search were not affected
+    assert len(calls) == 2
+    assert {r["source_id"] for r in embeddings_ai.semantic_search("proposal", user_id="u1", db=db)} == {"p1", "p3", "o1"}
+
+
+def test_cached_results_are_shared_only_by_queries_searched_identically(db, monkeypatch):
+    import services.embeddings_ai as embeddings_ai
+    from services.vector_store import VectorStore
+
+    monkeypatch.setattr(embeddings_ai, "search_cache", SearchCache(flush_seconds=3600))
+    monkeypatch.setattr(embeddings_ai, "vector_store", VectorStore())
+    calls = []
+    monkeypatch.setattr(embeddings_ai, "embed",
+                        lambda text, model=None: calls.append(text) or [1.0, float(text.count("C"))])
+    embeddings_ai.store_embedding("u1", "cloud proposal", "proposal", "p1", db=db)
+    calls.clear()
+
+    embeddings_ai.semantic_search("  cloud\tproposal ", db=db)
+    embeddings_ai.semantic_search("cloud proposal", db=db)
+    embeddings_ai.semantic_search("Cloud proposal", db=db)
+    assert calls == ["cloud proposal", "Cloud proposal"]
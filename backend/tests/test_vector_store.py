@@ -0,0 +1,274 @@
+"""
+Tests for the in-process embedding vector store and semantic search.
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Ensure backend directory is in path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.vector_store import VectorStore
+
+
+def _random_rows(n, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim))
+    return [(f"e{i}", vectors[i].tolist(), ["proposal", "opportunity"][i % 2], f"u{i % 3}")
+            for i in range(n)]
+
+
+def _brute_force(rows, query, source_type=None, user_id=None):
+    scored = []
+    q = np.asarray(query) / np.linalg.norm(query)
+    for record_id, vector, row_type, row_user in rows:
+        if (source_type and row_type != source_type) or (user_id and row_user != user_id):
+            continue
+        v = np.asarray(vector)
+        scored.append((record_id, float(v @ q / np.linalg.norm(v))))
+    return sorted(scored, key=lambda x: x[1], reverse=True)
+
+
+@pytest.mark.parametrize("source_type,user_id", [(None, None), ("opportunity", None), (None, "u1"),
+                                                 ("proposal", "u2"), ("document", None), (None, "nobody")])
+def test_search_matches_brute_force(source_type, user_id):
+    rows = _random_rows(500)
+    store = VectorStore(capacity=8)  # exercises growth
+    store.add_many(rows[:200])
+    for row in rows[200:]:
+        store.add(*row)
+
+    query = np.random.default_rng(1).standard_normal(16)
+    expected = _brute_force(rows, query, source_type, user_id)[:7]
+    result = store.search(query, top_k=7, source_type=source_type, user_id=user_id)
+
+    assert [r[0] for r in result] == [e[0] for e in expected]
+    np.testing.assert_allclose([r[1] for r in result], [e[1] for e in expected], atol=1e-5)
+
+
+def test_replace_and_remove():
+    store = VectorStore()
+    store.add("a", [1.0, 0.0], "proposal", "u")
+    store.add("b", [0.0, 1.0], "proposal", "u")
+    assert store.search([1.0, 0.0], top_k=1)[0][0] == "a"
+
+    store.add("a", [-1.0, 0.0], "proposal", "u")  # replaced in place
+    assert len(store) == 2
+    assert store.search([1.0, 0.0], top_k=2)[0] == ("b", pytest.approx(0.0))
+
+    assert store.remove("b") is True and store.remove("b") is False
+    assert [r[0] for r in store.search([1.0, 0.0], top_k=5)] == ["a"]
+
+    with pytest.raises(ValueError):
+        store.add("c", [1.0, 0.0, 0.0])
+
+
+def test_removed_rows_are_compacted_away(monkeypatch):
+    import services.vector_store as vector_store_module
+
+    monkeypatch.setattr(vector_store_module, "_COMPACT_MIN_DEAD", 10)
+    rows = _random_rows(60)
+    store = VectorStore()
+    store.add_many(rows)
+    for record_id, *_ in rows[:40]:
+        store.remove(record_id)
+
+    assert len(store.ids) < 60 and len(store) == 20
+    query = np.random.default_rng(2).standard_normal(16)
+    expected = _brute_force(rows[40:], query, source_type="opportunity")[:5]
+    assert [r[0] for r in store.search(query, top_k=5, source_type="opportunity")] == [e[0] for e in expected]
+    store.add(*rows[0])
+    assert "e0" in store and store.search(rows[0][1], top_k=1)[0][0] == "e0"
+
+
+def _embedding_db():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from database import Base
+    from models.embeddings import EmbeddingCache, EmbeddingRecord, SemanticSearchCache
+    from models.proposal import Proposal
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Proposal.__table__, EmbeddingRecord.__table__,
+                                             EmbeddingCache.__table__, SemanticSearchCache.__table__])
+    return sessionmaker(bind=engine)()
+
+
+def test_refresh_drops_rows_deleted_by_other_workers(monkeypatch):
+    import services.embeddings_ai as embeddings_ai
+    import services.vector_store as vector_store_module
+    from models.embeddings import EmbeddingRecord
+
+    db = _embedding_db()
+    vectors = {"cloud migration": [1.0, 0.0], "cloud hosting": [0.9, 0.1]}
+    monkeypatch.setattr(embeddings_ai, "embed", lambda text, model=None: vectors[text])
+    monkeypatch.setattr(embeddings_ai, "vector_store", VectorStore())
+    for text in vectors:
+        embeddings_ai.store_embedding("u1", text, source_type="opportunity", db=db)
+
+    store = VectorStore()
+    store.ensure_loaded(db)
+    deleted = db.query(EmbeddingRecord).filter(EmbeddingRecord.text_content == "cloud migration").one().id
+    db.query(EmbeddingRecord).filter(EmbeddingRecord.id == deleted).delete()
+    db.commit()
+
+    monkeypatch.setattr(vector_store_module, "VECTOR_STORE_REFRESH_SECONDS", 0)
+    store.ensure_loaded(db)
+    assert deleted in store  # only the periodic reconcile sees deletions
+
+    monkeypatch.setattr(vector_store_module, "VECTOR_STORE_RECONCILE_SECONDS", 0)
+    store.ensure_loaded(db)
+    assert deleted not in store and len(store) == 1
+    assert deleted not in [r[0] for r in store.search([1.0, 0.0], top_k=2)]
+
+
+def test_semantic_search_loads_lazily_and_tracks_new_embeddings(monkeypatch):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    import services.embeddings_ai as embeddings_ai
+    from database import Base
+    from models.embeddings import EmbeddingCache, EmbeddingRecord, SemanticSearchCache
+    from models.proposal import Proposal
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Proposal.__table__, EmbeddingRecord.__table__,
+                                             EmbeddingCache.__table__, SemanticSearchCache.__table__])
+    db = sessionmaker(bind=engine)()
+
+    vectors = {"cloud migration": [1.0, 0.0, 0.0], "janitorial": [0.0, 1.0, 0.0],
+               "cloud hosting": [0.9, 0.1, 0.0], "query: cloud": [1.0, 0.05, 0.0]}
+    monkeypatch.setattr(embeddings_ai, "embed", lambda text, model=None: vectors[text])
+    store = VectorStore()
+    monkeypatch.setattr(embeddings_ai, "vector_store", store)
+
+    for text in ("cloud migration", "janitorial"):
+        embeddings_ai.store_embedding("u1", text, source_type="opportunity", metadata={"t": text}, db=db)
+    assert not store.loaded
+
+    results = embeddings_ai.semantic_search("query: cloud", top_k=1, use_cache=False, db=db)
+    assert store.loaded and len(store) == 2
+    assert [r["text"] for r in results] == ["cloud migration"]
+    assert results[0]["metadata"] == {"t": "cloud migration"}
+
+    # Writes after the initial load go straight into the store
+    embeddings_ai.store_embedding("u2", "cloud hosting", source_type="proposal", db=db)
+    assert len(store) == 3
+    results = embeddings_ai.semantic_search("query: cloud", top_k=5, use_cache=False, db=db)
+    assert [r["text"] for r in results] == ["cloud migration", "cloud hosting", "janitorial"]
+
+    filtered = embeddings_ai.semantic_search("query: cloud", user_id="u2", use_cache=False, db=db)
+    assert [r["text"] for r in filtered] == ["cloud hosting"]
+
+
+def test_chunk_text_windows_overlap_and_cover_text():
+    from services.embeddings_ai import chunk_text, estimate_tokens
+
+    text = " ".join(f"word{i:03d}" for i in range(300))  # 2 estimated tokens per word
+    passages = chunk_text(text, max_tokens=30, overlap_tokens=6)
+
+    assert passages[0].start == 0 and passages[-1].end == len(text)
+    for passage, following in zip(passages, passages[1:]):
+        assert estimate_tokens(passage.text) <= 30
+        assert passage.text == text[passage.start:passage.end]
+        assert following.start < passage.end  # three words of overlap
+        assert text[following.start:passage.end].count(" ") == 2
+    assert [p.index for p in passages] == list(range(len(passages)))
+    assert chunk_text("short text") == [(0, 0, 10, "short text")]
+
+
+def test_semantic_search_pools_passages_per_source(monkeypatch):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    import services.embeddings_ai as embeddings_ai
+    from database import Base
+    from models.embeddings import EmbeddingCache, EmbeddingRecord, SemanticSearchCache
+    from models.proposal import Proposal
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Proposal.__table__, EmbeddingRecord.__table__,
+                                             EmbeddingCache.__table__, SemanticSearchCache.__table__])
+    db = sessionmaker(bind=engine)()
+
+    topics = {"cloud": [1.0, 0.0, 0.0], "janitorial": [0.0, 1.0, 0.0], "hvac": [0.0, 0.0, 1.0],
+              "cyber": [0.6, 0.0, 0.8]}
+
+    def fake_embed_many(texts, model=None, max_concurrency=None, client=None):
+        return [[sum(v) for v in zip(*(topics[w] for w in t.split() if w in topics))] for t in texts]
+
+    monkeypatch.setattr(embeddings_ai, "embed_many", fake_embed_many)
+    monkeypatch.setattr(embeddings_ai, "embed", lambda text, model=None: fake_embed_many([text])[0])
+    monkeypatch.setattr(embeddings_ai, "vector_store", VectorStore())
+
+    # A long RFP whose cloud section is far past the old 5000-character cut-off
+    rfp = " ".join(["janitorial"] * 1500 + ["cloud"] * 400)
+    embeddings_ai.store_embedding("u1", rfp, source_type="opportunity", source_id="rfp", db=db)
+    embeddings_ai.store_embedding("u1", "cyber hvac", source_type="opportunity", source_id="short", db=db)
+    assert db.query(EmbeddingRecord).filter_by(source_id="rfp").count() > 5
+
+    results = embeddings_ai.semantic_search("cloud", top_k=2, use_cache=False, db=db)
+    assert [r["source_id"] for r in results] == ["rfp", "short"]
+    assert results[0]["text"].endswith("cloud cloud cloud cloud")
+    assert rfp[results[0]["char_start"]:results[0]["char_end"]] == results[0]["text"]
+
+    pooled = embeddings_ai.semantic_search("janitorial", top_k=1, use_cache=False, db=db, pooling="sum")
+    assert pooled[0]["source_id"] == "rfp" and pooled[0]["passages"] == 4
+    assert pooled[0]["similarity"] == pytest.approx(4.0, abs=1e-5)
+
+    # Re-storing a shorter text drops the passages it no longer has
+    embeddings_ai.store_embedding("u1", "cloud", source_type="opportunity", source_id="rfp", db=db)
+    assert db.query(EmbeddingRecord).filter_by(source_id="rfp").count() == 1
+    assert len(embeddings_ai.vector_store) == 2
+
+
+@pytest.mark.parametrize("fmt,rtol", [("float32", 0), ("float16", 1e-3), ("int8", 1e-2)])
+def test_vector_codec_round_trip_and_size(fmt, rtol):
+    import json
+
+    from services.vector_codec import decode_vector, encode_vector
+
+    vector = np.random.default_rng(1).standard_normal(1536).astype(np.float32)
+    data, scale = encode_vector(vector, fmt)
+    decoded = decode_vector(data, fmt, scale)
+
+    assert decoded.dtype == np.float32 and decoded.shape == (1536,)
+    assert len(json.dumps(vector.tolist())) >= 4 * len(data)
+    if fmt == "float32":
+        assert np.array_equal(decoded, vector) and not decoded.flags.owndata  # a view of the bytes
+    else:
+        cosine = decoded @ vector / np.linalg.norm(decoded) / np.linalg.norm(vector)
+        assert cosine > 1 - rtol
+        assert np.abs(decoded - vector).max() <= np.abs(vector).max() * rtol
+
+
+def test_quantized_rows_load_into_vector_store(monkeypatch):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    import services.embeddings_ai as embeddings_ai
+    from database import Base
+    from models.embeddings import EmbeddingCache, EmbeddingRecord, SemanticSearchCache
+    from models.proposal import Proposal
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Proposal.__table__, EmbeddingRecord.__table__,
+                                             EmbeddingCache.__table__, SemanticSearchCache.__table__])
+    db = sessionmaker(bind=engine)()
+
+    rows = _random_rows(20, dim=32)
+    vectors = {f"text {i}": vector for i, (_, vector, _, _) in enumerate(rows)}
+    monkeypatch.setattr(embeddings_ai, "embed", lambda text, model=None: vectors[text])
+    monkeypatch.setattr(embeddings_ai, "EMBEDDING_VECTOR_FORMAT", "int8")
+    monkeypatch.setattr(embeddings_ai, "vector_store", VectorStore())
+    for text in vectors:
+        embeddings_ai.store_embedding("u1", text, source_type="opportunity", db=db)
+
+    record = db.query(EmbeddingRecord).first()
+    assert record.vector is None and record.vector_format == "int8" and len(record.vector_data) == 32
+
+    results = embeddings_ai.semantic_search("text 5", top_k=1, use_cache=False, db=db)
+    assert results[0]["text"] == "text 5" and results[0]["similarity"] > 0.99
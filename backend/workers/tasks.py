@@ -8,7 +8,7 @@ from typing import List, Dict, Any
 import uuid
 
 from services.sam_scraper import search_sam
-from services.embeddings_ai import rebuild_all_embeddings
+from jobs.embedding_refresh import refresh_embeddings
 from database import SessionLocal
 from models.proposal import Proposal
 
@@ -64,40 +64,38 @@ async def nightly_sam_scan():
     return total_stored
 
 
-async def nightly_embeddings_rebuild(user_id: str = None):
+async def nightly_embeddings_refresh():
     """
-    Rebuilds embeddings for all proposals as a maintenance job.
+    Embeds proposals and opportunities changed since the last run.
+    Interrupted runs resume from their checkpoint.
     """
-    print("[workers] Rebuilding proposal embeddings...")
+    print("[workers] Refreshing changed embeddings...")
     
+    db = SessionLocal()
     try:
-        db = SessionLocal()
-        count = rebuild_all_embeddings(user_id=user_id, db=db)
-        print(f"[workers] Embedding rebuild completed. Rebuilt {count} embeddings.")
+        counts = await asyncio.to_thread(refresh_embeddings, db)
+        count = sum(counts.values())
+        print(f"[workers] Embedding refresh completed. Embedded {count} changed rows.")
         return count
     except Exception as e:
-        print(f"[workers] Embedding rebuild error: {e}")
+        print(f"[workers] Embedding refresh error: {e}")
         return 0
+    finally:
+        db.close()
 
 
 async def cleanup_old_search_cache():
     """
-    Clean up old semantic search cache entries
+    Clean up expired semantic search cache entries and enforce the size cap
     """
     print("[workers] Cleaning up old search cache...")
     db = SessionLocal()
     
     try:
-        from models.embeddings import SemanticSearchCache
-        from sqlalchemy import func
+        from services.search_cache import search_cache
         
-        # Delete cache entries older than 7 days
-        cutoff_date = datetime.utcnow() - timedelta(days=7)
-        deleted = db.query(SemanticSearchCache).filter(
-            SemanticSearchCache.created_at < cutoff_date
-        ).delete()
-        
-        db.commit()
+        search_cache.flush_hits(db)
+        deleted = search_cache.evict(db)
         print(f"[workers] Deleted {deleted} old cache entries")
         return deleted
     except Exception as e:
@@ -117,7 +115,7 @@ async def daily_worker_cycle():
 
     # Run tasks in sequence
     await nightly_sam_scan()
-    await nightly_embeddings_rebuild()
+    await nightly_embeddings_refresh()
     await cleanup_old_search_cache()
 
     print(f"[workers] Daily worker cycle finished at {datetime.utcnow().isoformat()}")